@@ -1,5 +1,7 @@
 """Shared helpers for agent orchestration."""
 
+import re
+from functools import lru_cache
 from typing import Dict, List, Optional
 
 
@@ -24,109 +26,158 @@ def map_tool_to_app(tool_name: str) -> str:
     return parts[0].lower() if parts else tool_name.lower()
 
 
+_DISPLAY_NAMES = {
+    "github": "GitHub",
+    "gmail": "Gmail",
+    "google_calendar": "Google Calendar",
+    "linear": "Linear",
+    "notion": "Notion",
+    "slack": "Slack",
+}
+
+_EARLY_SUMMARIES = {
+    "linear": "I'll search Linear to help with your request.",
+    "slack": "I'll read Slack to help with your request.",
+    "github": "I'll check GitHub to help with your request.",
+    "notion": "I'll look in Notion to help with your request.",
+    "gmail": "I'll check Gmail to help with your request.",
+    "google_calendar": (
+        "I'll check Google Calendar to help with your request."
+    ),
+}
+
+
+# What the agent will do in each app, for the combined multi-app summary.
+_APP_ACTION_PHRASES = {
+    "linear": "create a ticket in Linear",
+    "slack": "notify the team on Slack",
+    "github": "check GitHub",
+    "notion": "look in Notion",
+    "gmail": "check Gmail",
+    "google_calendar": "check Google Calendar",
+}
+
+
 def format_app_name(app_id: str) -> str:
     """Format app IDs for user-facing messages."""
-    display_names = {
-        "github": "GitHub",
-        "gmail": "Gmail",
-        "google_calendar": "Google Calendar",
-        "linear": "Linear",
-        "notion": "Notion",
-        "slack": "Slack",
-    }
-    if app_id in display_names:
-        return display_names[app_id]
+    display_name = _DISPLAY_NAMES.get(app_id)
+    if display_name is not None:
+        return display_name
     return app_id.replace("_", " ").title()
 
 
+@lru_cache(maxsize=128)
+def _fallback_early_summary(app_id: str) -> str:
+    return f"I'll look in {format_app_name(app_id)} to help with your request."
+
+
 def make_early_summary(app_id: str) -> str:
     """Generate a deterministic early summary for the given app."""
-    templates = {
-        "linear": "I'll search Linear to help with your request.",
-        "slack": "I'll read Slack to help with your request.",
-        "github": "I'll check GitHub to help with your request.",
-        "notion": "I'll look in Notion to help with your request.",
-        "gmail": "I'll check Gmail to help with your request.",
-        "google_calendar": (
-            "I'll check Google Calendar to help with your request."
-        ),
-    }
-    if app_id in templates:
-        return templates[app_id]
-    return f"I'll look in {format_app_name(app_id)} to help with your request."
+    return _EARLY_SUMMARIES.get(app_id) or _fallback_early_summary(app_id)
+
 
+def make_combined_early_summary(app_ids: List[str]) -> str:
+    """Generate the early summary for a request that spans several apps."""
+    actions = [_APP_ACTION_PHRASES[app] for app in app_ids if app in _APP_ACTION_PHRASES]
+    # Only the first two apps are named, as the summary always has been.
+    return f"I'll {' and '.join(actions[:2])}."
 
-def detect_apps_from_input(user_input: str) -> List[str]:
-    """Pre-detect likely apps from user input keywords."""
-    user_lower = user_input.lower()
-    detected: List[str] = []
 
-    linear_keywords = [
+# Keyword triggers per app, checked in this order by detect_apps_from_input.
+_APP_KEYWORDS = (
+    (
         "linear",
-        "issue",
-        "ticket",
-        "bug",
-        "task",
-        "file it",
-        "file a",
-        "urgent",
-    ]
-    if any(kw in user_lower for kw in linear_keywords):
-        detected.append("linear")
-
-    slack_keywords = [
+        (
+            "linear",
+            "issue",
+            "ticket",
+            "bug",
+            "task",
+            "file it",
+            "file a",
+            "urgent",
+        ),
+    ),
+    (
         "slack",
-        "message",
-        "channel",
-        "notify",
-        "confirm with",
-        "tell",
-        "send to",
-        "billing team",
-        "team on slack",
-    ]
-    if any(kw in user_lower for kw in slack_keywords):
-        detected.append("slack")
-
-    github_keywords = [
+        (
+            "slack",
+            "message",
+            "channel",
+            "notify",
+            "confirm with",
+            "tell",
+            "send to",
+            "billing team",
+            "team on slack",
+        ),
+    ),
+    (
         "github",
-        "repo",
-        "repository",
-        "pr",
-        "pull request",
-        "commit",
-    ]
-    if any(kw in user_lower for kw in github_keywords):
-        detected.append("github")
-
-    notion_keywords = ["notion", "page", "database", "doc"]
-    if any(kw in user_lower for kw in notion_keywords):
-        detected.append("notion")
-
-    gmail_keywords = ["gmail", "email", "inbox", "mail"]
-    if any(kw in user_lower for kw in gmail_keywords):
-        detected.append("gmail")
-
-    calendar_keywords = [
-        "calendar",
-        "meeting",
-        "schedule",
-        "availability",
-        "free busy",
-    ]
-    if any(kw in user_lower for kw in calendar_keywords):
-        detected.append("google_calendar")
+        (
+            "github",
+            "repo",
+            "repository",
+            "pr",
+            "pull request",
+            "commit",
+        ),
+    ),
+    ("notion", ("notion", "page", "database", "doc")),
+    ("gmail", ("gmail", "email", "inbox", "mail")),
+    (
+        "google_calendar",
+        (
+            "calendar",
+            "meeting",
+            "schedule",
+            "availability",
+            "free busy",
+        ),
+    ),
+)
 
-    return detected
+
+_KEYWORD_APP = {kw: app for app, keywords in _APP_KEYWORDS for kw in keywords}
+_APP_ORDER = tuple(app for app, _ in _APP_KEYWORDS)
+# One scan for every keyword. The lookahead matches at each position, so
+# overlapping keywords are all seen, like the per-keyword substring checks.
+# No keyword is a prefix of another app's keyword, so longest-first is exact.
+_KEYWORD_PATTERN = re.compile(
+    "(?=(%s))"
+    % "|".join(re.escape(kw) for kw in sorted(_KEYWORD_APP, key=len, reverse=True))
+)
+
+
+def detect_apps_from_input(user_input: str, user_lower: Optional[str] = None) -> List[str]:
+    """
+    Pre-detect likely apps from user input keywords.
+
+    Pass `user_lower` when the caller already has user_input.lower().
+    """
+    if user_lower is None:
+        user_lower = user_input.lower()
+    found = set()
+    for match in _KEYWORD_PATTERN.finditer(user_lower):
+        found.add(_KEYWORD_APP[match.group(1)])
+        if len(found) == len(_APP_ORDER):
+            break
+    return [app for app in _APP_ORDER if app in found]
 
 
 def detect_intent_scope(
     user_input: str,
     required_apps: Optional[List[str]] = None,
+    user_lower: Optional[str] = None,
 ) -> Dict[str, str]:
     """Infer a minimal tool scope per app from user input."""
-    user_lower = user_input.lower()
-    apps = required_apps.copy() if required_apps else detect_apps_from_input(user_input)
+    if user_lower is None:
+        user_lower = user_input.lower()
+    apps = (
+        required_apps.copy()
+        if required_apps
+        else detect_apps_from_input(user_input, user_lower)
+    )
     scopes: Dict[str, str] = {}
     if not apps:
         return scopes
@@ -220,10 +271,11 @@ def detect_intent_scope(
     return scopes
 
 
-def looks_like_tool_request(user_input: str) -> bool:
+def looks_like_tool_request(user_input: str, user_lower: Optional[str] = None) -> bool:
     """Heuristic to decide whether the input likely needs tool calls."""
-    user_lower = user_input.lower()
-    intent_keywords = [
+    if user_lower is None:
+        user_lower = user_input.lower()
+    intent_keywords = (
         "create",
         "make",
         "add",
@@ -251,17 +303,12 @@ def looks_like_tool_request(user_input: str) -> bool:
         "search",
         "list",
         "fetch",
-    ]
+    )
     return any(keyword in user_lower for keyword in intent_keywords)
 
 
-def is_capabilities_query(user_input: str) -> bool:
-    """Detect short capability/help prompts that should return a concise static answer."""
-    text = " ".join(user_input.lower().strip().split())
-    if not text:
-        return False
-
-    direct_matches = {
+_CAPABILITY_QUERIES = frozenset(
+    {
         "help",
         "help?",
         "what can you do",
@@ -279,7 +326,16 @@ def is_capabilities_query(user_input: str) -> bool:
         "what commands do you have",
         "what commands do you have?",
     }
-    if text in direct_matches:
+)
+
+
+def is_capabilities_query(user_input: str) -> bool:
+    """Detect short capability/help prompts that should return a concise static answer."""
+    text = " ".join(user_input.lower().split())
+    if not text:
+        return False
+
+    if text in _CAPABILITY_QUERIES:
         return True
 
     capability_phrases = (
@@ -1,20 +1,54 @@
 """Stream dispatcher for agent tool execution."""
 
 import json
+import logging
+import random
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
+from itertools import islice
+from typing import (
+    AbstractSet,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Generator,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib json fallback
+    orjson = None
+
+from llm.router import is_transient_error
+from llm.types import ToolResult
+from services.composio_tool_aliases import normalize_tool_slug
 
 from .common import (
     detect_apps_from_input,
     format_app_name,
     looks_like_tool_request,
+    make_combined_early_summary,
     make_early_summary,
     map_tool_to_app,
 )
 
+logger = logging.getLogger(__name__)
+
+# Distinguishes "attribute absent" from "attribute is None" in getattr lookups.
+_MISSING = object()
+
+# Upper bound on READ tools executed concurrently within one model turn.
+MAX_PARALLEL_READS = 8
+
 
 def _tool_status_name_for_app(app_id: str) -> str:
     normalized = app_id.lower().replace("-", "_").replace(" ", "_")
@@ -53,12 +87,36 @@ def _parse_retry_delay_seconds(exc: Exception) -> Optional[float]:
         return None
 
 
+# Added to each backoff so concurrent turns do not retry in lockstep.
+_RETRY_JITTER_SECONDS = 0.25
+
+
+def _retry_delay(
+    exc: Exception,
+    attempt: int,
+    base_delay: float,
+    max_retry_delay: float,
+) -> float:
+    raw_delay = _parse_retry_delay_seconds(exc) or (
+        base_delay * (2 ** attempt) + random.uniform(0, _RETRY_JITTER_SECONDS)
+    )
+    delay = min(raw_delay, max_retry_delay)
+    if raw_delay > max_retry_delay:
+        logger.debug(
+            "Model provider requested long retry (%.2fs); capping to %.2fs",
+            raw_delay,
+            delay,
+        )
+    logger.warning("Model provider call failed (%s); retrying in %.2fs", exc, delay)
+    return delay
+
+
 def _send_message_with_retry(
     send_fn: Callable[[], Any],
     *,
-    max_retries: int = 1,
-    base_delay: float = 1.0,
-    max_retry_delay: float = 5.0,
+    max_retries: int = 3,
+    base_delay: float = 0.5,
+    max_retry_delay: float = 4.0,
 ) -> Tuple[Optional[Any], Optional[Exception]]:
     last_exc: Optional[Exception] = None
     for attempt in range(max_retries + 1):
@@ -66,40 +124,214 @@ def _send_message_with_retry(
             return send_fn(), None
         except Exception as exc:  # noqa: BLE001 - surface model errors to caller
             last_exc = exc
-            if not _is_rate_limit_error(exc) or attempt >= max_retries:
+            if not is_transient_error(exc) or attempt >= max_retries:
                 break
-            raw_delay = _parse_retry_delay_seconds(exc) or (base_delay * (attempt + 1))
-            delay = min(raw_delay, max_retry_delay)
-            if raw_delay > max_retry_delay:
-                print(
-                    "DEBUG: Model provider requested long retry "
-                    f"({raw_delay:.2f}s); capping to {delay:.2f}s",
-                    flush=True,
-                )
-            print(
-                f"DEBUG: Model provider rate-limited; retrying in {delay:.2f}s",
-                flush=True,
-            )
-            time.sleep(delay)
+            time.sleep(_retry_delay(exc, attempt, base_delay, max_retry_delay))
     return None, last_exc
 
 
+def _stream_message_with_retry(
+    stream_fn: Callable[[], Generator[str, None, Any]],
+    *,
+    max_retries: int = 3,
+    base_delay: float = 0.5,
+    max_retry_delay: float = 4.0,
+) -> Generator[Dict, None, Tuple[Optional[Any], Optional[Exception]]]:
+    """Like `_send_message_with_retry`, but yields `message_delta` events as text arrives.
+
+    A transient failure is only retried if it has not streamed any text yet.
+    """
+    last_exc: Optional[Exception] = None
+    for attempt in range(max_retries + 1):
+        streamed = False
+        try:
+            stream = stream_fn()
+            while True:
+                try:
+                    delta = next(stream)
+                except StopIteration as stop:
+                    return stop.value, None
+                streamed = True
+                yield {"type": "message_delta", "content": delta}
+        except Exception as exc:  # noqa: BLE001 - surface model errors to caller
+            last_exc = exc
+            if streamed or not is_transient_error(exc) or attempt >= max_retries:
+                break
+            time.sleep(_retry_delay(exc, attempt, base_delay, max_retry_delay))
+    return None, last_exc
+
+
+# Datetimes and dataclasses go through `default` so they are coerced exactly
+# like the stdlib encoder would, and the caller knows to re-parse.
+_ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_PASSTHROUGH_DATACLASS
+    if orjson is not None
+    else 0
+)
+
+
+def _dumps_tool_result(result_data: Any, default: Callable[[Any], Any]) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(result_data, default=default, option=_ORJSON_OPTIONS).decode()
+        except TypeError:
+            # e.g. integers beyond 64 bits; the stdlib encoder handles those.
+            pass
+    return json.dumps(result_data, ensure_ascii=True, default=default)
+
+
+def _canonical_args(tool_args: Any) -> Union[bytes, str]:
+    """Order-independent serialization of tool args, for dedupe keys."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(tool_args, default=str, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            # e.g. non-string keys; the stdlib encoder coerces those.
+            pass
+    return json.dumps(tool_args, sort_keys=True, default=str)
+
+
+def _loads_tool_result(serialized: str) -> Any:
+    if orjson is not None:
+        return orjson.loads(serialized)
+    return json.loads(serialized)
+
+
+def _longest_list(
+    data: Any,
+    path: Tuple[Any, ...] = (),
+    depth: int = 3,
+) -> Tuple[Tuple[Any, ...], Optional[List[Any]]]:
+    """Locate the longest list in the top levels of a result (where list endpoints put items)."""
+    if isinstance(data, list):
+        return path, data
+    best_path: Tuple[Any, ...] = ()
+    best: Optional[List[Any]] = None
+    if isinstance(data, dict) and depth > 0:
+        for key, value in data.items():
+            found_path, found = _longest_list(value, path + (key,), depth - 1)
+            if found is not None and (best is None or len(found) > len(best)):
+                best_path, best = found_path, found
+    return best_path, best
+
+
+def _with_list_prefix(data: Any, path: Tuple[Any, ...], count: int) -> Any:
+    """Copy of `data` with the list at `path` cut to its first `count` items."""
+    if not path:
+        return data[:count]
+    trimmed = dict(data)
+    trimmed[path[0]] = _with_list_prefix(data[path[0]], path[1:], count)
+    return trimmed
+
+
+def _with_list_at(data: Any, path: Tuple[Any, ...], items: List[Any]) -> Any:
+    """Copy of `data` with the list at `path` replaced by `items`."""
+    if not path:
+        return items
+    replaced = dict(data)
+    replaced[path[0]] = _with_list_at(data[path[0]], path[1:], items)
+    return replaced
+
+
+# Fields the model needs from list endpoints to answer and chain follow-up
+# calls; everything else (descriptions, timestamps, nested metadata) is dropped.
+_MODEL_ITEM_FIELDS: Dict[str, FrozenSet[str]] = {
+    "LINEAR_LIST_LINEAR_ISSUES": frozenset(
+        {
+            "id",
+            "identifier",
+            "title",
+            "state",
+            "assignee",
+            "priority",
+            "project",
+            "team",
+            "dueDate",
+            "url",
+        }
+    ),
+}
+
+
+def _summarize_for_model(tool_name: str, data: Any) -> Any:
+    """Project the items of a list result to the fields the model uses."""
+    fields = _MODEL_ITEM_FIELDS.get(normalize_tool_slug(tool_name))
+    if fields is None:
+        return data
+    path, items = _longest_list(data)
+    if not items:
+        return data
+    projected = [
+        {key: value for key, value in item.items() if key in fields}
+        if isinstance(item, dict)
+        else item
+        for item in items
+    ]
+    return _with_list_at(data, path, projected)
+
+
+def _trim_longest_list(data: Any, max_chars: int) -> Optional[Dict[str, Any]]:
+    """Keep as many leading items of the longest list as fit, so the payload stays valid JSON."""
+    path, items = _longest_list(data)
+    if not items:
+        return None
+
+    def fits(count: int) -> bool:
+        return len(_dumps_tool_result(_with_list_prefix(data, path, count), str)) <= max_chars
+
+    if not fits(0):
+        return None
+    low, high = 0, len(items) - 1
+    while low < high:
+        mid = (low + high + 1) // 2
+        if fits(mid):
+            low = mid
+        else:
+            high = mid - 1
+    return {
+        "result": _with_list_prefix(data, path, low),
+        "truncated": True,
+        "omitted_items": len(items) - low,
+    }
+
+
 def _build_tool_response_payload(result_data: Any, max_chars: int = 12000) -> Dict[str, Any]:
-    """Build a JSON-safe, size-limited response payload for tool results."""
+    """Build a JSON-safe, size-limited response payload for tool results.
+
+    Results are serialized once. JSON-native dicts/lists are passed through
+    as-is so the SDK maps them straight onto a structured function response;
+    only results holding non-JSON values are re-parsed from the serialized form.
+    Oversized list results keep their leading items instead of being cut mid-JSON.
+    """
+    if isinstance(result_data, str):
+        if len(result_data) > max_chars:
+            return {"result": result_data[:max_chars] + "...[truncated]", "truncated": True}
+        return {"result": result_data}
+
+    coerced = False
+
+    def _coerce(value: Any) -> str:
+        nonlocal coerced
+        coerced = True
+        return str(value)
+
     try:
-        safe_data = json.loads(json.dumps(result_data, ensure_ascii=True, default=str))
+        serialized = _dumps_tool_result(result_data, _coerce)
     except (TypeError, ValueError):
-        safe_data = str(result_data)
+        return _build_tool_response_payload(str(result_data), max_chars=max_chars)
 
-    if isinstance(safe_data, (dict, list)):
-        serialized = json.dumps(safe_data, ensure_ascii=True)
-        if len(serialized) > max_chars:
-            return {"result": serialized[:max_chars] + "...[truncated]", "truncated": True}
-        return {"result": safe_data}
+    if len(serialized) > max_chars and isinstance(result_data, (dict, list)):
+        safe_data = _loads_tool_result(serialized) if coerced else result_data
+        trimmed = _trim_longest_list(safe_data, max_chars)
+        if trimmed is not None:
+            return trimmed
+        return {"result": serialized[:max_chars] + "...[truncated]", "truncated": True}
 
+    safe_data = _loads_tool_result(serialized) if coerced else result_data
     if isinstance(safe_data, str) and len(safe_data) > max_chars:
         return {"result": safe_data[:max_chars] + "...[truncated]", "truncated": True}
-
     return {"result": safe_data}
 
 
@@ -133,17 +365,30 @@ class DispatchPhase(Enum):
     FINISHED = "finished"
 
 
+@dataclass(frozen=True, slots=True)
+class PendingAction:
+    """A model tool call waiting to be executed (reads) or confirmed (writes)."""
+
+    tool_name: str
+    args: Dict[str, Any]
+    tool_call_id: Optional[str]
+    app_id: str
+
+
 @dataclass
 class DispatcherContext:
     user_input: str
     user_id: str
+    stream_text: bool = False
+    # Normalized slugs of the tools declared to the model; None skips the check.
+    known_tools: Optional[AbstractSet[str]] = None
     max_iterations: int = 5
     iteration: int = 0
     response: Optional[Any] = None
     action_performed: Optional[str] = None
     write_action_executed: bool = False
-    pending_read_actions: List[Tuple] = field(default_factory=list)
-    pending_write_actions: List[Tuple] = field(default_factory=list)
+    pending_read_actions: List[PendingAction] = field(default_factory=list)
+    pending_write_actions: List[PendingAction] = field(default_factory=list)
     last_searching_app_id: Optional[str] = None
     completed_write_apps: set[str] = field(default_factory=set)
     app_read_status: Dict[str, str] = field(default_factory=dict)
@@ -159,11 +404,33 @@ class DispatcherContext:
     involved_apps: List[str] = field(default_factory=list)
     called_apps: set[str] = field(default_factory=set)
     proposal_queue: List[Dict[str, Any]] = field(default_factory=list)
-    current_read_action: Optional[Tuple] = None
     exit_early: bool = False
     confirmed_action_success: Optional[bool] = None
     confirmed_action_app_id: Optional[str] = None
     plain_text_retry_sent: bool = False
+    # Immutable copy of involved_apps shared by every event until it changes.
+    involved_apps_snapshot: Tuple[str, ...] = ()
+
+    def set_involved_apps(self, apps: List[str]) -> None:
+        self.involved_apps = list(apps)
+        self.involved_apps_snapshot = tuple(self.involved_apps)
+
+    def add_involved_app(self, app_id: str) -> bool:
+        """Record an app touched this turn; returns True if it was new."""
+        if app_id in self.involved_apps:
+            return False
+        self.involved_apps.append(app_id)
+        self.involved_apps_snapshot = tuple(self.involved_apps)
+        return True
+
+
+def _enrich_each(service) -> Callable[[str, List[Tuple[Dict[str, Any], str]]], List[Dict[str, Any]]]:
+    """Adapt a per-proposal enrich_proposal to the batched enricher signature."""
+
+    def enrich(user_id: str, proposals: List[Tuple[Dict[str, Any], str]]) -> List[Dict[str, Any]]:
+        return [service.enrich_proposal(user_id, args, tool_name) for args, tool_name in proposals]
+
+    return enrich
 
 
 class AgentDispatcher:
@@ -186,6 +453,29 @@ class AgentDispatcher:
         self.github_service = github_service
         self.gmail_service = gmail_service
         self.google_calendar_service = google_calendar_service
+        # Route write classification straight to the owning app's service.
+        self._write_classifiers: Dict[str, Callable[[str, Dict[str, Any]], bool]] = {
+            "linear": linear_service.is_write_action,
+            "slack": slack_service.is_write_action,
+            "notion": notion_service.is_write_action,
+            "github": github_service.is_write_action,
+            "gmail": gmail_service.is_write_action,
+            "google_calendar": google_calendar_service.is_write_action,
+        }
+        # Linear and Slack enrich a whole batch per call; the other apps have
+        # no shared lookups, so their proposals are enriched one by one.
+        self._proposal_enrichers: Dict[
+            str, Callable[[str, List[Tuple[Dict[str, Any], str]]], List[Dict[str, Any]]]
+        ] = {
+            "linear": linear_service.enrich_proposals,
+            "slack": slack_service.enrich_proposals,
+            "notion": _enrich_each(notion_service),
+            "github": _enrich_each(github_service),
+            "gmail": _enrich_each(gmail_service),
+            "google_calendar": _enrich_each(google_calendar_service),
+        }
+        # Final reply of the last run when it ended in a plain model answer.
+        self.completed_reply: Optional[str] = None
 
     @staticmethod
     def _response_has_nonempty_text(response: Any) -> bool:
@@ -201,10 +491,15 @@ class AgentDispatcher:
         chat,
         context: DispatcherContext,
     ) -> Generator[Dict, None, Optional[Any]]:
-        print(f"DEBUG: Sending user input to model: {context.user_input[:100]}...")
-        response, send_error = _send_message_with_retry(
-            lambda: chat.send_user_message(context.user_input)
-        )
+        logger.debug("Sending user input to model: %s...", context.user_input[:100])
+        if context.stream_text:
+            response, send_error = yield from _stream_message_with_retry(
+                lambda: chat.stream_user_message(context.user_input)
+            )
+        else:
+            response, send_error = _send_message_with_retry(
+                lambda: chat.send_user_message(context.user_input)
+            )
         if send_error is not None:  # noqa: BLE001 - surface rate limits to client
             if _is_rate_limit_error(send_error):
                 yield {
@@ -218,11 +513,12 @@ class AgentDispatcher:
                 return None
             raise send_error
 
-        if hasattr(response, "thoughts") and response.thoughts:
-            for thought in response.thoughts:
+        thoughts = getattr(response, "thoughts", None)
+        if thoughts:
+            for thought in thoughts:
                 if not thought:
                     continue
-                print(f"DEBUG: Model Thought: {thought}", flush=True)
+                logger.debug("Model Thought: %s", thought)
                 yield {
                     "type": "thinking",
                     "content": thought,
@@ -238,46 +534,28 @@ class AgentDispatcher:
         if not enabled:
             return
 
-        pre_detected_apps = detect_apps_from_input(context.user_input)
+        user_lower = context.user_input.lower()
+        pre_detected_apps = detect_apps_from_input(context.user_input, user_lower)
         if pre_detected_apps:
             context.required_apps = pre_detected_apps.copy()
 
         if len(pre_detected_apps) > 1:
-            print(f"DEBUG: Pre-detected multiple apps from user input: {pre_detected_apps}")
-            context.involved_apps = pre_detected_apps.copy()
-
-            app_actions = []
-            for app in pre_detected_apps:
-                if app == "linear":
-                    app_actions.append("create a ticket in Linear")
-                elif app == "slack":
-                    app_actions.append("notify the team on Slack")
-                elif app == "github":
-                    app_actions.append("check GitHub")
-                elif app == "notion":
-                    app_actions.append("look in Notion")
-                elif app == "gmail":
-                    app_actions.append("check Gmail")
-                elif app == "google_calendar":
-                    app_actions.append("check Google Calendar")
-
-            if len(app_actions) >= 2:
-                summary_text = f"I'll {app_actions[0]} and {app_actions[1]}."
-            else:
-                summary_text = f"I'll {' and '.join(app_actions)}."
+            logger.debug("Pre-detected multiple apps from user input: %s", pre_detected_apps)
+            context.set_involved_apps(pre_detected_apps)
 
+            summary_text = make_combined_early_summary(pre_detected_apps)
             context.early_summary_text = summary_text
             yield {
                 "type": "early_summary",
                 "content": summary_text,
                 "app_id": pre_detected_apps[0],
-                "involved_apps": context.involved_apps,
+                "involved_apps": context.involved_apps_snapshot,
             }
             context.early_summary_sent = True
-            print(f"DEBUG: Emitted combined early summary for {pre_detected_apps}")
+            logger.debug("Emitted combined early summary for %s", pre_detected_apps)
 
         context.should_nudge_for_tools = bool(pre_detected_apps) and looks_like_tool_request(
-            context.user_input
+            context.user_input, user_lower
         )
 
     def _execute_confirmed_tool(
@@ -291,11 +569,10 @@ class AgentDispatcher:
         tool_call_id = confirmed_tool.get("tool_call_id")
         app_id = confirmed_tool.get("app_id", map_tool_to_app(tool_name))
 
-        print(f"DEBUG: Executing CONFIRMED action: {tool_name}")
-        if app_id not in context.involved_apps:
-            context.involved_apps.append(app_id)
+        logger.debug("Executing CONFIRMED action: %s", tool_name)
+        context.add_involved_app(app_id)
         context.confirmed_action_app_id = app_id
-        executed_key = (tool_name, json.dumps(tool_args, sort_keys=True))
+        executed_key = (tool_name, _canonical_args(tool_args))
         context.executed_write_keys.add(executed_key)
         context.app_write_executing.add(app_id)
 
@@ -304,7 +581,7 @@ class AgentDispatcher:
             "type": "early_summary",
             "content": f"Executing your confirmed {app_display} action...",
             "app_id": app_id,
-            "involved_apps": context.involved_apps,
+            "involved_apps": context.involved_apps_snapshot,
         }
         context.early_summary_sent = True
 
@@ -314,22 +591,20 @@ class AgentDispatcher:
                 arguments=tool_args,
                 user_id=context.user_id,
             )
-            print(f"DEBUG: Confirmed tool result: {result}", flush=True)
+            logger.debug("Confirmed tool result: %s", result)
 
-            if hasattr(result, "data"):
-                result_data = result.data
-            else:
-                result_data = result
+            result_data = getattr(result, "data", result)
 
             result_success = True
-            if hasattr(result, "successful"):
-                result_success = bool(getattr(result, "successful"))
+            successful = getattr(result, "successful", _MISSING)
+            if successful is not _MISSING:
+                result_success = bool(successful)
             elif isinstance(result, dict):
                 if "successful" in result:
                     result_success = bool(result.get("successful"))
                 elif result.get("error") is not None:
                     result_success = False
-            if hasattr(result, "error") and getattr(result, "error", None) is not None:
+            if getattr(result, "error", None) is not None:
                 result_success = False
 
             if result_success:
@@ -355,10 +630,7 @@ class AgentDispatcher:
                 lambda: chat.send_tool_result(tool_name, response_payload, tool_call_id)
             )
             if send_error is not None:  # noqa: BLE001 - surface model errors to client
-                print(
-                    f"DEBUG: ❌ Model follow-up error after {tool_name}: {send_error}",
-                    flush=True,
-                )
+                logger.warning("Model follow-up error after %s: %s", tool_name, send_error)
                 if _is_rate_limit_error(send_error):
                     if result_success:
                         content = (
@@ -390,7 +662,7 @@ class AgentDispatcher:
                 }
                 return None
         except Exception as exec_error:  # noqa: BLE001 - emit error to stream
-            print(f"DEBUG: ❌ Confirmed tool execution error: {exec_error}", flush=True)
+            logger.warning("Confirmed tool execution error: %s", exec_error)
             context.app_write_executing.discard(app_id)
             context.completed_write_apps.discard(app_id)
             context.executed_write_keys.discard(executed_key)
@@ -407,35 +679,26 @@ class AgentDispatcher:
     def _queue_pending_write_actions(self, context: DispatcherContext) -> None:
         if not context.pending_write_actions:
             return
-        print(f"DEBUG: Emitting {len(context.pending_write_actions)} queued proposal(s)")
-
-        for (
-            tool_name,
-            args,
-            tool_call_id,
-            app_id,
-        ) in context.pending_write_actions:
-            enriched_args = args
-            if app_id == "linear":
-                enriched_args = self.linear_service.enrich_proposal(context.user_id, args, tool_name)
-            elif app_id == "slack":
-                enriched_args = self.slack_service.enrich_proposal(context.user_id, args, tool_name)
-            elif app_id == "notion":
-                enriched_args = self.notion_service.enrich_proposal(context.user_id, args, tool_name)
-            elif app_id == "github":
-                enriched_args = self.github_service.enrich_proposal(context.user_id, args, tool_name)
-            elif app_id == "gmail":
-                enriched_args = self.gmail_service.enrich_proposal(context.user_id, args, tool_name)
-            elif app_id == "google_calendar":
-                enriched_args = self.google_calendar_service.enrich_proposal(context.user_id, args, tool_name)
-
+        logger.debug("Emitting %s queued proposal(s)", len(context.pending_write_actions))
+
+        # Enrich each app's proposals in one call so ID lookups are shared.
+        proposals_by_app: Dict[str, List[Tuple[Dict[str, Any], str]]] = {}
+        for action in context.pending_write_actions:
+            proposals_by_app.setdefault(action.app_id, []).append((action.args, action.tool_name))
+        enriched_by_app: Dict[str, Iterator[Dict[str, Any]]] = {}
+        for app_id, proposals in proposals_by_app.items():
+            enrich = self._proposal_enrichers.get(app_id)
+            enriched = enrich(context.user_id, proposals) if enrich else [args for args, _ in proposals]
+            enriched_by_app[app_id] = iter(enriched)
+
+        for action in context.pending_write_actions:
             context.proposal_queue.append(
                 {
-                    "tool": tool_name,
-                    "args": enriched_args,
-                    "app_id": app_id,
-                    "tool_call_id": tool_call_id,
-                    "summary_text": make_early_summary(app_id),
+                    "tool": action.tool_name,
+                    "args": next(enriched_by_app[action.app_id]),
+                    "app_id": action.app_id,
+                    "tool_call_id": action.tool_call_id,
+                    "summary_text": make_early_summary(action.app_id),
                 }
             )
 
@@ -446,13 +709,10 @@ class AgentDispatcher:
             return
 
         total_proposals = len(context.proposal_queue)
-        print(f"DEBUG: Emitting {total_proposals} queued proposal(s)")
+        logger.debug("Emitting %s queued proposal(s)", total_proposals)
 
-        proposal_app_ids: List[str] = []
-        for proposal in context.proposal_queue:
-            app_id = proposal["app_id"]
-            if app_id not in proposal_app_ids:
-                proposal_app_ids.append(app_id)
+        # Distinct app ids in queue order.
+        proposal_app_ids = list(dict.fromkeys(p["app_id"] for p in context.proposal_queue))
 
         if len(proposal_app_ids) > 1:
             for app_id in proposal_app_ids:
@@ -465,14 +725,14 @@ class AgentDispatcher:
                     "tool": synthetic_tool,
                     "status": "searching",
                     "app_id": app_id,
-                    "involved_apps": context.involved_apps,
+                    "involved_apps": context.involved_apps_snapshot,
                 }
                 yield {
                     "type": "tool_status",
                     "tool": synthetic_tool,
                     "status": "done",
                     "app_id": app_id,
-                    "involved_apps": context.involved_apps,
+                    "involved_apps": context.involved_apps_snapshot,
                 }
 
         yield {
@@ -498,7 +758,7 @@ class AgentDispatcher:
                     "args": p["args"],
                     "tool_call_id": p.get("tool_call_id"),
                 }
-                for p in context.proposal_queue[1:]
+                for p in islice(context.proposal_queue, 1, None)
             ],
         }
 
@@ -518,105 +778,91 @@ class AgentDispatcher:
         )
 
     def _is_write_action(self, app_id: str, tool_name: str, args: Dict[str, Any]) -> bool:
-        if app_id == "linear":
-            return self.linear_service.is_write_action(tool_name, args)
-        if app_id == "slack":
-            return self.slack_service.is_write_action(tool_name, args)
-        if app_id == "notion":
-            return self.notion_service.is_write_action(tool_name, args)
-        if app_id == "github":
-            return self.github_service.is_write_action(tool_name, args)
-        if app_id == "gmail":
-            return self.gmail_service.is_write_action(tool_name, args)
-        if app_id == "google_calendar":
-            return self.google_calendar_service.is_write_action(tool_name, args)
-        return False
-
-    def _collect_actions_from_response(
+        classifier = self._write_classifiers.get(app_id)
+        if classifier is None:
+            return False
+        return classifier(tool_name, args)
+
+    @staticmethod
+    def _is_known_tool(context: DispatcherContext, tool_name: str) -> bool:
+        if context.known_tools is None:
+            return True
+        return normalize_tool_slug(tool_name) in context.known_tools
+
+    @staticmethod
+    def _linear_still_running(context: DispatcherContext) -> bool:
+        """True while a Linear read or write from this turn has not finished."""
+        if "linear" not in context.called_apps:
+            return False
+        linear_state = context.app_read_status.get("linear")
+        return linear_state not in ("done", "error") or "linear" in context.app_write_executing
+
+    def _collect_actions_from_tool_calls(
         self,
         context: DispatcherContext,
-        response: Any,
-    ) -> Generator[Dict, None, Tuple[bool, List[Tuple], List[Tuple]]]:
+        tool_calls: List[Any],
+    ) -> Generator[Dict, None, Tuple[bool, List[PendingAction], List[PendingAction]]]:
         read_actions_to_execute = context.pending_read_actions
         context.pending_read_actions = []
-        write_actions_found = []
-        found_function_call = False
-
-        if hasattr(response, "tool_calls") and response.tool_calls:
-            for tool_call in response.tool_calls:
-                found_function_call = True
-                tool_name = tool_call.name
-                args = tool_call.args or {}
-                tool_call_id = tool_call.call_id
-                print(f"DEBUG: Tool call: {tool_name}({args})", flush=True)
-
-                app_id = map_tool_to_app(tool_name)
-                is_new_app = app_id not in context.involved_apps
-                if is_new_app:
-                    context.involved_apps.append(app_id)
-                context.called_apps.add(app_id)
-
-                if not context.early_summary_sent:
-                    summary_text = make_early_summary(app_id)
-                    print(f"DEBUG: Emitting early summary for {app_id}: {summary_text}")
-                    yield {
-                        "type": "early_summary",
-                        "content": summary_text,
-                        "app_id": app_id,
-                        "involved_apps": context.involved_apps,
-                    }
-                    context.early_summary_sent = True
+        write_actions_found: List[PendingAction] = []
+        found_function_call = bool(tool_calls)
+        # Bound once; these run for every function call in the turn.
+        add_involved_app = context.add_involved_app
+        add_called_app = context.called_apps.add
+        is_known_tool = self._is_known_tool
+        is_write_action = self._is_write_action
+        queue_read = read_actions_to_execute.append
+        queue_write = write_actions_found.append
+        executed_write_keys = context.executed_write_keys
+
+        for tool_call in tool_calls:
+            tool_name = tool_call.name
+            args = tool_call.args or {}
+            tool_call_id = tool_call.call_id
+            logger.debug("Tool call: %s(%s)", tool_name, args)
+
+            app_id = map_tool_to_app(tool_name)
+            add_involved_app(app_id)
+            add_called_app(app_id)
+
+            if not context.early_summary_sent:
+                summary_text = make_early_summary(app_id)
+                logger.debug("Emitting early summary for %s: %s", app_id, summary_text)
+                yield {
+                    "type": "early_summary",
+                    "content": summary_text,
+                    "app_id": app_id,
+                    "involved_apps": context.involved_apps_snapshot,
+                }
+                context.early_summary_sent = True
 
-                is_write = self._is_write_action(app_id, tool_name, args)
-                mode = "write" if is_write else "read"
-                print(
-                    f"DEBUG: Classified tool {tool_name} for app={app_id} mode={mode}",
-                    flush=True,
-                )
-                executed_key = (tool_name, json.dumps(args, sort_keys=True))
-
-                if is_write:
-                    if executed_key in context.executed_write_keys:
-                        print(f"DEBUG: Skipping duplicate write proposal for {tool_name}")
-                        continue
-                    if app_id in context.completed_write_apps:
-                        print(f"DEBUG: Skipping write for completed app {app_id}")
-                        continue
-                    if app_id == "slack":
-                        linear_state = context.app_read_status.get("linear")
-                        if (
-                            "linear" in context.called_apps
-                            and (
-                                linear_state not in ("done", "error")
-                                or ("linear" in context.app_write_executing)
-                            )
-                        ):
-                            print("DEBUG: Gating Slack write until Linear read+write complete")
-                            continue
-
-                    print(f"DEBUG: Queueing {tool_name} for confirmation")
-                    write_actions_found.append(
-                        (
-                            tool_name,
-                            args,
-                            tool_call_id,
-                            app_id,
-                        )
-                    )
-                    context.executed_write_keys.add(executed_key)
-                else:
-                    if app_id == "slack":
-                        linear_state = context.app_read_status.get("linear")
-                        if (
-                            "linear" in context.called_apps
-                            and (
-                                linear_state not in ("done", "error")
-                                or ("linear" in context.app_write_executing)
-                            )
-                        ):
-                            print("DEBUG: Gating Slack read until Linear read+write complete")
-                            continue
-                    read_actions_to_execute.append((tool_name, args, tool_call_id, app_id))
+            # Unknown (hallucinated) tools are answered as failed reads so the
+            # model can correct itself without a proposal or a Composio call.
+            is_write = is_known_tool(context, tool_name) and is_write_action(
+                app_id, tool_name, args
+            )
+            mode = "write" if is_write else "read"
+            logger.debug("Classified tool %s for app=%s mode=%s", tool_name, app_id, mode)
+
+            if app_id == "slack" and self._linear_still_running(context):
+                logger.debug("Gating Slack %s until Linear read+write complete", mode)
+                continue
+
+            if not is_write:
+                queue_read(PendingAction(tool_name, args, tool_call_id, app_id))
+                continue
+
+            executed_key = (tool_name, _canonical_args(args))
+            if executed_key in executed_write_keys:
+                logger.debug("Skipping duplicate write proposal for %s", tool_name)
+                continue
+            if app_id in context.completed_write_apps:
+                logger.debug("Skipping write for completed app %s", app_id)
+                continue
+
+            logger.debug("Queueing %s for confirmation", tool_name)
+            queue_write(PendingAction(tool_name, args, tool_call_id, app_id))
+            executed_write_keys.add(executed_key)
 
         return found_function_call, read_actions_to_execute, write_actions_found
 
@@ -628,20 +874,26 @@ class AgentDispatcher:
         if context.iteration >= context.max_iterations:
             return DispatchPhase.FINISHED
 
-        found_function_call, read_actions_to_execute, write_actions_found = yield from (
-            self._collect_actions_from_response(context, context.response)
-        )
+        tool_calls = getattr(context.response, "tool_calls", None) or []
+        if tool_calls:
+            found_function_call, read_actions_to_execute, write_actions_found = yield from (
+                self._collect_actions_from_tool_calls(context, tool_calls)
+            )
+        else:
+            # Text-only turn: nothing to classify, only carry over queued reads.
+            found_function_call = False
+            write_actions_found = []
+            read_actions_to_execute = context.pending_read_actions
+            context.pending_read_actions = []
 
         if not found_function_call and context.iteration == 0:
-            print("DEBUG: Model responded with text only (no function calls)", flush=True)
+            logger.debug("Model responded with text only (no function calls)")
 
         if write_actions_found:
             context.pending_write_actions.extend(write_actions_found)
 
         if read_actions_to_execute:
-            context.current_read_action = read_actions_to_execute[0]
-            if len(read_actions_to_execute) > 1:
-                context.pending_read_actions.extend(read_actions_to_execute[1:])
+            context.pending_read_actions = read_actions_to_execute
             return DispatchPhase.EXECUTING_READ
 
         if context.pending_write_actions and not context.pending_read_actions:
@@ -681,10 +933,7 @@ class AgentDispatcher:
         if not found_function_call:
             if context.should_nudge_for_tools and not context.tool_nudge_sent:
                 context.tool_nudge_sent = True
-                print(
-                    "DEBUG: No function call detected; nudging model to use tools",
-                    flush=True,
-                )
+                logger.debug("No function call detected; nudging model to use tools")
                 nudge_text = (
                     "Use the available tools to complete the user's request. "
                     "If IDs are required, call list/search tools to resolve them first. "
@@ -719,10 +968,7 @@ class AgentDispatcher:
                 and not context.plain_text_retry_sent
             ):
                 context.plain_text_retry_sent = True
-                print(
-                    "DEBUG: Empty model response without tool calls; requesting plain-text retry",
-                    flush=True,
-                )
+                logger.debug("Empty model response without tool calls; requesting plain-text retry")
                 retry_text = (
                     "Provide a concise final answer to the user's request in plain text. "
                     "Do not call tools in this response."
@@ -755,114 +1001,153 @@ class AgentDispatcher:
                     "tool": "noop",
                     "status": "done",
                     "app_id": context.last_searching_app_id,
-                    "involved_apps": context.involved_apps,
+                    "involved_apps": context.involved_apps_snapshot,
                 }
-            print("DEBUG: No function call in response, breaking loop")
+            logger.debug("No function call in response, breaking loop")
             return DispatchPhase.FINISHED
 
         if not context.pending_write_actions and not context.pending_read_actions:
-            print("DEBUG: No actions to process, breaking loop")
+            logger.debug("No actions to process, breaking loop")
             return DispatchPhase.FINISHED
 
         return DispatchPhase.FINISHED
 
+    def _execute_read(
+        self,
+        tool_name: str,
+        tool_args: Dict[str, Any],
+        context: DispatcherContext,
+    ) -> Tuple[Dict[str, Any], str]:
+        """Execute one READ tool and return (model payload, UI status)."""
+        if not self._is_known_tool(context, tool_name):
+            logger.warning("Model called undeclared tool %s", tool_name)
+            return {
+                "error": f"Unknown tool {tool_name}. Call one of the declared tools instead."
+            }, "error"
+
+        logger.debug("Executing READ: %s", tool_name)
+        try:
+            result = self.composio_service.execute_tool(
+                slug=tool_name,
+                arguments=tool_args,
+                user_id=context.user_id,
+            )
+            logger.debug("Tool execution result: %s", result)
+
+            result_data = getattr(result, "data", result)
+            result_success = bool(getattr(result, "successful", True))
+
+            return (
+                _build_tool_response_payload(_summarize_for_model(tool_name, result_data)),
+                "done" if result_success else "error",
+            )
+        except Exception as exec_error:  # noqa: BLE001 - emit error to stream
+            logger.warning("Tool execution error: %s", exec_error)
+            return {"error": str(exec_error)}, "error"
+
+    def _execute_read_batch(
+        self,
+        read_actions: List[PendingAction],
+        context: DispatcherContext,
+    ) -> List[Tuple[Dict[str, Any], str]]:
+        """Execute a batch of READ tools and return their results in call order."""
+        # The model sometimes repeats an identical read within one turn; each
+        # distinct call goes to Composio once and its result is shared.
+        distinct_calls: Dict[Tuple[str, Union[bytes, str]], Tuple[str, Dict[str, Any]]] = {}
+        call_keys: List[Tuple[str, Union[bytes, str]]] = []
+        for action in read_actions:
+            key = (normalize_tool_slug(action.tool_name), _canonical_args(action.args))
+            distinct_calls.setdefault(key, (action.tool_name, action.args))
+            call_keys.append(key)
+
+        # Distinct reads are independent of each other, so run them concurrently.
+        calls = list(distinct_calls.values())
+        if len(calls) > 1:
+            with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_READS, len(calls))) as executor:
+                results = list(
+                    executor.map(lambda call: self._execute_read(call[0], call[1], context), calls)
+                )
+        else:
+            results = [self._execute_read(calls[0][0], calls[0][1], context)]
+
+        results_by_key = dict(zip(distinct_calls, results))
+        return [results_by_key[key] for key in call_keys]
+
     def _handle_read(
         self,
         chat,
         context: DispatcherContext,
     ) -> Generator[Dict, None, DispatchPhase]:
-        if not context.current_read_action and not context.pending_read_actions:
+        if not context.pending_read_actions:
             return DispatchPhase.PLANNING
 
-        read_actions: List[Tuple] = []
-        if context.current_read_action:
-            read_actions.append(context.current_read_action)
-        if context.pending_read_actions:
-            read_actions.extend(context.pending_read_actions)
-        context.current_read_action = None
+        read_actions = context.pending_read_actions
         context.pending_read_actions = []
 
         if len(read_actions) > 1:
-            print(f"DEBUG: Executing {len(read_actions)} READ actions in batch", flush=True)
+            logger.debug("Executing %s READ actions in batch", len(read_actions))
 
-        response: Optional[Any] = None
-        for tool_name, tool_args, tool_call_id, app_id in read_actions:
-            context.apps_with_tool_status.add(app_id)
+        for action in read_actions:
+            context.apps_with_tool_status.add(action.app_id)
             yield {
                 "type": "tool_status",
-                "tool": tool_name,
+                "tool": action.tool_name,
                 "status": "searching",
-                "app_id": app_id,
-                "involved_apps": context.involved_apps,
+                "app_id": action.app_id,
+                "involved_apps": context.involved_apps_snapshot,
             }
-            context.last_searching_app_id = app_id
-
-            print(f"DEBUG: Executing READ: {tool_name}", flush=True)
-
-            try:
-                result = self.composio_service.execute_tool(
-                    slug=tool_name,
-                    arguments=tool_args,
-                    user_id=context.user_id,
-                )
-                print(f"DEBUG: Tool execution result: {result}", flush=True)
-
-                if hasattr(result, "data"):
-                    result_data = result.data
-                    result_success = getattr(result, "successful", True)
-                else:
-                    result_data = result
-                    result_success = bool(getattr(result, "successful", True))
-
-                response_payload = _build_tool_response_payload(result_data)
-                status_after_read = "done" if result_success else "error"
+            context.last_searching_app_id = action.app_id
 
-            except Exception as exec_error:  # noqa: BLE001 - emit error to stream
-                print(f"DEBUG: ❌ Tool execution error: {exec_error}", flush=True)
-                response_payload = {"error": str(exec_error)}
-                status_after_read = "error"
+        read_results = self._execute_read_batch(read_actions, context)
 
-            context.app_read_status[app_id] = status_after_read
-            context.apps_with_tool_status.add(app_id)
+        tool_results: List[ToolResult] = []
+        for action, read_result in zip(read_actions, read_results):
+            response_payload, status_after_read = read_result
+            context.app_read_status[action.app_id] = status_after_read
+            context.apps_with_tool_status.add(action.app_id)
             yield {
                 "type": "tool_status",
-                "tool": tool_name,
+                "tool": action.tool_name,
                 "status": status_after_read,
-                "app_id": app_id,
-                "involved_apps": context.involved_apps,
+                "app_id": action.app_id,
+                "involved_apps": context.involved_apps_snapshot,
             }
+            tool_results.append(ToolResult(action.tool_name, response_payload, action.tool_call_id))
 
+        # All results go back in one turn, so the model replies once per batch.
+        if context.stream_text:
+            response, send_error = yield from _stream_message_with_retry(
+                lambda: chat.stream_tool_results(tool_results)
+            )
+        else:
             response, send_error = _send_message_with_retry(
-                lambda: chat.send_tool_result(tool_name, response_payload, tool_call_id)
+                lambda: chat.send_tool_results(tool_results)
             )
-            if send_error is not None:  # noqa: BLE001 - surface model errors to client
-                print(
-                    f"DEBUG: ❌ Model follow-up error after read batch: {send_error}",
-                    flush=True,
+        if send_error is not None:  # noqa: BLE001 - surface model errors to client
+            logger.warning("Model follow-up error after read batch: %s", send_error)
+            if _is_rate_limit_error(send_error):
+                content = (
+                    "I fetched the requested data, but I'm temporarily rate-limited "
+                    "and couldn't continue. Please retry in a minute."
                 )
-                if _is_rate_limit_error(send_error):
-                    content = (
-                        "I fetched the requested data, but I'm temporarily rate-limited "
-                        "and couldn't continue. Please retry in a minute."
-                    )
-                else:
-                    content = (
-                        "I fetched the requested data, but couldn't continue due to a model error. "
-                        "Please retry."
-                    )
-                if context.pending_write_actions:
-                    self._queue_pending_write_actions(context)
-                if context.proposal_queue:
-                    yield from self._emit_proposal_queue(context)
-                    context.exit_early = True
-                    return DispatchPhase.FINISHED
-                yield {
-                    "type": "message",
-                    "content": content,
-                    "action_performed": None,
-                }
+            else:
+                content = (
+                    "I fetched the requested data, but couldn't continue due to a model error. "
+                    "Please retry."
+                )
+            if context.pending_write_actions:
+                self._queue_pending_write_actions(context)
+            if context.proposal_queue:
+                yield from self._emit_proposal_queue(context)
                 context.exit_early = True
                 return DispatchPhase.FINISHED
+            yield {
+                "type": "message",
+                "content": content,
+                "action_performed": None,
+            }
+            context.exit_early = True
+            return DispatchPhase.FINISHED
 
         context.response = response
         context.iteration += 1
@@ -874,18 +1159,36 @@ class AgentDispatcher:
         user_input: str,
         user_id: str,
         confirmed_tool: Optional[Dict] = None,
+        stream_text: bool = False,
+        known_tools: Optional[AbstractSet[str]] = None,
     ) -> Generator[Dict, None, None]:
-        """Run the streaming loop and yield UI events."""
+        """Run the streaming loop and yield UI events.
+
+        With `stream_text`, model answer text is also emitted as `message_delta`
+        events while it is generated. Deltas are provisional: the closing
+        `message` event always carries the authoritative final text.
+
+        `known_tools` holds the normalized slugs declared to the model; calls to
+        any other tool are answered with an error instead of reaching Composio.
+        """
+        self.completed_reply = None
         try:
-            context = DispatcherContext(user_input=user_input, user_id=user_id)
+            context = DispatcherContext(
+                user_input=user_input,
+                user_id=user_id,
+                stream_text=stream_text,
+                known_tools=known_tools,
+            )
+
+            # Derived from the user input alone, so it reaches the client before
+            # the first (slowest) model round-trip instead of after it.
+            yield from self._emit_pre_detected_summary(context, confirmed_tool is None)
 
             response = yield from self._send_initial_message(chat, context)
             if response is None:
                 return
             context.response = response
 
-            yield from self._emit_pre_detected_summary(context, confirmed_tool is None)
-
             if confirmed_tool:
                 response = yield from self._execute_confirmed_tool(
                     chat,
@@ -931,14 +1234,11 @@ class AgentDispatcher:
             if context.response is None:
                 return
 
-            if hasattr(context.response, "text"):
-                final_text = (context.response.text or "").strip()
+            response_text = getattr(context.response, "text", _MISSING)
+            if response_text is not _MISSING:
+                final_text = (response_text or "").strip()
             else:
-                final_text = (
-                    str(context.response).strip()
-                    if context.response is not None
-                    else ""
-                )
+                final_text = str(context.response).strip()
 
             # Keep client UI stable: always emit a non-empty final message.
             if not final_text:
@@ -948,6 +1248,8 @@ class AgentDispatcher:
                     final_text = (
                         "I couldn't generate a complete response. Please try again."
                     )
+            else:
+                self.completed_reply = final_text
             yield {
                 "type": "message",
                 "content": final_text,
@@ -955,7 +1257,7 @@ class AgentDispatcher:
             }
 
         except Exception as exc:  # noqa: BLE001 - surface error to client
-            print(f"Error in agent execution: {exc}")
+            logger.exception("Error in agent execution: %s", exc)
             yield {
                 "type": "message",
                 "content": f"An error occurred: {str(exc)}",
@@ -1,12 +1,15 @@
 """Gemini configuration helpers for the agent."""
 
+import logging
+import textwrap
 from typing import List, Tuple, Optional
 from google.genai import types
 
-from utils.chat_utils import format_history
 from utils.tool_converter import convert_to_gemini_tools
 
-SYSTEM_INSTRUCTION = """
+logger = logging.getLogger(__name__)
+
+SYSTEM_INSTRUCTION = textwrap.dedent("""
     You are Caddy, an advanced autonomous agent capable of interacting with external apps (Linear, Slack, GitHub, Gmail, Google Calendar, etc.) on behalf of the user.
 
     ### THE GOLDEN RULE: RESOLVE BEFORE YOU REJECT
@@ -30,6 +33,7 @@ SYSTEM_INSTRUCTION = """
         *   **GitHub:** Use GitHub search/list tools to resolve repository, issue, or PR IDs.
         *   **Gmail:** Use `gmail_fetch_emails` or `gmail_list_threads` to locate messages; use `gmail_get_profile` for sender info.
         *   **Google Calendar:** Use `googlecalendar_list_calendars` to find calendar IDs; use `googlecalendar_events_list` or `googlecalendar_find_event` to locate events.
+        *   **Need several IDs?** Call ALL the search tools you need (e.g. `linear_list_linear_projects` AND `linear_list_linear_teams`) in a SINGLE turn as parallel function calls. Do not chain them one per turn.
         *   Execute the search.
         *   Extract the ID from the result.
         *   **THEN** proceed to step 5.
@@ -70,7 +74,6 @@ SYSTEM_INSTRUCTION = """
     **Slack:**
     *   Find Channel ID: `slack_list_all_channels` or `slack_list_conversations` (filter by name)
     *   Find User ID: `slack_list_all_users` (filter by name/email)
-    *   Find User ID: `slack_list_all_users` (filter by name/email)
     *   Send Message: `slack_send_message` (requires channel ID)
     *   Read History: `slack_fetch_conversation_history` (requires channel ID)
 
@@ -114,7 +117,20 @@ SYSTEM_INSTRUCTION = """
 
     ### FINAL INSTRUCTION
     Be concise. Don't tell the user you are searching. Just do the search, get the ID, and execute the tool.
+    """).strip()
+
+
+def user_context_text(user_context: Optional[str] = None) -> Optional[str]:
     """
+    Return the user context block, or None without context.
+
+    The block is sent with the user's message, after the history, so the
+    system instruction stays byte-identical across users and turns and the
+    prompt prefix can be cached.
+    """
+    if not user_context:
+        return None
+    return f"### USER CONTEXT\n{user_context}"
 
 
 def build_gemini_tools(composio_tools) -> Tuple[List[types.Tool], int]:
@@ -125,32 +141,9 @@ def build_gemini_tools(composio_tools) -> Tuple[List[types.Tool], int]:
     if gemini_tools and gemini_tools[0].function_declarations:
         declarations = gemini_tools[0].function_declarations
         num_declarations = len(declarations)
-        slack_tool_names = [d.name for d in declarations if d.name.lower().startswith("slack_")]
-        print(f"DEBUG: Slack tools available to Gemini: {slack_tool_names}", flush=True)
+        if logger.isEnabledFor(logging.DEBUG):
+            slack_tool_names = [d.name for d in declarations if d.name.lower().startswith("slack_")]
+            logger.debug("Slack tools available to Gemini: %s", slack_tool_names)
 
-    print(f"DEBUG: Passing {num_declarations} function declarations to Gemini config", flush=True)
+    logger.debug("Passing %s function declarations to Gemini config", num_declarations)
     return gemini_tools, num_declarations
-
-
-def create_chat(
-    client,
-    gemini_tools,
-    chat_history,
-    user_context: Optional[str] = None,
-    model: str = "gemini-3-flash-preview",
-):
-    """Create a Gemini chat with tools and system instruction."""
-    formatted_history = format_history(chat_history)
-    system_instruction = SYSTEM_INSTRUCTION
-    if user_context:
-        system_instruction = f"{SYSTEM_INSTRUCTION}\n\n### USER CONTEXT\n{user_context}"
-    config = types.GenerateContentConfig(
-        tools=gemini_tools,
-        system_instruction=system_instruction,
-        thinking_config=types.ThinkingConfig(include_thoughts=True),
-    )
-    return client.chats.create(
-        model=model,
-        config=config,
-        history=formatted_history,
-    )
@@ -1,7 +1,36 @@
 """Helper for loading Composio tools across apps."""
 
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import Dict, List, Optional, Tuple
 
+logger = logging.getLogger(__name__)
+
+_APP_COUNT = 6
+# Shared across requests so a turn does not start and join new threads; sized
+# so every concurrent chat (see main._AGENT_POOL) can load all apps at once.
+_TOOL_LOADER_POOL = ThreadPoolExecutor(
+    max_workers=int(os.getenv("AGENT_MAX_CONCURRENT_CHATS", "64")) * _APP_COUNT,
+    thread_name_prefix="tool-loader",
+)
+# A stalled app is reported as an error instead of holding up the turn. The
+# clock starts when the load starts running, not while it waits for a worker;
+# waiting for a worker is bounded by the same amount separately.
+_TOOL_LOAD_TIMEOUT_SECONDS = 20
+
+
+def _result_once_started(
+    future: Future, started: threading.Event, started_at: Dict[str, float], app_name: str
+) -> List:
+    """Wait for a load, timing it from when it started running."""
+    if not started.wait(_TOOL_LOAD_TIMEOUT_SECONDS):
+        raise FutureTimeoutError()
+    deadline = started_at[app_name] + _TOOL_LOAD_TIMEOUT_SECONDS
+    return future.result(timeout=max(0.0, deadline - time.monotonic()))
+
 
 def _normalize_app_name(app_name: str) -> str:
     normalized = app_name.lower().replace("-", "_").replace(" ", "_")
@@ -24,8 +53,8 @@ def load_composio_tools(
     intent_scope: Optional[Dict[str, str]] = None,
 ) -> Tuple[List, List[str]]:
     """
-    Load Linear, Slack, Notion, GitHub, Gmail, and Google Calendar tools,
-    collecting any errors.
+    Load Linear, Slack, Notion, GitHub, Gmail, and Google Calendar tools
+    concurrently, collecting any errors.
 
     Returns:
         (tools, errors)
@@ -62,99 +91,80 @@ def load_composio_tools(
             if tools:
                 return tools
             if requested_scope != "full":
-                print(
-                    f"DEBUG: No tools loaded for {app_name} scope={requested_scope}. "
-                    "Retrying with full scope."
+                logger.debug(
+                    "No tools loaded for %s scope=%s. Retrying with full scope.",
+                    app_name,
+                    requested_scope,
                 )
                 return loader("full")
             return tools
         except Exception as scoped_exc:  # noqa: BLE001
             if requested_scope != "full":
-                print(
-                    f"DEBUG: Scoped tool load failed for {app_name} "
-                    f"(scope={requested_scope}): {scoped_exc}. Retrying full scope."
+                logger.warning(
+                    "Scoped tool load failed for %s (scope=%s): %s. Retrying full scope.",
+                    app_name,
+                    requested_scope,
+                    scoped_exc,
                 )
                 return loader("full")
             raise
 
-    if should_load("linear"):
-        try:
-            linear_tools = load_with_fallback(
-                "linear",
-                lambda scope: linear_service.load_tools(user_id=user_id, scope=scope),
-            )
-            if linear_tools:
-                all_composio_tools.extend(linear_tools)
-                print(f"DEBUG: Loaded {len(linear_tools)} Linear tools")
-        except Exception as exc:  # noqa: BLE001 - surfaced to caller via errors list
-            print(f"DEBUG: Error fetching Linear tools: {exc}")
-            errors.append(f"Linear: {str(exc)}")
-
-    if should_load("slack"):
-        try:
-            slack_tools = load_with_fallback(
-                "slack",
-                lambda scope: slack_service.load_tools(user_id=user_id, scope=scope),
-            )
-            if slack_tools:
-                all_composio_tools.extend(slack_tools)
-                print(f"DEBUG: Loaded {len(slack_tools)} Slack tools")
-        except Exception as exc:  # noqa: BLE001 - surfaced to caller via errors list
-            print(f"DEBUG: Error fetching Slack tools: {exc}")
-            errors.append(f"Slack: {str(exc)}")
-
-    if should_load("notion"):
-        try:
-            notion_tools = load_with_fallback(
-                "notion",
-                lambda scope: notion_service.load_tools(user_id=user_id, scope=scope),
-            )
-            if notion_tools:
-                all_composio_tools.extend(notion_tools)
-                print(f"DEBUG: Loaded {len(notion_tools)} Notion tools")
-        except Exception as exc:  # noqa: BLE001 - surfaced to caller via errors list
-            print(f"DEBUG: Error fetching Notion tools: {exc}")
-            errors.append(f"Notion: {str(exc)}")
-
-    if should_load("github"):
-        try:
-            github_tools = load_with_fallback(
-                "github",
-                lambda scope: github_service.load_tools(user_id=user_id, scope=scope),
-            )
-            if github_tools:
-                all_composio_tools.extend(github_tools)
-                print(f"DEBUG: Loaded {len(github_tools)} GitHub tools")
-        except Exception as exc:  # noqa: BLE001 - surfaced to caller via errors list
-            print(f"DEBUG: Error fetching GitHub tools: {exc}")
-            errors.append(f"GitHub: {str(exc)}")
-
-    if should_load("gmail"):
-        try:
-            gmail_tools = load_with_fallback(
-                "gmail",
-                lambda scope: gmail_service.load_tools(user_id=user_id, scope=scope),
-            )
-            if gmail_tools:
-                all_composio_tools.extend(gmail_tools)
-                print(f"DEBUG: Loaded {len(gmail_tools)} Gmail tools")
-        except Exception as exc:  # noqa: BLE001 - surfaced to caller via errors list
-            print(f"DEBUG: Error fetching Gmail tools: {exc}")
-            errors.append(f"Gmail: {str(exc)}")
-
-    if should_load("google_calendar"):
+    apps = [
+        ("linear", "Linear", linear_service),
+        ("slack", "Slack", slack_service),
+        ("notion", "Notion", notion_service),
+        ("github", "GitHub", github_service),
+        ("gmail", "Gmail", gmail_service),
+        ("google_calendar", "Google Calendar", google_calendar_service),
+    ]
+    apps = [app for app in apps if should_load(app[0])]
+
+    started_at: Dict[str, float] = {}
+    started = {app_name: threading.Event() for app_name, _, _ in apps}
+
+    def load_app(app_name: str, service) -> List:
+        started_at[app_name] = time.monotonic()
+        started[app_name].set()
+        return load_with_fallback(
+            app_name,
+            lambda scope: service.load_tools(user_id=user_id, scope=scope),
+        )
+
+    if not apps:
+        return all_composio_tools, errors
+
+    def collect(display_name: str, get_tools, future: Optional[Future] = None) -> None:
         try:
-            calendar_tools = load_with_fallback(
-                "google_calendar",
-                lambda scope: google_calendar_service.load_tools(
-                    user_id=user_id, scope=scope
-                ),
-            )
-            if calendar_tools:
-                all_composio_tools.extend(calendar_tools)
-                print(f"DEBUG: Loaded {len(calendar_tools)} Google Calendar tools")
+            app_tools = get_tools()
+            if app_tools:
+                all_composio_tools.extend(app_tools)
+                logger.debug("Loaded %s %s tools", len(app_tools), display_name)
+        except FutureTimeoutError:
+            if future is not None:
+                # Frees the slot if the load never got a worker.
+                future.cancel()
+            logger.warning("Timed out fetching %s tools", display_name)
+            errors.append(f"{display_name}: timed out loading tools")
         except Exception as exc:  # noqa: BLE001 - surfaced to caller via errors list
-            print(f"DEBUG: Error fetching Google Calendar tools: {exc}")
-            errors.append(f"Google Calendar: {str(exc)}")
+            logger.warning("Error fetching %s tools: %s", display_name, exc)
+            errors.append(f"{display_name}: {str(exc)}")
+
+    if len(apps) == 1:
+        app_name, display_name, service = apps[0]
+        collect(display_name, lambda: load_app(app_name, service))
+        return all_composio_tools, errors
+
+    # Each app is a separate Composio round-trip, so fetch them concurrently and
+    # merge in the fixed app order above.
+    futures = [
+        (app_name, display_name, _TOOL_LOADER_POOL.submit(load_app, app_name, service))
+        for app_name, display_name, service in apps
+    ]
+    for app_name, display_name, future in futures:
+        collect(
+            display_name,
+            lambda: _result_once_started(future, started[app_name], started_at, app_name),
+            future,
+        )
 
     return all_composio_tools, errors
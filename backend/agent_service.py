@@ -1,5 +1,6 @@
+import logging
 import os
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Literal, Optional, Any
 from dotenv import load_dotenv
 
 from agent.common import (
@@ -11,17 +12,28 @@ from agent.common import (
 )
 from agent.dispatcher import AgentDispatcher
 from agent.tool_loader import load_composio_tools
-from llm.router import create_chat_session, ModelConfigError
+from llm.router import (
+    BatchJobNotFound,
+    create_chat_session,
+    get_batch_result,
+    retain_chat_session,
+    submit_batch,
+    warm_up_model,
+    ModelConfigError,
+)
 from services.composio_service import ComposioService
+from services.composio_tool_aliases import normalize_tool_slug
 from services.github_service import GitHubService
 from services.gmail_service import GmailService
 from services.google_calendar_service import GoogleCalendarService
 from services.linear_service import LinearService
 from services.notion_service import NotionService
 from services.slack_service import SlackService
+from utils.tool_converter import tool_fingerprint
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
 
 class AgentService:
     """Main agent service for orchestrating conversations with Composio tools."""
@@ -50,6 +62,8 @@ class AgentService:
         user_timezone: str | None = None,
         model_config: Optional[Any] = None,
         fallback_api_key: Optional[str] = None,
+        stream_text: bool = False,
+        service_tier: Literal["standard", "priority", "flex"] | None = None,
     ):
         """
         Runs the agent with the given user input and user_id.
@@ -58,14 +72,20 @@ class AgentService:
             confirmed_tool: If provided, executes ONLY this specific action:
                             {"tool": "TOOL_NAME", "args": {...}, "app_id": "linear"}
                             Then queues any subsequent write actions for next confirmation.
+            stream_text: If True, also emits "message_delta" events while the
+                         model's answer is generated.
+            service_tier: Gemini service tier for this chat; "priority" for
+                          latency-sensitive UI, "flex" for cheaper background
+                          runs. None uses the API default (standard).
         
         Yields events:
         - {"type": "tool_status", "tool": "ToolName", "status": "searching", "involved_apps": [...]}
         - {"type": "multi_app_status", "apps": [...], "active_app": "..."}
         - {"type": "proposal", "tool": "ToolName", "content": {...}, "proposal_index": 0, "total_proposals": 2}
+        - {"type": "message_delta", "content": "partial text"} (only with stream_text)
         - {"type": "message", "content": "Final response"}
         """
-        print(f"Running agent for user: {user_id} with input: {user_input}")
+        logger.debug("Running agent for user: %s with input: %s", user_id, user_input)
 
         # Fast path for capabilities/help prompts: avoid token-heavy model responses.
         if not confirmed_tool and is_capabilities_query(user_input):
@@ -77,8 +97,11 @@ class AgentService:
             return
 
         # 1. Get tools for the user (Linear, Slack, Notion, GitHub, Gmail, Calendar)
-        required_apps = detect_apps_from_input(user_input)
-        intent_scope = detect_intent_scope(user_input, required_apps=required_apps)
+        user_lower = user_input.lower()
+        required_apps = detect_apps_from_input(user_input, user_lower)
+        intent_scope = detect_intent_scope(
+            user_input, required_apps=required_apps, user_lower=user_lower
+        )
         if confirmed_tool:
             confirmed_app = confirmed_tool.get("app_id") or map_tool_to_app(
                 confirmed_tool.get("tool", "")
@@ -110,6 +133,9 @@ class AgentService:
             }
             return
 
+        # Names the model may call; None when some tool has no readable name
+        declared_names = tool_fingerprint(all_composio_tools)
+
         # 2. Start Chat
         user_context = None
         if user_timezone:
@@ -121,6 +147,9 @@ class AgentService:
                 tools=all_composio_tools,
                 history=chat_history,
                 user_context=user_context,
+                session_id=user_id,
+                service_tier=service_tier,
+                tools_fingerprint=declared_names,
             )
         except ModelConfigError as exc:
             yield {
@@ -130,6 +159,13 @@ class AgentService:
             }
             return
 
+        # 3. Tools the dispatcher will execute
+        known_tools = (
+            frozenset(normalize_tool_slug(name) for name in declared_names)
+            if declared_names is not None
+            else None
+        )
+
         # 4. Delegate streaming loop
         dispatcher = AgentDispatcher(
             composio_service=self.composio_service,
@@ -145,4 +181,92 @@ class AgentService:
             user_input=user_input,
             user_id=user_id,
             confirmed_tool=confirmed_tool,
+            stream_text=stream_text,
+            known_tools=known_tools,
+        )
+
+        # 5. Keep the chat for the next turn if it ended on a plain answer
+        if dispatcher.completed_reply is not None:
+            retain_chat_session(
+                user_id,
+                chat,
+                list(chat_history)
+                + [
+                    {"role": "user", "parts": user_input},
+                    {"role": "model", "parts": dispatcher.completed_reply},
+                ],
+            )
+
+    def warmup(self, user_id: str | None = None) -> None:
+        """
+        Pays first-request setup costs ahead of time: Composio and Gemini
+        connections, the tool manifest cache, and the converted Gemini config.
+
+        Args:
+            user_id: User whose tools to pre-load; defaults to COMPOSIO_USER_ID.
+                     Without one, a placeholder user still warms connections
+                     and tool conversion, which is shared across users.
+        """
+        user_id = user_id or os.getenv("COMPOSIO_USER_ID", "").strip() or "__warmup__"
+        tools, errors = load_composio_tools(
+            self.linear_service,
+            self.slack_service,
+            self.notion_service,
+            self.github_service,
+            self.gmail_service,
+            self.google_calendar_service,
+            user_id,
+        )
+        if errors:
+            logger.warning("Warmup could not load some tools: %s", "; ".join(errors))
+        try:
+            warm_up_model(fallback_api_key=self.api_key, tools=tools)
+        except Exception as exc:  # noqa: BLE001 - warmup is best effort
+            logger.warning("Warmup could not reach Gemini: %s", exc)
+
+    def submit_batch(
+        self,
+        user_requests: List[Dict[str, Any]],
+        user_id: str,
+        user_timezone: str | None = None,
+        model_config: Optional[Any] = None,
+        fallback_api_key: Optional[str] = None,
+    ) -> str:
+        """
+        Queues non-urgent requests on the Gemini Batch API at half price.
+
+        Args:
+            user_requests: [{"key": "...", "input": "...", "history": [...]}];
+                           each is answered once, without running tools.
+            user_id: Owner of the job; only they can poll it.
+
+        Returns:
+            The batch job name to poll with get_batch_result.
+        """
+        user_context = f"User timezone: {user_timezone}." if user_timezone else None
+        job_name = submit_batch(
+            model_config=model_config,
+            fallback_api_key=fallback_api_key or self.api_key,
+            requests=user_requests,
+            user_context=user_context,
+            owner=user_id,
+        )
+        return job_name
+
+    def get_batch_result(
+        self,
+        job_name: str,
+        user_id: str,
+        fallback_api_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Returns the batch job state and, once it succeeded, results by request key.
+
+        Raises:
+            BatchJobNotFound: The job does not exist or was not submitted by `user_id`
+        """
+        return get_batch_result(
+            job_name,
+            fallback_api_key=fallback_api_key or self.api_key,
+            owner=user_id,
         )
@@ -1,5 +1,4 @@
-from composio import Composio, App
-import os
+from composio import Composio
 from dotenv import load_dotenv
 
 load_dotenv()
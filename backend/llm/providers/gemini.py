@@ -2,16 +2,26 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
-
+import logging
+import os
+import itertools
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Generator, Iterator, List, Optional, Tuple
+
+import httpx
 from google import genai
+from google.genai import errors as genai_errors
 from google.genai import types
 
-from agent.gemini_config import SYSTEM_INSTRUCTION
+from agent.gemini_config import SYSTEM_INSTRUCTION, user_context_text
 from utils.chat_utils import format_history
-from utils.tool_converter import convert_to_gemini_tools
-from llm.types import LLMChat, LLMResponse, ToolCall
+from utils.tool_converter import convert_to_gemini_tools, tool_fingerprint
+from llm.types import LLMChat, LLMResponse, ToolCall, ToolResult
 
+logger = logging.getLogger(__name__)
 
 DEFAULT_MODEL = "gemini-3-flash-preview"
 FALLBACK_MODELS = (
@@ -20,6 +30,8 @@ FALLBACK_MODELS = (
     "gemini-2.5-flash-lite",
     "gemini-2.5-pro",
 )
+# Responses with more parts than this are logged; usually a runaway tool fan-out.
+_MANY_PARTS_WARNING = 16
 MODEL_ALIAS_MAP = {
     "gemini-3-flash": "gemini-3-flash-preview",
 }
@@ -33,10 +45,237 @@ NON_CHAT_MODEL_KEYWORDS = (
 )
 
 
+# API statuses worth retrying: rate limits and server-side failures.
+_TRANSIENT_STATUSES = frozenset(
+    {"RESOURCE_EXHAUSTED", "UNAVAILABLE", "INTERNAL", "DEADLINE_EXCEEDED"}
+)
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """Whether a failed Gemini call may succeed on retry (429, 5xx, timeouts, dropped connections)."""
+    if isinstance(exc, genai_errors.APIError):
+        code = exc.code or 0
+        return code == 429 or code >= 500 or exc.status in _TRANSIENT_STATUSES
+    return isinstance(exc, (httpx.TransportError, TimeoutError, ConnectionError))
+
+
+# Requests may bring their own API keys, so keep only the most recently used
+# clients; chats still holding an evicted client keep working.
+_CLIENT_CACHE_SIZE = 32
+_CLIENTS: "OrderedDict[str, genai.Client]" = OrderedDict()
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_client(api_key: str) -> genai.Client:
+    """Return the shared client for an API key, creating it on first use."""
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(api_key)
+        if client is None:
+            client = genai.Client(api_key=api_key)
+            _CLIENTS[api_key] = client
+            while len(_CLIENTS) > _CLIENT_CACHE_SIZE:
+                _CLIENTS.popitem(last=False)
+        else:
+            _CLIENTS.move_to_end(api_key)
+        return client
+
+
 def build_tools(composio_tools: List[Any]) -> List[types.Tool]:
     return convert_to_gemini_tools(composio_tools)
 
 
+_THINKING_CONFIG = types.ThinkingConfig(include_thoughts=True)
+_CONFIG_CACHE_SIZE = 64
+# Recheck the declarations behind a config this often (the Composio tool list
+# is refetched on the same schedule), so a schema change under an unchanged
+# tool name is picked up without a restart.
+_CONFIG_TTL_SECONDS = 300
+_CONFIGS: "OrderedDict[Tuple[str, ...], Tuple[types.GenerateContentConfig, float]]" = OrderedDict()
+_CONFIGS_LOCK = threading.Lock()
+
+
+# Default for fingerprint arguments the caller did not compute.
+_MISSING: Any = object()
+
+
+def build_config(
+    composio_tools: List[Any],
+    fingerprint: Optional[Tuple[str, ...]] = _MISSING,
+) -> types.GenerateContentConfig:
+    """
+    Return the generation config for a tool set, reusing the config object when
+    the same tools (by name) were seen before.
+
+    The config holds only the static system instruction and the tools; per-user
+    context travels with each user message, so every user shares this prefix.
+    Pass `fingerprint` when the caller already has tool_fingerprint(composio_tools).
+    """
+    key = tool_fingerprint(composio_tools) if fingerprint is _MISSING else fingerprint
+    now = time.time()
+    previous = None
+    if key is not None:
+        with _CONFIGS_LOCK:
+            entry = _CONFIGS.get(key)
+            if entry is not None:
+                _CONFIGS.move_to_end(key)
+                previous, checked_at = entry
+                if now - checked_at < _CONFIG_TTL_SECONDS:
+                    return previous
+
+    tools = build_tools(composio_tools)
+    if previous is not None and previous.tools == tools:
+        # Unchanged declarations keep the same object, and so its prefix caches.
+        config = previous
+    else:
+        config = types.GenerateContentConfig(
+            tools=tools,
+            system_instruction=SYSTEM_INSTRUCTION,
+            thinking_config=_THINKING_CONFIG,
+        )
+        if previous is not None:
+            logger.info("Tool declarations changed; rebuilding config for %s tools", len(key))
+            _forget_prefix_caches_for(key)
+    if key is not None:
+        with _CONFIGS_LOCK:
+            _CONFIGS[key] = (config, now)
+            _CONFIGS.move_to_end(key)
+            while len(_CONFIGS) > _CONFIG_CACHE_SIZE:
+                _CONFIGS.popitem(last=False)
+    return config
+
+
+def warm_up(*, api_key: str, model: Optional[str], tools: List[Any]) -> None:
+    """Open the client's connection and convert a tool set before a chat needs them."""
+    get_client(api_key).models.get(model=_normalize_model_name(model))
+    if tools:
+        build_config(tools)
+
+
+# Explicit context caching of the system instruction + tool declarations.
+# Opt-in: caches are billed for storage and need a minimum prefix size.
+_PREFIX_CACHE_TTL_SECONDS = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL", "0") or 0)
+# Stop handing out a cache this long before it expires, so chats built on it
+# (and reused across turns) never outlive it.
+_PREFIX_CACHE_MARGIN_SECONDS = min(300, _PREFIX_CACHE_TTL_SECONDS // 4)
+# Do not retry creating a cache for a prefix that was just rejected.
+_PREFIX_CACHE_RETRY_SECONDS = 600
+_PREFIX_CACHE_SIZE = 256
+_PREFIX_CACHES: "OrderedDict[Tuple[Any, ...], Tuple[Optional[str], float]]" = OrderedDict()
+_PREFIX_CACHES_LOCK = threading.Lock()
+# One lock per prefix being created, so the caches.create round-trip only
+# blocks chats waiting for the same prefix; dropped once it is stored.
+_PREFIX_CACHE_CREATE_LOCKS: Dict[Tuple[Any, ...], threading.Lock] = {}
+
+
+def cached_prefix_config(
+    client: genai.Client,
+    *,
+    api_key: str,
+    model: str,
+    config: types.GenerateContentConfig,
+    config_key: Optional[Tuple[str, ...]],
+) -> Tuple[types.GenerateContentConfig, Optional[float]]:
+    """
+    Swap the system instruction and tools in `config` for a server-side cached
+    prefix when context caching is enabled.
+
+    Returns the config to use and the time until which chats built on it stay
+    valid (None when no cache is used).
+    """
+    if _PREFIX_CACHE_TTL_SECONDS <= 0 or config_key is None:
+        return config, None
+
+    key = (api_key, model, config_key)
+    name, usable_until = _usable_prefix_cache(key)
+    if usable_until <= time.time():
+        with _PREFIX_CACHES_LOCK:
+            create_lock = _PREFIX_CACHE_CREATE_LOCKS.setdefault(key, threading.Lock())
+        try:
+            with create_lock:
+                # Another chat may have created it while we waited.
+                name, usable_until = _usable_prefix_cache(key)
+                now = time.time()
+                if usable_until <= now:
+                    name, usable_until = _create_prefix_cache(client, model, config, now)
+                    with _PREFIX_CACHES_LOCK:
+                        _PREFIX_CACHES[key] = (name, usable_until)
+                        while len(_PREFIX_CACHES) > _PREFIX_CACHE_SIZE:
+                            _PREFIX_CACHES.popitem(last=False)
+        finally:
+            with _PREFIX_CACHES_LOCK:
+                if _PREFIX_CACHE_CREATE_LOCKS.get(key) is create_lock:
+                    del _PREFIX_CACHE_CREATE_LOCKS[key]
+
+    if name is None:
+        return config, None
+    return (
+        types.GenerateContentConfig(
+            cached_content=name,
+            thinking_config=config.thinking_config,
+        ),
+        usable_until,
+    )
+
+
+def _usable_prefix_cache(key: Tuple[Any, ...]) -> Tuple[Optional[str], float]:
+    """The stored (cache name, usable until) for a prefix, marking it recently used."""
+    with _PREFIX_CACHES_LOCK:
+        entry = _PREFIX_CACHES.get(key)
+        if entry is None:
+            return None, 0.0
+        _PREFIX_CACHES.move_to_end(key)
+        return entry
+
+
+def forget_prefix_cache(
+    *,
+    api_key: str,
+    model: str,
+    config_key: Optional[Tuple[str, ...]],
+) -> None:
+    """Drop a cached prefix the server no longer knows, so the next chat recreates it."""
+    with _PREFIX_CACHES_LOCK:
+        _PREFIX_CACHES.pop((api_key, model, config_key), None)
+
+
+def _is_cached_content_missing_error(exc: Exception) -> bool:
+    message = str(exc).lower()
+    return ("cachedcontent" in message or "cached content" in message) and (
+        "not found" in message
+        or "not_found" in message
+        or "expired" in message
+        or "permission_denied" in message
+    )
+
+
+def _forget_prefix_caches_for(config_key: Tuple[str, ...]) -> None:
+    """Drop every cached prefix built from an outdated config, for all keys and models."""
+    with _PREFIX_CACHES_LOCK:
+        for key in [key for key in _PREFIX_CACHES if key[2] == config_key]:
+            del _PREFIX_CACHES[key]
+
+
+def _create_prefix_cache(
+    client: genai.Client,
+    model: str,
+    config: types.GenerateContentConfig,
+    now: float,
+) -> Tuple[Optional[str], float]:
+    try:
+        cache = client.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                system_instruction=config.system_instruction,
+                tools=config.tools,
+                ttl=f"{_PREFIX_CACHE_TTL_SECONDS}s",
+            ),
+        )
+    except Exception as exc:  # noqa: BLE001 - caching is an optimization only
+        logger.warning("Could not create Gemini context cache for %s: %s", model, exc)
+        return None, now + _PREFIX_CACHE_RETRY_SECONDS
+    return cache.name, now + _PREFIX_CACHE_TTL_SECONDS - _PREFIX_CACHE_MARGIN_SECONDS
+
+
 class GeminiChat(LLMChat):
     def __init__(
         self,
@@ -46,29 +285,45 @@ class GeminiChat(LLMChat):
         tools: List[Any],
         history: List[Dict[str, str]],
         user_context: Optional[str] = None,
+        service_tier: Optional[str] = None,
+        tools_fingerprint: Optional[Tuple[str, ...]] = _MISSING,
     ) -> None:
-        self._client = genai.Client(api_key=api_key)
-        tool_defs = build_tools(tools)
-        system_instruction = SYSTEM_INSTRUCTION
-        if user_context:
-            system_instruction = f"{SYSTEM_INSTRUCTION}\n\n### USER CONTEXT\n{user_context}"
-        config = types.GenerateContentConfig(
-            tools=tool_defs,
-            system_instruction=system_instruction,
-            thinking_config=types.ThinkingConfig(include_thoughts=True),
+        self._client = get_client(api_key)
+        config_key = (
+            tool_fingerprint(tools) if tools_fingerprint is _MISSING else tools_fingerprint
         )
+        config = build_config(tools, config_key)
         formatted_history = format_history(history)
         requested_model = _normalize_model_name(model or DEFAULT_MODEL)
+        self._context_text = user_context_text(user_context)
+        chat_config, self.reusable_until = cached_prefix_config(
+            self._client,
+            api_key=api_key,
+            model=requested_model,
+            config=config,
+            config_key=config_key,
+        )
+        if service_tier:
+            config = _with_service_tier(config, service_tier)
+            chat_config = _with_service_tier(chat_config, service_tier)
+        # Enough to rebuild the chat without the cached prefix if it disappears.
+        self._uncached = None
+        if self.reusable_until is not None:
+            self._uncached = (
+                {"api_key": api_key, "model": requested_model, "config_key": config_key},
+                config,
+            )
         self._chat = _create_chat_with_model_fallback(
             client=self._client,
             requested_model=requested_model,
-            config=config,
+            config=chat_config,
             history=formatted_history,
+            fallback_config=config,
         )
 
     def send_user_message(self, text: str) -> LLMResponse:
-        response = self._chat.send_message(text)
-        return _parse_response(response)
+        response = self._send(self._user_turn(text))
+        return self._track(_parse_response(response))
 
     def send_tool_result(
         self,
@@ -76,12 +331,146 @@ class GeminiChat(LLMChat):
         result: Dict[str, Any],
         tool_call_id: Optional[str] = None,
     ) -> LLMResponse:
-        function_response = types.Part.from_function_response(
-            name=tool_name,
-            response=result,
+        response = self._send([_function_response_part(tool_name, result)])
+        return self._track(_parse_response(response))
+
+    def send_tool_results(self, results: List[ToolResult]) -> LLMResponse:
+        # Parallel function calls are answered together in a single turn.
+        response = self._send(_function_response_parts(results))
+        return self._track(_parse_response(response))
+
+    def stream_user_message(self, text: str) -> Generator[str, None, LLMResponse]:
+        parsed = yield from _parse_stream(self._stream(self._user_turn(text)))
+        return self._track(parsed)
+
+    def stream_tool_result(
+        self,
+        tool_name: str,
+        result: Dict[str, Any],
+        tool_call_id: Optional[str] = None,
+    ) -> Generator[str, None, LLMResponse]:
+        stream = self._stream([_function_response_part(tool_name, result)])
+        parsed = yield from _parse_stream(stream)
+        return self._track(parsed)
+
+    def stream_tool_results(self, results: List[ToolResult]) -> Generator[str, None, LLMResponse]:
+        stream = self._stream(_function_response_parts(results))
+        parsed = yield from _parse_stream(stream)
+        return self._track(parsed)
+
+    def _user_turn(self, text: str) -> Any:
+        # Dynamic context goes after the history, never into the cached prefix.
+        if self._context_text is None:
+            return text
+        return [self._context_text, text]
+
+    def _send(self, message: Any) -> Any:
+        try:
+            return self._chat.send_message(message)
+        except Exception as exc:  # noqa: BLE001 - re-raised unless the cache vanished
+            if not self._drop_cached_prefix(exc):
+                raise
+        return self._chat.send_message(message)
+
+    def _stream(self, message: Any) -> Iterator[Any]:
+        chunks = iter(self._chat.send_message_stream(message))
+        try:
+            first = next(chunks)
+        except StopIteration:
+            return iter(())
+        except Exception as exc:  # noqa: BLE001 - re-raised unless the cache vanished
+            if not self._drop_cached_prefix(exc):
+                raise
+            return iter(self._chat.send_message_stream(message))
+        return itertools.chain((first,), chunks)
+
+    def _drop_cached_prefix(self, exc: Exception) -> bool:
+        """Continue this chat without its cached prefix when the server lost it."""
+        if self._uncached is None or not _is_cached_content_missing_error(exc):
+            return False
+        cache_ref, config = self._uncached
+        logger.warning("Gemini context cache missing; continuing without it: %s", exc)
+        forget_prefix_cache(**cache_ref)
+        self._chat = self._client.chats.create(
+            model=cache_ref["model"],
+            config=config,
+            history=self._chat.get_history(curated=True),
         )
-        response = self._chat.send_message([function_response])
-        return _parse_response(response)
+        self._uncached = None
+        self.reusable_until = None
+        return True
+
+    def _track(self, parsed: LLMResponse) -> LLMResponse:
+        self.has_pending_tool_calls = bool(parsed.tool_calls)
+        return parsed
+
+
+def _with_service_tier(
+    config: types.GenerateContentConfig,
+    service_tier: str,
+) -> types.GenerateContentConfig:
+    """Copy of a shared config that requests the given service tier."""
+    # model_copy skips validation, so convert to the enum the field expects.
+    return config.model_copy(update={"service_tier": types.ServiceTier(service_tier)})
+
+
+def _function_response_part(tool_name: str, result: Dict[str, Any]) -> types.Part:
+    return types.Part.from_function_response(
+        name=tool_name,
+        response=result,
+    )
+
+
+def _function_response_parts(results: List[ToolResult]) -> List[types.Part]:
+    return [_function_response_part(item.name, item.result) for item in results]
+
+
+def _candidate_parts(response: Any) -> List[Any]:
+    """Parts of the first candidate, or [] when any level is missing."""
+    try:
+        return response.candidates[0].content.parts or []
+    except (AttributeError, IndexError, TypeError):
+        return []
+
+
+def _plain_value(value: Any) -> Any:
+    """Recursively turn proto map/repeated values into dicts and lists."""
+    if isinstance(value, (str, bytes, int, float, bool)) or value is None:
+        return value
+    if hasattr(value, "keys"):
+        return {key: _plain_value(value[key]) for key in value.keys()}
+    try:
+        return [_plain_value(item) for item in value]
+    except TypeError:
+        return value
+
+
+def _collect_part(
+    part: Any,
+    text_parts: List[str],
+    tool_calls: List[ToolCall],
+    thoughts: List[str],
+) -> Optional[str]:
+    """Sort one response part into its bucket; returns the answer text it carried."""
+    function_call = getattr(part, "function_call", None)
+    if function_call:
+        args = function_call.args or {}
+        if not isinstance(args, dict):
+            # Older SDKs hand back a proto map; convert it once here.
+            args = _plain_value(args)
+        tool_calls.append(ToolCall(name=function_call.name, args=args))
+        # A function-call part carries no answer text; skip the other lookups.
+        return None
+    if getattr(part, "thought", None):
+        # Never leak model thought text into final assistant text.
+        if not thoughts:
+            thoughts.append("Thinking...")
+        return None
+    text = getattr(part, "text", None)
+    if text:
+        text_parts.append(text)
+        return text
+    return None
 
 
 def _parse_response(response: Any) -> LLMResponse:
@@ -89,28 +478,37 @@ def _parse_response(response: Any) -> LLMResponse:
     tool_calls: List[ToolCall] = []
     thoughts: List[str] = []
 
-    if hasattr(response, "candidates") and response.candidates:
-        candidate = response.candidates[0]
-        if hasattr(candidate, "content") and candidate.content is not None:
-            if hasattr(candidate.content, "parts") and candidate.content.parts:
-                for part in candidate.content.parts:
-                    if hasattr(part, "function_call") and part.function_call:
-                        args = dict(part.function_call.args) if part.function_call.args else {}
-                        tool_calls.append(
-                            ToolCall(name=part.function_call.name, args=args)
-                        )
-                    if hasattr(part, "thought") and part.thought:
-                        # Never leak model thought text into final assistant text.
-                        if not thoughts:
-                            thoughts.append("Thinking...")
-                        continue
-                    if hasattr(part, "text") and part.text:
-                        text_parts.append(part.text)
+    parts = _candidate_parts(response)
+    if len(parts) > _MANY_PARTS_WARNING:
+        logger.warning("Gemini response has %s parts", len(parts))
+    for part in parts:
+        _collect_part(part, text_parts, tool_calls, thoughts)
 
     text = "\n".join([t for t in text_parts if t.strip()]) or None
     return LLMResponse(text=text, tool_calls=tool_calls, thoughts=thoughts)
 
 
+def _parse_stream(chunks: Any) -> Generator[str, None, LLMResponse]:
+    """Yield answer text as stream chunks arrive and return the assembled response."""
+    text_parts: List[str] = []
+    tool_calls: List[ToolCall] = []
+    thoughts: List[str] = []
+
+    for chunk in chunks:
+        for part in _candidate_parts(chunk):
+            delta = _collect_part(part, text_parts, tool_calls, thoughts)
+            if delta:
+                yield delta
+
+    # Chunks are fragments of one answer, so they are concatenated as-is.
+    text = "".join(text_parts)
+    return LLMResponse(
+        text=text if text.strip() else None,
+        tool_calls=tool_calls,
+        thoughts=thoughts,
+    )
+
+
 def _normalize_model_name(model_name: Optional[str]) -> str:
     name = (model_name or DEFAULT_MODEL).strip()
     if name.startswith("models/"):
@@ -118,13 +516,36 @@ def _normalize_model_name(model_name: Optional[str]) -> str:
     return MODEL_ALIAS_MAP.get(name, name)
 
 
+# Fallback model picked per client and requested model, so later chats skip
+# the failing model and the models.list() walk; re-resolved after the TTL.
+# Weakly keyed, so an evicted client is not kept alive here.
+_MODEL_FALLBACK_TTL_SECONDS = 3600
+_MODEL_FALLBACKS: "weakref.WeakKeyDictionary[genai.Client, Dict[str, Tuple[str, float]]]" = (
+    weakref.WeakKeyDictionary()
+)
+_MODEL_FALLBACKS_LOCK = threading.Lock()
+
+
 def _create_chat_with_model_fallback(
     *,
     client: genai.Client,
     requested_model: str,
     config: types.GenerateContentConfig,
     history: List[types.Content],
+    fallback_config: Optional[types.GenerateContentConfig] = None,
 ):
+    """`fallback_config` replaces `config` for a fallback model (cached prefixes are per model)."""
+    with _MODEL_FALLBACKS_LOCK:
+        fallback_model, resolved_until = _MODEL_FALLBACKS.get(client, {}).get(
+            requested_model, (None, 0.0)
+        )
+    if fallback_model and resolved_until > time.time():
+        return client.chats.create(
+            model=fallback_model,
+            config=fallback_config or config,
+            history=history,
+        )
+
     try:
         return client.chats.create(
             model=requested_model,
@@ -139,13 +560,19 @@ def _create_chat_with_model_fallback(
         if not fallback_model or fallback_model == requested_model:
             raise
 
-        print(
-            f"DEBUG: Requested model '{requested_model}' unavailable, falling back to '{fallback_model}'",
-            flush=True,
+        logger.debug(
+            "Requested model '%s' unavailable, falling back to '%s'",
+            requested_model,
+            fallback_model,
         )
+        with _MODEL_FALLBACKS_LOCK:
+            _MODEL_FALLBACKS.setdefault(client, {})[requested_model] = (
+                fallback_model,
+                time.time() + _MODEL_FALLBACK_TTL_SECONDS,
+            )
         return client.chats.create(
             model=fallback_model,
-            config=config,
+            config=fallback_config or config,
             history=history,
         )
 
@@ -206,7 +633,7 @@ def _list_generate_content_models(client: genai.Client) -> List[str]:
             if supports_generate:
                 model_names.append(name)
     except Exception as exc:  # noqa: BLE001 - fallback to static models on API failures
-        print(f"DEBUG: Could not list Gemini models for fallback: {exc}", flush=True)
+        logger.warning("Could not list Gemini models for fallback: %s", exc)
         return []
 
     return sorted(set(model_names))
@@ -0,0 +1,179 @@
+"""Gemini Batch API adapter for non-urgent agent runs.
+
+Batch jobs are billed at half the interactive price and are scheduled by
+Gemini within a day, so they suit bulk triage, nightly summaries, and
+evaluation runs. A batch turn is a single model response: tool calls are
+not executed, so requests are sent without tool declarations.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import logging
+import textwrap
+from typing import Any, Dict, List, Optional
+
+from google.genai import errors as genai_errors
+from google.genai import types
+
+from agent.gemini_config import user_context_text
+from llm.providers.gemini import _normalize_model_name, get_client
+from utils.chat_utils import format_history_json
+
+logger = logging.getLogger(__name__)
+
+# The interactive instruction is about resolving IDs and calling tools; batch
+# requests declare no tools, so they get an answer-only instruction instead.
+BATCH_SYSTEM_INSTRUCTION = textwrap.dedent("""
+    You are Caddy, an assistant for work across apps such as Linear, Slack, GitHub, Gmail, and Google Calendar.
+
+    This request is processed offline, in a single response. You cannot call tools, search, or look anything up, and the user cannot reply before you answer.
+    *   Answer only from the conversation and the context provided.
+    *   Do not say you will search, check, or perform an action.
+    *   If the answer needs data you do not have, say briefly what is missing.
+    *   Be concise; summarize rather than repeating long content.
+    """).strip()
+
+# Job states after which the batch will not change any more.
+FINISHED_STATES = frozenset(
+    {
+        "JOB_STATE_SUCCEEDED",
+        "JOB_STATE_FAILED",
+        "JOB_STATE_CANCELLED",
+        "JOB_STATE_EXPIRED",
+    }
+)
+
+
+class BatchJobNotFound(LookupError):
+    """The batch job is unknown, or belongs to another user."""
+
+
+def batch_display_name(owner: Optional[str]) -> str:
+    """Job display name recording who submitted it, as a digest of the user id."""
+    if owner is None:
+        return "mochi-batch"
+    return f"mochi-batch-{hashlib.sha256(owner.encode('utf-8')).hexdigest()[:32]}"
+
+
+def build_batch_file(
+    requests: List[Dict[str, Any]],
+    user_context: Optional[str] = None,
+) -> bytes:
+    """
+    Build the JSONL input for a batch job.
+
+    Args:
+        requests: Dicts with 'key', 'input', and optional 'history'
+        user_context: Extra context sent with each request's user message
+
+    Returns:
+        One {"key", "request"} JSON line per request
+    """
+    system_instruction = {"parts": [{"text": BATCH_SYSTEM_INSTRUCTION}]}
+    context_text = user_context_text(user_context)
+    context_parts = [{"text": context_text}] if context_text else []
+    lines = []
+    for request in requests:
+        contents = format_history_json(request.get("history") or [])
+        contents.append(
+            {"role": "user", "parts": context_parts + [{"text": request["input"]}]}
+        )
+        lines.append(
+            json.dumps(
+                {
+                    "key": str(request["key"]),
+                    "request": {
+                        "contents": contents,
+                        "system_instruction": system_instruction,
+                    },
+                }
+            )
+        )
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def submit_batch(
+    *,
+    api_key: str,
+    model: Optional[str],
+    requests: List[Dict[str, Any]],
+    user_context: Optional[str] = None,
+    owner: Optional[str] = None,
+) -> str:
+    """Upload the requests and start a batch job owned by `owner`; returns the job name."""
+    client = get_client(api_key)
+    display_name = batch_display_name(owner)
+    uploaded = client.files.upload(
+        file=io.BytesIO(build_batch_file(requests, user_context)),
+        config=types.UploadFileConfig(display_name=display_name, mime_type="jsonl"),
+    )
+    job = client.batches.create(
+        model=_normalize_model_name(model),
+        src=uploaded.name,
+        config=types.CreateBatchJobConfig(display_name=display_name),
+    )
+    logger.info("Submitted Gemini batch %s with %s requests", job.name, len(requests))
+    return job.name
+
+
+def get_batch_result(
+    *, api_key: str, job_name: str, owner: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Fetch a batch job's state, plus its per-key results once it succeeded.
+
+    Returns:
+        {"name", "state", "done", "results"}; results maps each request key
+        to {"text"} or {"error"} and is None until the job succeeded.
+
+    Raises:
+        BatchJobNotFound: The job does not exist, or `owner` did not submit it
+    """
+    client = get_client(api_key)
+    try:
+        job = client.batches.get(name=job_name)
+    except genai_errors.ClientError as exc:
+        if exc.code == 404:
+            raise BatchJobNotFound(job_name) from exc
+        raise
+    if owner is not None and job.display_name != batch_display_name(owner):
+        raise BatchJobNotFound(job_name)
+    state = getattr(job.state, "name", str(job.state))
+    results = None
+    if state == "JOB_STATE_SUCCEEDED":
+        output = client.files.download(file=job.dest.file_name)
+        results = parse_batch_output(output)
+    return {
+        "name": job.name,
+        "state": state,
+        "done": state in FINISHED_STATES,
+        "results": results,
+    }
+
+
+def parse_batch_output(output: bytes) -> Dict[str, Dict[str, Any]]:
+    """Map each key in a batch output file to its answer text or error."""
+    results: Dict[str, Dict[str, Any]] = {}
+    for line in output.decode("utf-8").splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        key = str(entry.get("key"))
+        if "error" in entry:
+            results[key] = {"error": entry["error"]}
+        else:
+            results[key] = {"text": _response_text(entry.get("response") or {})}
+    return results
+
+
+def _response_text(response: Dict[str, Any]) -> Optional[str]:
+    """Answer text of the first candidate, skipping thought parts."""
+    try:
+        parts = response["candidates"][0]["content"]["parts"]
+    except (KeyError, IndexError, TypeError):
+        return None
+    texts = [part["text"] for part in parts if part.get("text") and not part.get("thought")]
+    return "".join(texts) or None
@@ -7,7 +7,11 @@ from typing import Any, Dict, List, Optional, Tuple
 import os
 
 from llm.types import LLMChat
-from llm.providers.gemini import GeminiChat
+from llm.providers import gemini_batch
+from llm.providers.gemini_batch import BatchJobNotFound
+from llm.providers.gemini import GeminiChat, is_transient_error, warm_up
+from llm.sessions import ChatSessionStore
+from utils.tool_converter import tool_fingerprint
 
 
 DEFAULT_PROVIDER = "google"
@@ -25,6 +29,11 @@ class ModelConfigError(ValueError):
     pass
 
 
+_CHAT_SESSIONS = ChatSessionStore()
+# Default for fingerprint arguments the caller did not compute.
+_MISSING: Any = object()
+
+
 def create_chat_session(
     *,
     model_config: Optional[Any],
@@ -32,19 +41,109 @@ def create_chat_session(
     tools: List[Dict[str, Any]],
     history: List[Dict[str, str]],
     user_context: Optional[str] = None,
+    session_id: Optional[str] = None,
+    service_tier: Optional[str] = None,
+    tools_fingerprint: Optional[Tuple[str, ...]] = _MISSING,
 ) -> Tuple[LLMChat, ResolvedModelConfig]:
+    """
+    Create a chat for the resolved model, or continue the session's previous
+    chat when model, tools, and context are unchanged and `history` is exactly
+    what that chat has already seen.
+
+    Pass `tools_fingerprint` when the caller already has tool_fingerprint(tools).
+    """
+    resolved = _resolve_model_config(model_config, fallback_api_key)
+    if not resolved.api_key:
+        raise ModelConfigError("Missing GOOGLE_API_KEY for Gemini")
+
+    fingerprint = tool_fingerprint(tools) if tools_fingerprint is _MISSING else tools_fingerprint
+    config_key = None
+    if session_id:
+        if fingerprint is not None:
+            config_key = (
+                resolved.provider,
+                resolved.model,
+                resolved.api_key,
+                user_context,
+                service_tier,
+                fingerprint,
+            )
+            chat = _CHAT_SESSIONS.checkout(session_id, config_key, history)
+            if chat is not None:
+                return chat, resolved
+
+    chat = GeminiChat(
+        api_key=resolved.api_key,
+        model=resolved.model,
+        tools=tools,
+        history=history,
+        user_context=user_context,
+        service_tier=service_tier,
+        tools_fingerprint=fingerprint,
+    )
+    if session_id:
+        if config_key is None:
+            _CHAT_SESSIONS.discard(session_id)
+        else:
+            _CHAT_SESSIONS.open(session_id, chat, config_key)
+    return chat, resolved
+
+
+def retain_chat_session(
+    session_id: str,
+    chat: LLMChat,
+    history: List[Dict[str, str]],
+) -> bool:
+    """Keep a finished chat for the next turn, whose history should equal `history`."""
+    return _CHAT_SESSIONS.checkin(session_id, chat, history)
+
+
+def warm_up_model(
+    *,
+    fallback_api_key: Optional[str],
+    tools: List[Dict[str, Any]],
+) -> None:
+    """Connect to the default model and prepare its config for `tools`."""
+    resolved = _resolve_model_config(None, fallback_api_key)
+    if not resolved.api_key:
+        raise ModelConfigError("Missing GOOGLE_API_KEY for Gemini")
+    warm_up(api_key=resolved.api_key, model=resolved.model, tools=tools)
+
+
+def submit_batch(
+    *,
+    model_config: Optional[Any],
+    fallback_api_key: Optional[str],
+    requests: List[Dict[str, Any]],
+    user_context: Optional[str] = None,
+    owner: Optional[str] = None,
+) -> str:
+    """Start a discounted batch job for `requests`; returns the job name."""
+    resolved = _resolve_model_config(model_config, fallback_api_key)
+    if not resolved.api_key:
+        raise ModelConfigError("Missing GOOGLE_API_KEY for Gemini")
+    return gemini_batch.submit_batch(
+        api_key=resolved.api_key,
+        model=resolved.model,
+        requests=requests,
+        user_context=user_context,
+        owner=owner,
+    )
+
+
+def get_batch_result(
+    job_name: str,
+    *,
+    fallback_api_key: Optional[str],
+    model_config: Optional[Any] = None,
+    owner: Optional[str] = None,
+) -> Dict[str, Any]:
+    """State of a batch job, with results once it has succeeded."""
     resolved = _resolve_model_config(model_config, fallback_api_key)
     if not resolved.api_key:
         raise ModelConfigError("Missing GOOGLE_API_KEY for Gemini")
-    return (
-        GeminiChat(
-            api_key=resolved.api_key,
-            model=resolved.model,
-            tools=tools,
-            history=history,
-            user_context=user_context,
-        ),
-        resolved,
+    return gemini_batch.get_batch_result(
+        api_key=resolved.api_key, job_name=job_name, owner=owner
     )
 
 
@@ -0,0 +1,121 @@
+"""Reuse of finished chat sessions across turns."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, List, Optional
+
+from llm.types import LLMChat
+
+
+def history_fingerprint(history: List[Dict[str, Any]]) -> str:
+    """Stable digest of a chat history as sent by the client."""
+    normalized = [[msg.get("role", "user"), msg.get("parts", [])] for msg in history]
+    encoded = json.dumps(normalized, ensure_ascii=True, default=str).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()
+
+
+@dataclass
+class _SessionEntry:
+    chat: LLMChat
+    config_key: Hashable
+    history_key: Optional[str] = None
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class ChatSessionStore:
+    """
+    Keeps one chat per session so the next turn can continue it instead of
+    rebuilding the chat (and re-sending the whole history) from scratch.
+
+    A session only becomes reusable after `checkin`, i.e. once its turn
+    finished cleanly. `checkout` hands the chat to a single caller at a time.
+
+    Sessions idle for `ttl_seconds` are dropped, and at most `max_sessions`
+    are kept (least recently used go first).
+    """
+
+    def __init__(self, max_sessions: int = 1000, ttl_seconds: float = 1800) -> None:
+        self._entries: "OrderedDict[str, _SessionEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_sessions = max_sessions
+        self._ttl_seconds = ttl_seconds
+
+    def checkout(
+        self,
+        session_id: str,
+        config_key: Hashable,
+        history: List[Dict[str, Any]],
+    ) -> Optional[LLMChat]:
+        """Return the stored chat if it matches the config and incoming history."""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None or entry.history_key is None:
+                return None
+            if time.monotonic() - entry.last_used > self._ttl_seconds:
+                del self._entries[session_id]
+                return None
+            if entry.config_key != config_key:
+                del self._entries[session_id]
+                return None
+            if entry.history_key != history_fingerprint(history):
+                del self._entries[session_id]
+                return None
+            reusable_until = entry.chat.reusable_until
+            if reusable_until is not None and reusable_until <= time.time():
+                del self._entries[session_id]
+                return None
+            entry.history_key = None
+            entry.last_used = time.monotonic()
+            self._entries.move_to_end(session_id)
+            return entry.chat
+
+    def open(self, session_id: str, chat: LLMChat, config_key: Hashable) -> None:
+        """Register a newly created chat for the session (not yet reusable)."""
+        with self._lock:
+            self._entries[session_id] = _SessionEntry(chat=chat, config_key=config_key)
+            self._entries.move_to_end(session_id)
+            self._evict_locked()
+
+    def checkin(
+        self,
+        session_id: str,
+        chat: LLMChat,
+        history: List[Dict[str, Any]],
+    ) -> bool:
+        """Mark the chat reusable for a follow-up turn whose history equals `history`."""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None or entry.chat is not chat:
+                return False
+            if chat.has_pending_tool_calls:
+                del self._entries[session_id]
+                return False
+            entry.history_key = history_fingerprint(history)
+            entry.last_used = time.monotonic()
+            self._entries.move_to_end(session_id)
+            return True
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _evict_locked(self) -> None:
+        now = time.monotonic()
+        # Entries are ordered by last use, so idle ones sit at the front.
+        while self._entries:
+            oldest_id, oldest = next(iter(self._entries.items()))
+            if len(self._entries) <= self._max_sessions and (
+                now - oldest.last_used <= self._ttl_seconds
+            ):
+                break
+            del self._entries[oldest_id]
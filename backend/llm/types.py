@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Generator, List, Optional
 
 
 @dataclass
@@ -13,6 +13,13 @@ class ToolCall:
     call_id: Optional[str] = None
 
 
+@dataclass
+class ToolResult:
+    name: str
+    result: Dict[str, Any]
+    call_id: Optional[str] = None
+
+
 @dataclass
 class LLMResponse:
     text: Optional[str] = None
@@ -23,6 +30,11 @@ class LLMResponse:
 class LLMChat:
     """Protocol-like base class for provider chat sessions."""
 
+    # True while the last model turn requested tools that were never answered.
+    has_pending_tool_calls: bool = False
+    # Epoch time after which the chat must not be continued (None: no limit).
+    reusable_until: Optional[float] = None
+
     def send_user_message(self, text: str) -> LLMResponse:  # pragma: no cover - interface
         raise NotImplementedError
 
@@ -33,3 +45,36 @@ class LLMChat:
         tool_call_id: Optional[str] = None,
     ) -> LLMResponse:  # pragma: no cover - interface
         raise NotImplementedError
+
+    def send_tool_results(self, results: List[ToolResult]) -> LLMResponse:
+        """Answer every tool call of the last model turn; returns the model's reply."""
+        response = LLMResponse()
+        for item in results:
+            response = self.send_tool_result(item.name, item.result, item.call_id)
+        return response
+
+    def stream_user_message(self, text: str) -> Generator[str, None, LLMResponse]:
+        """Send a user message, yielding answer text deltas; returns the full response."""
+        response = self.send_user_message(text)
+        if response.text:
+            yield response.text
+        return response
+
+    def stream_tool_result(
+        self,
+        tool_name: str,
+        result: Dict[str, Any],
+        tool_call_id: Optional[str] = None,
+    ) -> Generator[str, None, LLMResponse]:
+        """Send a tool result, yielding answer text deltas; returns the full response."""
+        response = self.send_tool_result(tool_name, result, tool_call_id)
+        if response.text:
+            yield response.text
+        return response
+
+    def stream_tool_results(self, results: List[ToolResult]) -> Generator[str, None, LLMResponse]:
+        """Answer every tool call of the last model turn, yielding answer text deltas."""
+        response = self.send_tool_results(results)
+        if response.text:
+            yield response.text
+        return response
@@ -1,28 +1,55 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Any
+from typing import List, Literal, Optional
+import asyncio
 import json
+import logging
 import os
-from agent_service import AgentService
+from concurrent.futures import ThreadPoolExecutor
+from agent_service import AgentService, BatchJobNotFound
 from services.composio_service import ComposioService
+from utils.logging_utils import configure_logging
+from utils.stream_utils import drain_in_thread
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib json fallback
+    orjson = None
+
+configure_logging()
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Mochi Backend")
 
+# Each streaming chat holds one thread for its whole turn (Composio and Gemini
+# calls block), so size this for the concurrent chats to serve.
+_AGENT_POOL = ThreadPoolExecutor(
+    max_workers=int(os.getenv("AGENT_MAX_CONCURRENT_CHATS", "64")),
+    thread_name_prefix="agent",
+)
+
 # Initialize Composio Service (for integrations)
 try:
     composio_service = ComposioService()
 except Exception as e:
-    print(f"Warning: Failed to initialize ComposioService: {e}")
+    logger.warning("Failed to initialize ComposioService: %s", e)
     composio_service = None
 
 # Initialize Agent Service
 try:
     agent_service = AgentService(composio_service=composio_service)
 except Exception as e:
-    print(f"Warning: Failed to initialize AgentService: {e}")
+    logger.warning("Failed to initialize AgentService: %s", e)
     agent_service = None
 
+@app.on_event("startup")
+async def warm_up_services():
+    """Warm connections and tool caches in the background; startup does not wait."""
+    if not agent_service or os.getenv("WARMUP_ON_STARTUP", "1") == "0":
+        return
+    asyncio.get_running_loop().run_in_executor(None, agent_service.warmup)
+
 class ChatMessage(BaseModel):
     role: str
     content: str
@@ -38,6 +65,34 @@ class ChatRequest(BaseModel):
     user_timezone: Optional[str] = None
     api_key: Optional[str] = None
     model: Optional[ModelConfig] = None
+    stream_text: bool = False  # Opt in to incremental "message_delta" events
+    service_tier: Optional[Literal["standard", "priority", "flex"]] = None
+
+class BatchItem(BaseModel):
+    key: str
+    messages: List[ChatMessage]
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem]
+    user_id: str
+    user_timezone: Optional[str] = None
+    api_key: Optional[str] = None
+    model: Optional[ModelConfig] = None
+
+class BatchStatusRequest(BaseModel):
+    job_name: str
+    user_id: str
+    api_key: Optional[str] = None
+
+
+def _encode_event(event: dict) -> bytes:
+    """Encode one stream event as an NDJSON line."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(event, option=orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            pass
+    return (json.dumps(event) + "\n").encode("utf-8")
 
 
 def _resolve_effective_user_id(request_user_id: str) -> tuple[str, str]:
@@ -57,24 +112,17 @@ def _resolve_agent_service() -> AgentService | None:
     return agent_service
 
 
-@app.post("/api/chat")
-async def chat_endpoint(request: ChatRequest):
-    service = _resolve_agent_service()
-    if not service:
-        raise HTTPException(
-            status_code=500,
-            detail="Agent service not initialized (check COMPOSIO_API_KEY)",
-        )
-    
+def _split_messages(messages: List[ChatMessage]) -> tuple[str, list[dict]]:
+    """Return the latest user message and the Gemini history before it."""
     # Extract the latest user message
-    user_input = next((m.content for m in reversed(request.messages) if m.role == "user"), None)
+    user_input = next((m.content for m in reversed(messages) if m.role == "user"), None)
     
     if not user_input:
         raise HTTPException(status_code=400, detail="No user message found")
 
     # Construct History (All messages EXCEPT the last one, which is user_input)
     # We assume the last message is the current one we are processing.
-    history_messages = request.messages[:-1]
+    history_messages = messages[:-1]
     
     gemini_history = []
     for msg in history_messages:
@@ -83,23 +131,31 @@ async def chat_endpoint(request: ChatRequest):
             "role": role,
             "parts": msg.content
         })
+    return user_input, gemini_history
+
+
+@app.post("/api/chat")
+async def chat_endpoint(request: ChatRequest):
+    service = _resolve_agent_service()
+    if not service:
+        raise HTTPException(
+            status_code=500,
+            detail="Agent service not initialized (check COMPOSIO_API_KEY)",
+        )
+    
+    user_input, gemini_history = _split_messages(request.messages)
 
-    print(
-        "DEBUG: Incoming chat request",
-        {
-            "user_id": request.user_id,
-            "has_confirmed_tool": request.confirmed_tool is not None,
-            "confirmed_tool": request.confirmed_tool,
-        },
-        flush=True,
+    logger.debug(
+        "Incoming chat request user_id=%s has_confirmed_tool=%s confirmed_tool=%s",
+        request.user_id,
+        request.confirmed_tool is not None,
+        request.confirmed_tool,
     )
 
     # Create a generator that yields JSON strings followed by a newline
     def event_generator():
         effective_user_id, source = _resolve_effective_user_id(request.user_id)
-        print(
-            f"DEBUG: Using effective user_id: {effective_user_id} (source={source})"
-        )
+        logger.debug("Using effective user_id: %s (source=%s)", effective_user_id, source)
         
         for event in service.run_agent(
             user_input,
@@ -109,10 +165,63 @@ async def chat_endpoint(request: ChatRequest):
             user_timezone=request.user_timezone,
             model_config=request.model,
             fallback_api_key=request.api_key,
+            stream_text=request.stream_text,
+            service_tier=request.service_tier,
         ):
-            yield json.dumps(event) + "\n"
+            yield _encode_event(event)
+
+    return StreamingResponse(
+        drain_in_thread(event_generator(), _AGENT_POOL),
+        media_type="application/x-ndjson",
+    )
+
+@app.post("/api/batch")
+def submit_batch_endpoint(request: BatchRequest):
+    """Queue non-urgent chats on the discounted Gemini Batch API."""
+    service = _resolve_agent_service()
+    if not service:
+        raise HTTPException(
+            status_code=500,
+            detail="Agent service not initialized (check COMPOSIO_API_KEY)",
+        )
+
+    user_requests = []
+    for item in request.items:
+        user_input, history = _split_messages(item.messages)
+        user_requests.append({"key": item.key, "input": user_input, "history": history})
+
+    try:
+        job_name = service.submit_batch(
+            user_requests,
+            user_id=_resolve_effective_user_id(request.user_id)[0],
+            user_timezone=request.user_timezone,
+            model_config=request.model,
+            fallback_api_key=request.api_key,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"job_name": job_name}
 
-    return StreamingResponse(event_generator(), media_type="application/x-ndjson")
+@app.post("/api/batch/status")
+def get_batch_result_endpoint(request: BatchStatusRequest):
+    """Poll a batch job; results are keyed by the submitted item keys."""
+    service = _resolve_agent_service()
+    if not service:
+        raise HTTPException(
+            status_code=500,
+            detail="Agent service not initialized (check COMPOSIO_API_KEY)",
+        )
+
+    try:
+        return service.get_batch_result(
+            request.job_name,
+            user_id=_resolve_effective_user_id(request.user_id)[0],
+            fallback_api_key=request.api_key,
+        )
+    except BatchJobNotFound:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/api/v1/integrations/connect/{app_name}")
 async def get_connect_url(app_name: str, user_id: str):
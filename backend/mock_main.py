@@ -23,6 +23,7 @@ Test scenarios:
 
 import asyncio
 import json
+import logging
 import os
 from typing import Any, AsyncGenerator, Dict, List, Optional
 
@@ -31,14 +32,19 @@ from fastapi import FastAPI, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from utils.logging_utils import configure_logging
+
+logger = logging.getLogger(__name__)
+
 # Import ComposioService for optional real execution
 try:
     from services.composio_service import ComposioService
 except Exception as exc:  # noqa: BLE001 - mock mode should run even if composio init fails
-    print(f"Warning: Could not import ComposioService ({exc}). Execution will be mocked.")
+    logger.warning("Could not import ComposioService (%s). Execution will be mocked.", exc)
     ComposioService = None
 
 load_dotenv()
+configure_logging()
 
 app = FastAPI(title="Mochi Mock Backend")
 
@@ -79,7 +85,7 @@ class MockAgentService:
             try:
                 self.composio_service = ComposioService()
             except Exception as exc:  # noqa: BLE001 - fallback to mock-only mode
-                print(f"Warning: ComposioService unavailable in mock mode: {exc}")
+                logger.warning("ComposioService unavailable in mock mode: %s", exc)
                 self.composio_service = None
         else:
             self.composio_service = None
@@ -117,34 +123,23 @@ class MockAgentService:
         # CASE 2: GENERATE PROPOSAL (Based on keywords)
         user_input_lower = user_input.lower()
         
-        # DEBUG: Log received input
-        print("")
-        print("=" * 60)
-        print(f"[MOCK DEBUG] Received user input: '{user_input}'")
-        print(f"[MOCK DEBUG] Lowercased: '{user_input_lower}'")
-        print(f"[MOCK DEBUG] Contains 'test 1': {'test 1' in user_input_lower}")
-        print(f"[MOCK DEBUG] Contains 'test 2': {'test 2' in user_input_lower}")
-        print(f"[MOCK DEBUG] Contains 'test 3': {'test 3' in user_input_lower}")
-        print(f"[MOCK DEBUG] Contains 'test 4': {'test 4' in user_input_lower}")
-        print(f"[MOCK DEBUG] Contains 'test 5': {'test 5' in user_input_lower}")
-        print(f"[MOCK DEBUG] Contains 'test 9': {'test 9' in user_input_lower}")
-        print("=" * 60)
+        logger.debug("Received mock input: %r", user_input)
 
         # Scenario A: Demo flow #1 (test 1 / test one)
         if any(k in user_input_lower for k in ["test 1", "test one", "testone"]):
-            print("[MOCK DEBUG] -> Matched: Demo flow #1 (Linear + Slack)")
+            logger.debug("Matched: Demo flow #1 (Linear + Slack)")
             async for event in self._demo_flow_one_scenario():
                 yield event
 
         # Scenario B: Demo flow #2 (test 2 / test two)
         elif any(k in user_input_lower for k in ["test 2", "test two", "testtwo"]):
-            print("[MOCK DEBUG] -> Matched: Demo flow #2 (GitHub + Notion + Calendar)")
+            logger.debug("Matched: Demo flow #2 (GitHub + Notion + Calendar)")
             async for event in self._demo_flow_two_scenario():
                 yield event
 
         # Scenario B2: Natural-language demo triggers (multi-app keywords)
         elif "linear" in user_input_lower and "slack" in user_input_lower and "test" not in user_input_lower:
-            print("[MOCK DEBUG] -> Matched: Demo flow #1 (keyword: linear+slack)")
+            logger.debug("Matched: Demo flow #1 (keyword: linear+slack)")
             async for event in self._demo_flow_one_scenario():
                 yield event
 
@@ -154,61 +149,61 @@ class MockAgentService:
             and ("calendar" in user_input_lower or "schedule" in user_input_lower)
             and "test" not in user_input_lower
         ):
-            print("[MOCK DEBUG] -> Matched: Demo flow #2 (keyword: github+notion+calendar)")
+            logger.debug("Matched: Demo flow #2 (keyword: github+notion+calendar)")
             async for event in self._demo_flow_scenario():
                 yield event
 
         # Scenario C: Linear (keyword match)
         elif "linear" in user_input_lower and "test" not in user_input_lower:
-            print("[MOCK DEBUG] -> Matched: Linear scenario")
+            logger.debug("Matched: Linear scenario")
             async for event in self._linear_scenario():
                 yield event
 
         # Scenario D: Slack (keyword match)
         elif "slack" in user_input_lower and "test" not in user_input_lower:
-            print("[MOCK DEBUG] -> Matched: Slack scenario")
+            logger.debug("Matched: Slack scenario")
             async for event in self._slack_scenario():
                 yield event
 
         # Scenario E: Multi-App (test 3 / test three)
         elif any(k in user_input_lower for k in ["test 3", "test three", "testthree"]):
-            print("[MOCK DEBUG] -> Matched: Multi-app scenario")
+            logger.debug("Matched: Multi-app scenario")
             async for event in self._multi_app_scenario():
                 yield event
 
         # Scenario F: Triple-App (test 4 / test four)
         elif any(k in user_input_lower for k in ["test 4", "test four", "testfour"]):
-            print("[MOCK DEBUG] -> Matched: Triple-app scenario")
+            logger.debug("Matched: Triple-app scenario")
             async for event in self._triple_app_scenario():
                 yield event
 
         # Scenario G: Calendar (test 5 / test five)
         elif any(k in user_input_lower for k in ["test 5", "test five", "testfive"]) or ("calendar" in user_input_lower and "test" not in user_input_lower):
-            print("[MOCK DEBUG] -> Matched: Calendar scenario")
+            logger.debug("Matched: Calendar scenario")
             async for event in self._calendar_scenario():
                 yield event
 
         # Scenario H: GitHub (test 6 / test six)
         elif any(k in user_input_lower for k in ["test 6", "test six", "testsix"]) or ("github" in user_input_lower and "test" not in user_input_lower):
-            print("[MOCK DEBUG] -> Matched: GitHub scenario")
+            logger.debug("Matched: GitHub scenario")
             async for event in self._github_scenario():
                 yield event
 
         # Scenario I: Gmail (test 7 / test seven)
         elif any(k in user_input_lower for k in ["test 7", "test seven", "testseven"]) or ("gmail" in user_input_lower and "test" not in user_input_lower):
-            print("[MOCK DEBUG] -> Matched: Gmail scenario")
+            logger.debug("Matched: Gmail scenario")
             async for event in self._gmail_scenario():
                 yield event
 
         # Scenario J: Notion (test 8 / test eight)
         elif any(k in user_input_lower for k in ["test 8", "test eight", "testeight"]) or ("notion" in user_input_lower and "test" not in user_input_lower):
-            print("[MOCK DEBUG] -> Matched: Notion scenario")
+            logger.debug("Matched: Notion scenario")
             async for event in self._notion_scenario():
                 yield event
 
         # Scenario K: Demo (test 9 / test nine)
         elif any(k in user_input_lower for k in ["test 9", "test nine", "testnine"]):
-            print("[MOCK DEBUG] -> Matched: Demo full-flow scenario")
+            logger.debug("Matched: Demo full-flow scenario")
             async for event in self._demo_flow_scenario():
                 yield event
 
@@ -1,9 +1,12 @@
 """Composio SDK service wrapper for tool fetching and action execution."""
 
+import logging
 import os
+import threading
 import time
 import json
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from typing import Callable, Dict, Any, List, Optional
 from dotenv import load_dotenv
 from composio import Composio
 from .composio_tool_aliases import normalize_tool_slug
@@ -11,15 +14,25 @@ from .composio_tool_aliases import normalize_tool_slug
 
 load_dotenv()
 
-# Read-only tools that are safe to cache (5 min TTL)
+logger = logging.getLogger(__name__)
+
+# Read-only tools that are safe to cache (5 min TTL, per user)
 READ_ONLY_CACHEABLE_TOOLS = {
     "LINEAR_GET_ALL_LINEAR_TEAMS",
     "LINEAR_LIST_LINEAR_TEAMS",
     "LINEAR_LIST_LINEAR_STATES",
     "LINEAR_LIST_LINEAR_LABELS",
+    "LINEAR_LIST_LINEAR_PROJECTS",
+    "LINEAR_LIST_LINEAR_USERS",
     "SLACK_LIST_ALL_CHANNELS",
+    "SLACK_LIST_CONVERSATIONS",
+    "SLACK_LIST_ALL_USERS",
 }
 
+# Fallback for apps without a registered write classifier: tools whose slug
+# contains one of these may change what the cached reads return.
+CACHE_INVALIDATING_MARKERS = ("CREATE", "UPDATE", "DELETE", "REMOVE", "ARCHIVE")
+
 ACCOUNT_STATUS_PRIORITY = {
     "ACTIVE": 6,
     "INITIALIZING": 5,
@@ -146,39 +159,129 @@ class ComposioService:
             # We do NOT use GoogleProvider because it attempts to convert tool schemas
             # to Vertex AI format internally, which fails on some fields (humanParameterDescription).
             # By omitting the provider, we get raw tool schemas which we convert manually.
+            # The SDK client owns its pooled HTTP connections, so one ComposioService
+            # should be created per process and shared (see main.py) to keep them warm.
             self.composio = Composio(
                 api_key=os.getenv("COMPOSIO_API_KEY")
             )
-            print("DEBUG: Composio initialized successfully (Raw Mode)")
+            logger.debug("Composio initialized successfully (Raw Mode)")
         except Exception as exc:
             raise RuntimeError(
                 f"Failed to initialize Composio SDK: {exc}"
             ) from exc
         
-        # In-memory cache for read-only tools
-        self._cache: Dict[tuple, Dict[str, Any]] = {}
+        # In-memory LRU cache for read-only tools, keyed per user
+        self._cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
         self._cache_ttl_seconds = 300  # 5 minutes
+        self._cache_max_entries = 10_000
+        self._cache_lock = threading.Lock()
+        # App slug -> owning service's is_write_action; its writes drop the
+        # app's cached reads.
+        self._write_classifiers: Dict[str, Callable[[str, Dict[str, Any]], bool]] = {}
+        # (user_id, app slug) -> stamp of that user's latest cache-invalidating
+        # write to the app; a read only caches its result if its app saw no
+        # write while it ran. Stamps come from one counter, so they never repeat.
+        self._cache_generations: "OrderedDict[tuple, int]" = OrderedDict()
+        self._cache_writes = 0
+
+        # In-memory LRU cache of fetched tool definitions, cleared on connect/disconnect
+        self._tools_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._tools_cache_ttl_seconds = 300  # 5 minutes
+        self._tools_cache_max_entries = 1024
+        # Tool loader threads fill the cache while connect/disconnect clear it.
+        self._tools_cache_lock = threading.Lock()
+        # One lock per in-flight cache key, so concurrent misses wait for a
+        # single fetch; dropped once the fill is done.
+        self._tools_fetch_locks: Dict[tuple, threading.Lock] = {}
+        self._tools_fetch_locks_guard = threading.Lock()
     
     # --- Cache Helper Methods ---
     
-    def _cache_key(self, tool_name: str, args: Dict[str, Any]) -> tuple:
-        """Generate a cache key from tool name and arguments."""
-        return (tool_name.upper(), json.dumps(args, sort_keys=True))
+    def _cache_key(self, user_id: str, tool_name: str, args: Dict[str, Any]) -> tuple:
+        """Generate a cache key from user, tool name and arguments."""
+        return (user_id, tool_name.upper(), json.dumps(args, sort_keys=True, default=str))
     
-    def _get_cached(self, tool_name: str, args: Dict[str, Any]) -> Optional[Any]:
+    def _get_cached(self, user_id: str, tool_name: str, args: Dict[str, Any]) -> Optional[Any]:
         """Get cached result if still valid (within TTL)."""
-        key = self._cache_key(tool_name, args)
-        entry = self._cache.get(key)
-        if entry and time.time() - entry["ts"] < self._cache_ttl_seconds:
-            print(f"DEBUG: Cache HIT for {tool_name}")
-            return entry["value"]
-        return None
+        key = self._cache_key(user_id, tool_name, args)
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry["ts"] >= self._cache_ttl_seconds:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+        logger.debug("Cache HIT for %s", tool_name)
+        return entry["value"]
     
-    def _set_cached(self, tool_name: str, args: Dict[str, Any], value: Any) -> None:
-        """Store result in cache with timestamp."""
-        key = self._cache_key(tool_name, args)
-        self._cache[key] = {"value": value, "ts": time.time()}
-        print(f"DEBUG: Cached result for {tool_name}")
+    def _set_cached(
+        self,
+        user_id: str,
+        tool_name: str,
+        args: Dict[str, Any],
+        value: Any,
+        generation: Optional[int] = None,
+    ) -> None:
+        """Store result in cache with timestamp, evicting the least recently used."""
+        key = self._cache_key(user_id, tool_name, args)
+        with self._cache_lock:
+            if generation is not None and generation != self._cache_generations.get(
+                (user_id, _tool_slug_to_app_slug(tool_name)), 0
+            ):
+                # A write landed while this read ran; its result may predate it.
+                return
+            self._cache[key] = {"value": value, "ts": time.time()}
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_max_entries:
+                self._cache.popitem(last=False)
+        logger.debug("Cached result for %s", tool_name)
+
+    def _cache_generation(self, user_id: str, tool_name: str) -> int:
+        """Stamp of the user's latest write to the tool's app, for _set_cached."""
+        with self._cache_lock:
+            return self._cache_generations.get((user_id, _tool_slug_to_app_slug(tool_name)), 0)
+
+    def _invalidate_cached_results(self, user_id: str, tool_name: str) -> None:
+        """Drop a user's cached reads for the app a mutating tool just changed."""
+        app_slug = _tool_slug_to_app_slug(tool_name)
+        with self._cache_lock:
+            self._cache_writes += 1
+            self._cache_generations[(user_id, app_slug)] = self._cache_writes
+            self._cache_generations.move_to_end((user_id, app_slug))
+            while len(self._cache_generations) > self._cache_max_entries:
+                self._cache_generations.popitem(last=False)
+            stale = [
+                key
+                for key in self._cache
+                if key[0] == user_id and _tool_slug_to_app_slug(key[1]) == app_slug
+            ]
+            for key in stale:
+                del self._cache[key]
+
+    def register_write_classifier(
+        self,
+        app_slug: str,
+        classifier: Callable[[str, Dict[str, Any]], bool],
+    ) -> None:
+        """Let an app's service decide which of its tools invalidate cached reads."""
+        self._write_classifiers[app_slug] = classifier
+
+    def _invalidates_cached_reads(self, slug: str, arguments: Dict[str, Any]) -> bool:
+        classifier = self._write_classifiers.get(_tool_slug_to_app_slug(slug))
+        if classifier is not None:
+            return classifier(slug, arguments)
+        upper_slug = slug.upper()
+        return any(marker in upper_slug for marker in CACHE_INVALIDATING_MARKERS)
+
+    def invalidate_tools_cache(self, user_id: Optional[str] = None) -> None:
+        """Drop cached tool definitions for one user, or for everyone."""
+        with self._tools_cache_lock:
+            if user_id is None:
+                self._tools_cache.clear()
+                return
+            for key in [key for key in self._tools_cache if key[0] == user_id]:
+                del self._tools_cache[key]
 
     def _list_connected_accounts(
         self,
@@ -269,7 +372,7 @@ class ComposioService:
             )
             items = _extract_account_items(accounts)
         except Exception as exc:  # noqa: BLE001 - treat lookup failures as empty
-            print(f"DEBUG: Failed to list connected accounts for {app_name}: {exc}")
+            logger.warning("Failed to list connected accounts for %s: %s", app_name, exc)
             return []
 
         allowed = {
@@ -366,7 +469,7 @@ class ComposioService:
         try:
             refresh_result = self.refresh_connection(account_id)
         except Exception as exc:  # noqa: BLE001 - keep auth refresh best-effort
-            print(f"DEBUG: Failed to refresh auth for {app_slug}: {exc}")
+            logger.warning("Failed to refresh auth for %s: %s", app_slug, exc)
             return {"refreshed": False, "action_required": False}
 
         redirect_url = refresh_result.get("redirect_url")
@@ -482,6 +585,8 @@ class ComposioService:
             The authorization URL for the user to visit
         """
         app_name_lower = app_name.lower()
+        # A new connection can change which tools Composio returns for this user.
+        self.invalidate_tools_cache(user_id)
         if hasattr(self.composio, "get_entity"):
             try:
                 return self._initiate_client_sdk_connection(
@@ -490,9 +595,9 @@ class ComposioService:
                     callback_url=callback_url,
                 )
             except Exception as exc:
-                print(
-                    "DEBUG: Client SDK connection initiation failed; "
-                    f"falling back to legacy auth config flow: {exc}"
+                logger.warning(
+                    "Client SDK connection initiation failed; falling back to legacy auth config flow: %s",
+                    exc,
                 )
 
         existing_accounts = self._list_accounts_for_app(user_id=user_id, app_name=app_name_lower)
@@ -616,7 +721,11 @@ class ComposioService:
                     )
                     items = _extract_account_items(accounts)
                 except Exception as retry_exc:  # noqa: BLE001 - treat lookup failures as disconnected
-                    print(f"DEBUG: Failed to fetch connection status for {app_slug}: {retry_exc}")
+                    logger.warning(
+                        "Failed to fetch connection status for %s: %s",
+                        app_slug,
+                        retry_exc,
+                    )
                     return {
                         "connected": False,
                         "status": None,
@@ -625,7 +734,7 @@ class ComposioService:
                         "error": str(retry_exc),
                     }
             else:
-                print(f"DEBUG: Failed to fetch connection status for {app_slug}: {exc}")
+                logger.warning("Failed to fetch connection status for %s: %s", app_slug, exc)
                 return {
                     "connected": False,
                     "status": None,
@@ -726,7 +835,7 @@ class ComposioService:
             )
             items = _extract_account_items(accounts)
         except Exception as exc:  # noqa: BLE001 - surface failure as zero disconnects
-            print(f"DEBUG: Failed to list connected accounts for {app_slug}: {exc}")
+            logger.warning("Failed to list connected accounts for %s: %s", app_slug, exc)
             return 0
 
         disconnected_count = 0
@@ -745,6 +854,9 @@ class ComposioService:
             if self._delete_connected_account(account_id):
                 disconnected_count += 1
 
+        if disconnected_count:
+            # Accounts are removed for every matching user, not just `user_id`.
+            self.invalidate_tools_cache()
         return disconnected_count
 
     def _delete_connected_account(self, account_id: str) -> bool:
@@ -755,7 +867,7 @@ class ComposioService:
                 self.composio.http.delete(url=f"/v1/connectedAccounts/{account_id}")
                 return True
             except Exception as exc:  # noqa: BLE001 - best-effort deletion
-                print(f"DEBUG: Failed to delete account {account_id}: {exc}")
+                logger.warning("Failed to delete account %s: %s", account_id, exc)
                 return False
 
         try:
@@ -774,13 +886,13 @@ class ComposioService:
                         self.composio.connected_accounts.delete(connected_account_id=account_id)
                         return True
                     except Exception as exc:  # noqa: BLE001 - best-effort deletion
-                        print(f"DEBUG: Failed to delete account {account_id}: {exc}")
+                        logger.warning("Failed to delete account %s: %s", account_id, exc)
                         return False
                 except Exception as exc:  # noqa: BLE001 - best-effort deletion
-                    print(f"DEBUG: Failed to delete account {account_id}: {exc}")
+                    logger.warning("Failed to delete account %s: %s", account_id, exc)
                     return False
         except Exception as exc:  # noqa: BLE001 - best-effort deletion
-            print(f"DEBUG: Failed to delete account {account_id}: {exc}")
+            logger.warning("Failed to delete account %s: %s", account_id, exc)
             return False
 
     def fetch_tools(
@@ -803,17 +915,75 @@ class ComposioService:
         if slugs:
             normalized_slugs = [normalize_tool_slug(slug) for slug in slugs]
             normalized_slugs = list(dict.fromkeys(normalized_slugs))
-            if hasattr(self.composio, "actions") and not hasattr(self.composio, "tools"):
-                return self.composio.actions.get(actions=normalized_slugs)
-            return self.composio.tools.get(
-                user_id=user_id,
-                tools=normalized_slugs,
-            )
-        if toolkits:
-            if hasattr(self.composio, "actions") and not hasattr(self.composio, "tools"):
-                return self.composio.actions.get(apps=toolkits)
-            return self.composio.tools.get(user_id=user_id, toolkits=toolkits)
-        raise ValueError("Must provide slugs or toolkits to fetch tools.")
+            key = (user_id, "tools", tuple(normalized_slugs))
+        elif toolkits:
+            normalized_slugs = None
+            key = (user_id, "toolkits", tuple(toolkits))
+        else:
+            raise ValueError("Must provide slugs or toolkits to fetch tools.")
+
+        cached = self._fresh_tools(key)
+        if cached is not None:
+            return cached
+
+        fetch_lock = self._tools_fetch_lock(key)
+        try:
+            with fetch_lock:
+                # Another request may have fetched these tools while we waited.
+                cached = self._fresh_tools(key)
+                if cached is not None:
+                    return cached
+                return self._fetch_tools_uncached(key, user_id, normalized_slugs, toolkits)
+        finally:
+            # Waiters already hold this lock object; later misses make a new one.
+            with self._tools_fetch_locks_guard:
+                if self._tools_fetch_locks.get(key) is fetch_lock:
+                    del self._tools_fetch_locks[key]
+
+    def _fresh_tools(self, key: tuple) -> Optional[List[Any]]:
+        with self._tools_cache_lock:
+            entry = self._tools_cache.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry["ts"] >= self._tools_cache_ttl_seconds:
+                del self._tools_cache[key]
+                return None
+            self._tools_cache.move_to_end(key)
+        return list(entry["value"])
+
+    def _tools_fetch_lock(self, key: tuple) -> threading.Lock:
+        with self._tools_fetch_locks_guard:
+            return self._tools_fetch_locks.setdefault(key, threading.Lock())
+
+    def _fetch_tools_uncached(
+        self,
+        key: tuple,
+        user_id: str,
+        normalized_slugs: Optional[List[str]],
+        toolkits: Optional[List[str]],
+    ) -> List[Any]:
+        legacy_client = hasattr(self.composio, "actions") and not hasattr(self.composio, "tools")
+        if normalized_slugs:
+            if legacy_client:
+                tools = self.composio.actions.get(actions=normalized_slugs)
+            else:
+                tools = self.composio.tools.get(
+                    user_id=user_id,
+                    tools=normalized_slugs,
+                )
+        elif legacy_client:
+            tools = self.composio.actions.get(apps=toolkits)
+        else:
+            tools = self.composio.tools.get(user_id=user_id, toolkits=toolkits)
+
+        tools = list(tools or [])
+        # Failed fetches raise above, so only successful tool lists are cached.
+        with self._tools_cache_lock:
+            self._tools_cache[key] = {"value": tools, "ts": time.time()}
+            self._tools_cache.move_to_end(key)
+            while len(self._tools_cache) > self._tools_cache_max_entries:
+                self._tools_cache.popitem(last=False)
+        return list(tools)
     
     def execute_action(
         self,
@@ -834,14 +1004,16 @@ class ComposioService:
         """
         normalized_slug = normalize_tool_slug(action_slug)
         if normalized_slug != action_slug:
-            print(
-                f"DEBUG: Normalized action slug {action_slug} -> {normalized_slug}"
+            logger.debug("Normalized action slug %s -> %s", action_slug, normalized_slug)
+        if normalized_slug.upper() in READ_ONLY_CACHEABLE_TOOLS:
+            # Name resolvers (e.g. listing Slack users) share the agent loop's read cache.
+            result = self.execute_tool(normalized_slug, arguments, user_id)
+        else:
+            result = self._execute_with_auth_retry(
+                slug=normalized_slug,
+                arguments=arguments,
+                user_id=user_id,
             )
-        result = self._execute_with_auth_retry(
-            slug=normalized_slug,
-            arguments=arguments,
-            user_id=user_id,
-        )
         # Convert result to dict format expected by the rest of the code
         if hasattr(result, 'data'):
             return {"data": result.data, "successful": result.successful}
@@ -867,20 +1039,31 @@ class ComposioService:
         """
         normalized_slug = normalize_tool_slug(slug)
         if normalized_slug != slug:
-            print(f"DEBUG: Normalized tool slug {slug} -> {normalized_slug}")
+            logger.debug("Normalized tool slug %s -> %s", slug, normalized_slug)
         slug = normalized_slug
 
         # Check cache first for read-only tools
-        if slug.upper() in READ_ONLY_CACHEABLE_TOOLS:
-            cached = self._get_cached(slug, arguments)
+        upper_slug = slug.upper()
+        invalidates_cache = False
+        if upper_slug in READ_ONLY_CACHEABLE_TOOLS:
+            cached = self._get_cached(user_id, slug, arguments)
             if cached is not None:
                 return cached
-        
-        result = self._execute_with_auth_retry(
-            slug=slug,
-            arguments=arguments,
-            user_id=user_id,
-        )
+            cache_generation = self._cache_generation(user_id, slug)
+        else:
+            invalidates_cache = self._invalidates_cached_reads(slug, arguments)
+
+        try:
+            result = self._execute_with_auth_retry(
+                slug=slug,
+                arguments=arguments,
+                user_id=user_id,
+            )
+        finally:
+            # Only once the write is done, so no read can re-cache older data;
+            # also on failure, since a failed write may have partly applied.
+            if invalidates_cache:
+                self._invalidate_cached_results(user_id, slug)
         
         # Handle pagination for slack_list_all_channels
         if slug.lower() == "slack_list_all_channels":
@@ -894,10 +1077,14 @@ class ComposioService:
                 max_pages = 10
                 pages = 1
                 
-                print(f"DEBUG: slack_list_all_channels page 1: {len(channels)} channels. Next cursor: {next_cursor}")
+                logger.debug(
+                    "slack_list_all_channels page 1: %s channels. Next cursor: %s",
+                    len(channels),
+                    next_cursor,
+                )
                 
                 while next_cursor and pages < max_pages:
-                    print(f"DEBUG: Fetching page {pages + 1} with cursor {next_cursor}")
+                    logger.debug("Fetching page %s with cursor %s", pages + 1, next_cursor)
                     paged_args = {**arguments, "cursor": next_cursor}
                     
                     page_result = self._execute_with_auth_retry(
@@ -914,7 +1101,12 @@ class ComposioService:
                     next_cursor = meta.get("next_cursor")
                     pages += 1
                     
-                    print(f"DEBUG: Page {pages} added {len(new_channels)} channels. Total: {len(channels)}")
+                    logger.debug(
+                        "Page %s added %s channels. Total: %s",
+                        pages,
+                        len(new_channels),
+                        len(channels),
+                    )
                 
                 # Update result with aggregated channels
                 if isinstance(result, dict):
@@ -934,7 +1126,7 @@ class ComposioService:
                             result.data["response_metadata"]["next_cursor"] = ""
                             
             except Exception as e:
-                print(f"DEBUG: Error handling Slack pagination: {e}")
+                logger.warning("Error handling Slack pagination: %s", e)
                 # Fallback to returning original result
                 pass
 
@@ -957,7 +1149,7 @@ class ComposioService:
                         result.data.pop("conversations", None)
                         result.data.pop("response_metadata", None)
             except Exception as e:
-                print(f"DEBUG: Error slimming Slack channel list: {e}")
+                logger.warning("Error slimming Slack channel list: %s", e)
 
         if slug.lower() in {"linear_get_all_linear_teams", "linear_list_linear_teams"}:
             try:
@@ -972,7 +1164,7 @@ class ComposioService:
                     if hasattr(result, "data") and isinstance(result.data, dict):
                         result.data["teams"] = slim_teams
             except Exception as e:
-                print(f"DEBUG: Error slimming Linear teams: {e}")
+                logger.warning("Error slimming Linear teams: %s", e)
         
         # Handle post-processing for slack_fetch_conversation_history
         if slug.lower() == "slack_fetch_conversation_history":
@@ -1002,13 +1194,13 @@ class ComposioService:
                         result.data["messages"] = simplified
                         
             except Exception as e:
-                print(f"DEBUG: Error handling Slack history filtering: {e}")
+                logger.warning("Error handling Slack history filtering: %s", e)
                 pass
 
         # Cache successful results for read-only tools
-        if slug.upper() in READ_ONLY_CACHEABLE_TOOLS:
+        if upper_slug in READ_ONLY_CACHEABLE_TOOLS:
             # Only cache if result looks successful (has data)
             if hasattr(result, 'data') or (isinstance(result, dict) and result.get('data')):
-                self._set_cached(slug, arguments, result)
+                self._set_cached(user_id, slug, arguments, result, cache_generation)
 
         return result
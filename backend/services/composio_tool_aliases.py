@@ -1,6 +1,7 @@
 """Legacy-to-current Composio tool slug mappings."""
 
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, Tuple
 
 
 TOOL_SLUG_ALIASES: Dict[str, str] = {
@@ -17,9 +18,29 @@ TOOL_SLUG_ALIASES: Dict[str, str] = {
 }
 
 
+@lru_cache(maxsize=1024)
 def normalize_tool_slug(slug: str) -> str:
     """Normalize legacy Composio tool slugs to current equivalents."""
+    # Tool names come from a fixed catalog, so each one is uppercased once
+    # instead of on every function call of every turn.
     if not slug:
         return slug
     upper_slug = slug.upper()
     return TOOL_SLUG_ALIASES.get(upper_slug, upper_slug)
+
+
+@lru_cache(maxsize=2048)
+def tool_slug_matches(
+    slug: str,
+    prefixes: Tuple[str, ...] = (),
+    substrings: Tuple[str, ...] = (),
+) -> bool:
+    """
+    Whether the normalized, lowercased slug starts with one of `prefixes` or
+    contains one of `substrings`.
+
+    Services classify tools by name on every function call; the answer only
+    depends on the arguments, so each name is matched once per pattern set.
+    """
+    slug_lower = normalize_tool_slug(slug).lower()
+    return slug_lower.startswith(prefixes) or any(part in slug_lower for part in substrings)
@@ -1,8 +1,11 @@
 """GitHub-specific service for tool loading and write detection."""
 
+import logging
 from typing import Any, Dict, List
 from .composio_service import ComposioService
-from .composio_tool_aliases import normalize_tool_slug
+from .composio_tool_aliases import normalize_tool_slug, tool_slug_matches
+
+logger = logging.getLogger(__name__)
 
 
 class GitHubService:
@@ -47,6 +50,7 @@ class GitHubService:
             composio_service: The ComposioService instance to use for execution
         """
         self.composio_service = composio_service
+        composio_service.register_write_classifier("github", self.is_write_action)
 
     def is_write_action(
         self,
@@ -64,11 +68,7 @@ class GitHubService:
         Returns:
             True if this is a write action, False otherwise
         """
-        tool_name_lower = normalize_tool_slug(tool_name).lower()
-        if tool_name_lower.startswith(self.GITHUB_WRITE_PREFIXES):
-            return True
-
-        return False
+        return tool_slug_matches(tool_name, prefixes=self.GITHUB_WRITE_PREFIXES)
 
     def _tool_slug(self, tool: Any) -> str:
         if isinstance(tool, dict):
@@ -118,7 +118,7 @@ class GitHubService:
         )
         filtered = self._filter_tools_by_scope(tools, scope)
         if not filtered and scope != "full":
-            print(f"DEBUG: No GitHub tools available after filtering scope={scope}.")
+            logger.debug("No GitHub tools available after filtering scope=%s.", scope)
         return filtered
 
     def enrich_proposal(
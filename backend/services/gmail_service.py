@@ -2,7 +2,7 @@
 
 from typing import Any, Dict, List
 from .composio_service import ComposioService
-from .composio_tool_aliases import normalize_tool_slug
+from .composio_tool_aliases import tool_slug_matches
 
 
 class GmailService:
@@ -52,6 +52,19 @@ class GmailService:
         "GMAIL_FORWARD_MESSAGE",
     ]
 
+    GMAIL_WRITE_PREFIXES = (
+        "gmail_send_",
+        "gmail_reply_",
+        "gmail_forward_",
+        "gmail_create_",
+        "gmail_delete_",
+        "gmail_patch_",
+        "gmail_modify_",
+        "gmail_add_",
+        "gmail_move_",
+        "gmail_batch_",
+    )
+
     def __init__(self, composio_service: ComposioService):
         """
         Initialize GmailService with a ComposioService instance.
@@ -60,6 +73,7 @@ class GmailService:
             composio_service: The ComposioService instance to use for execution
         """
         self.composio_service = composio_service
+        composio_service.register_write_classifier("gmail", self.is_write_action)
 
     def is_write_action(
         self,
@@ -77,23 +91,7 @@ class GmailService:
         Returns:
             True if this is a write action, False otherwise
         """
-        tool_name_lower = normalize_tool_slug(tool_name).lower()
-        write_prefixes = (
-            "gmail_send_",
-            "gmail_reply_",
-            "gmail_forward_",
-            "gmail_create_",
-            "gmail_delete_",
-            "gmail_patch_",
-            "gmail_modify_",
-            "gmail_add_",
-            "gmail_move_",
-            "gmail_batch_",
-        )
-        if tool_name_lower.startswith(write_prefixes):
-            return True
-
-        return False
+        return tool_slug_matches(tool_name, prefixes=self.GMAIL_WRITE_PREFIXES)
 
     def _slugs_for_scope(self, scope: str) -> List[str]:
         if scope == "read":
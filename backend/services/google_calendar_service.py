@@ -2,7 +2,7 @@
 
 from typing import Any, Dict, List
 from .composio_service import ComposioService
-from .composio_tool_aliases import normalize_tool_slug
+from .composio_tool_aliases import tool_slug_matches
 
 
 class GoogleCalendarService:
@@ -62,6 +62,20 @@ class GoogleCalendarService:
         "GOOGLECALENDAR_QUICK_ADD",
     ]
 
+    GOOGLE_CALENDAR_WRITE_TOKENS = (
+        "create_",
+        "update_",
+        "patch_",
+        "delete_",
+        "quick_add",
+        "remove_",
+        "move",
+        "import",
+        "duplicate_",
+        "clear_",
+        "insert",
+    )
+
     def __init__(self, composio_service: ComposioService):
         """
         Initialize GoogleCalendarService with a ComposioService instance.
@@ -70,6 +84,7 @@ class GoogleCalendarService:
             composio_service: The ComposioService instance to use for execution
         """
         self.composio_service = composio_service
+        composio_service.register_write_classifier("googlecalendar", self.is_write_action)
 
     def is_write_action(
         self,
@@ -87,24 +102,7 @@ class GoogleCalendarService:
         Returns:
             True if this is a write action, False otherwise
         """
-        tool_name_lower = normalize_tool_slug(tool_name).lower()
-        write_tokens = (
-            "create_",
-            "update_",
-            "patch_",
-            "delete_",
-            "quick_add",
-            "remove_",
-            "move",
-            "import",
-            "duplicate_",
-            "clear_",
-            "insert",
-        )
-        if any(token in tool_name_lower for token in write_tokens):
-            return True
-
-        return False
+        return tool_slug_matches(tool_name, substrings=self.GOOGLE_CALENDAR_WRITE_TOKENS)
 
     def _slugs_for_scope(self, scope: str) -> List[str]:
         if scope == "read":
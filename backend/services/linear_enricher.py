@@ -1,7 +1,18 @@
 """Helper class to enrich Linear proposals with human-readable metadata."""
 
-from typing import Any, Dict, Optional
+import logging
+from typing import Any, Dict, List, Optional, Tuple
 
+logger = logging.getLogger(__name__)
+
+
+# (name field, accepted ID arg keys, GraphQL entity) per lookup.
+_NAME_LOOKUPS = (
+    ("teamName", ("team_id", "teamId", "team"), "team"),
+    ("stateName", ("state_id", "stateId", "status"), "workflowState"),
+    ("projectName", ("project_id", "projectId", "project"), "project"),
+    ("assigneeName", ("assignee_id", "assigneeId", "assignee"), "user"),
+)
 
 class LinearEnricher:
     """Provides cached lookups for Linear entities to enrich proposals."""
@@ -11,17 +22,27 @@ class LinearEnricher:
         self._cache: Dict[str, Any] = {}
 
     def enrich(self, user_id: str, args: Dict[str, Any], tool_name: str = "") -> Dict[str, Any]:
+        return self.enrich_many(user_id, [(args, tool_name)])[0]
+
+    def enrich_many(
+        self, user_id: str, proposals: List[Tuple[Dict[str, Any], str]]
+    ) -> List[Dict[str, Any]]:
+        """Enrich proposals, resolving all their IDs with one query up front."""
+        try:
+            self._prefetch_names(user_id, [args for args, _ in proposals])
+        except Exception as exc:  # noqa: BLE001 - best-effort enrichment
+            logger.warning("Error prefetching proposal names: %s", exc)
+        return [self._enrich_one(user_id, args, tool_name) for args, tool_name in proposals]
+
+    def _enrich_one(self, user_id: str, args: Dict[str, Any], tool_name: str) -> Dict[str, Any]:
         enriched_args = args.copy()
 
         try:
             self._enrich_from_issue_if_update(user_id, tool_name, enriched_args, args)
-            self._enrich_team(user_id, enriched_args, args)
-            self._enrich_state(user_id, enriched_args, args)
-            self._enrich_project(user_id, enriched_args, args)
-            self._enrich_assignee(user_id, enriched_args, args)
+            self._enrich_names(user_id, enriched_args, args)
             self._enrich_priority(enriched_args)
         except Exception as exc:  # noqa: BLE001 - best-effort enrichment
-            print(f"DEBUG: Error enriching proposal: {exc}")
+            logger.warning("Error enriching proposal: %s", exc)
 
         return enriched_args
 
@@ -42,7 +63,7 @@ class LinearEnricher:
 
         if "title" not in enriched_args and issue_data.get("title"):
             enriched_args["title"] = issue_data["title"]
-            print(f"DEBUG: Enriched from issue - title: {issue_data['title']}")
+            logger.debug("Enriched from issue - title: %s", issue_data["title"])
 
         if "description" not in enriched_args and issue_data.get("description"):
             enriched_args["description"] = issue_data["description"]
@@ -51,7 +72,7 @@ class LinearEnricher:
         if isinstance(team_info, dict):
             if "teamName" not in enriched_args and team_info.get("name"):
                 enriched_args["teamName"] = team_info["name"]
-                print(f"DEBUG: Enriched from issue - teamName: {team_info['name']}")
+                logger.debug("Enriched from issue - teamName: %s", team_info["name"])
             if "team_id" not in enriched_args and "teamId" not in enriched_args:
                 enriched_args["teamId"] = team_info.get("id")
 
@@ -59,106 +80,35 @@ class LinearEnricher:
         if isinstance(project_info, dict):
             if "projectName" not in enriched_args and project_info.get("name"):
                 enriched_args["projectName"] = project_info["name"]
-                print(f"DEBUG: Enriched from issue - projectName: {project_info['name']}")
+                logger.debug("Enriched from issue - projectName: %s", project_info["name"])
 
         assignee_info = issue_data.get("assignee")
         if isinstance(assignee_info, dict):
             if "assigneeName" not in enriched_args and assignee_info.get("name"):
                 enriched_args["assigneeName"] = assignee_info["name"]
-                print(f"DEBUG: Enriched from issue - assigneeName: {assignee_info['name']}")
+                logger.debug("Enriched from issue - assigneeName: %s", assignee_info["name"])
 
         state_info = issue_data.get("state")
         if isinstance(state_info, dict) and not any(k in args for k in ["state_id", "stateId", "status"]):
             if "stateName" not in enriched_args and state_info.get("name"):
                 enriched_args["stateName"] = state_info["name"]
-                print(f"DEBUG: Enriched from issue - stateName: {state_info['name']}")
+                logger.debug("Enriched from issue - stateName: %s", state_info["name"])
 
         if "priority" not in args and issue_data.get("priority") is not None:
             enriched_args["priority"] = issue_data.get("priority")
 
-    def _enrich_team(self, user_id: str, enriched_args: Dict[str, Any], args: Dict[str, Any]) -> None:
-        team_id = args.get("team_id") or args.get("teamId") or args.get("team")
-        if not (team_id and isinstance(team_id, str) and "teamName" not in enriched_args):
-            return
-
-        query = f"""
-        {{
-          team(id: "{team_id}") {{
-            id
-            name
-          }}
-        }}
-        """
-        print(f"DEBUG: Executing team query for ID: {team_id}")
-        data = self.linear_service.execute_query(user_id, query)
-        print(f"DEBUG: Team query result: {data}")
-        team_data = self._first_dict(data, "team", "teams")
-
-        if team_data and "name" in team_data:
-            enriched_args["teamName"] = team_data["name"]
-            print(f"DEBUG: Enriched team name: {team_data['name']}")
-
-    def _enrich_state(self, user_id: str, enriched_args: Dict[str, Any], args: Dict[str, Any]) -> None:
-        state_id = args.get("state_id") or args.get("stateId") or args.get("status")
-        if not (state_id and isinstance(state_id, str) and "stateName" not in enriched_args):
-            return
-
-        state_query = f"""
-        {{
-          workflowState(id: "{state_id}") {{
-            id
-            name
-          }}
-        }}
-        """
-        data = self.linear_service.execute_query(user_id, state_query)
-        workflow_state = self._first_dict(data, "workflowState", "state")
-
-        if workflow_state and "name" in workflow_state:
-            enriched_args["stateName"] = workflow_state["name"]
-            print(f"DEBUG: Enriched state name: {workflow_state['name']}")
-
-    def _enrich_project(self, user_id: str, enriched_args: Dict[str, Any], args: Dict[str, Any]) -> None:
-        project_id = args.get("project_id") or args.get("projectId") or args.get("project")
-        if not (project_id and isinstance(project_id, str) and "projectName" not in enriched_args):
-            return
-
-        project_query = f"""
-        {{
-          project(id: "{project_id}") {{
-            id
-            name
-          }}
-        }}
-        """
-        print(f"DEBUG: Executing project query for ID: {project_id}")
-        data = self.linear_service.execute_query(user_id, project_query)
-        project_data = self._first_dict(data, "project")
-
-        if project_data and "name" in project_data:
-            enriched_args["projectName"] = project_data["name"]
-            print(f"DEBUG: Enriched project name: {project_data['name']}")
-
-    def _enrich_assignee(self, user_id: str, enriched_args: Dict[str, Any], args: Dict[str, Any]) -> None:
-        assignee_id = args.get("assignee_id") or args.get("assigneeId") or args.get("assignee")
-        if not (assignee_id and isinstance(assignee_id, str) and "assigneeName" not in enriched_args):
-            return
-
-        assignee_query = f"""
-        {{
-          user(id: "{assignee_id}") {{
-            id
-            name
-          }}
-        }}
-        """
-        print(f"DEBUG: Executing assignee query for ID: {assignee_id}")
-        data = self.linear_service.execute_query(user_id, assignee_query)
-        user_data = self._first_dict(data, "user")
-
-        if user_data and "name" in user_data:
-            enriched_args["assigneeName"] = user_data["name"]
-            print(f"DEBUG: Enriched assignee name: {user_data['name']}")
+    def _enrich_names(self, user_id: str, enriched_args: Dict[str, Any], args: Dict[str, Any]) -> None:
+        # Names were resolved by _prefetch_names; unresolved IDs stay as they are.
+        for name_key, id_keys, entity in _NAME_LOOKUPS:
+            if name_key in enriched_args:
+                continue
+            entity_id = next((args.get(key) for key in id_keys if args.get(key)), None)
+            if not entity_id or not isinstance(entity_id, str):
+                continue
+            name = self.linear_service.get_cached_name(user_id, entity, entity_id)
+            if name:
+                enriched_args[name_key] = name
+                logger.debug("Enriched %s: %s", name_key, name)
 
     def _enrich_priority(self, enriched_args: Dict[str, Any]) -> None:
         priority_value = enriched_args.get("priority")
@@ -168,10 +118,51 @@ class LinearEnricher:
         priority_map = {0: "No Priority", 1: "Urgent", 2: "High", 3: "Medium", 4: "Low"}
         if isinstance(priority_value, int) and priority_value in priority_map:
             enriched_args["priorityName"] = priority_map[priority_value]
-            print(f"DEBUG: Enriched priorityName: {priority_map[priority_value]}")
+            logger.debug("Enriched priorityName: %s", priority_map[priority_value])
 
     # --- Queries with caching ---
 
+    def _prefetch_names(self, user_id: str, all_args: List[Dict[str, Any]]) -> None:
+        """Resolve every uncached ID across the proposals with one aliased query."""
+        pending: Dict[Tuple[str, str], None] = {}
+        for args in all_args:
+            for _, id_keys, entity in _NAME_LOOKUPS:
+                entity_id = next((args.get(key) for key in id_keys if args.get(key)), None)
+                if not entity_id or not isinstance(entity_id, str):
+                    continue
+                if self.linear_service.get_cached_name(user_id, entity, entity_id):
+                    continue
+                pending.setdefault((entity, entity_id), None)
+        if not pending:
+            return
+
+        lookups = list(pending)
+        logger.debug("Executing batched name query for %s ID(s)", len(lookups))
+        if self._query_names(user_id, lookups) or len(lookups) == 1:
+            return
+        # Linear's root fields are non-null, so one unresolvable ID (say
+        # ``status: "Todo"``) nulls the whole batch; retry each on its own.
+        logger.debug("Batched name query failed; resolving IDs one by one")
+        for lookup in lookups:
+            self._query_names(user_id, [lookup])
+
+    def _query_names(self, user_id: str, lookups: List[Tuple[str, str]]) -> bool:
+        """Cache the names for ``lookups``; return False if the query failed."""
+        selections = "\n".join(
+            f'  n{index}: {entity}(id: "{entity_id}") {{ id name }}'
+            for index, (entity, entity_id) in enumerate(lookups)
+        )
+        data = self.linear_service.execute_query(user_id, f"{{\n{selections}\n}}")
+        if not isinstance(data, dict) or data.get("errors"):
+            return False
+
+        for index, (entity, entity_id) in enumerate(lookups):
+            entity_data = data.get(f"n{index}")
+            name = entity_data.get("name") if isinstance(entity_data, dict) else None
+            if isinstance(name, str) and name:
+                self.linear_service.set_cached_name(user_id, entity, entity_id, name)
+        return True
+
     def _fetch_issue(self, user_id: str, issue_id: str) -> Optional[Dict[str, Any]]:
         cache_key = f"issue:{issue_id}"
         if cache_key in self._cache:
@@ -195,21 +186,3 @@ class LinearEnricher:
         issue_data = data.get("issue") if isinstance(data, dict) else None
         self._cache[cache_key] = issue_data
         return issue_data
-
-    # --- Utility helpers ---
-
-    @staticmethod
-    def _first_dict(data: Optional[Dict[str, Any]], *keys: str) -> Optional[Dict[str, Any]]:
-        if not data or not isinstance(data, dict):
-            return None
-        for key in keys:
-            value = data.get(key)
-            if isinstance(value, dict):
-                return value
-            if isinstance(value, list) and value:
-                candidate = value[0]
-                if isinstance(candidate, dict):
-                    return candidate
-        return None
-
-
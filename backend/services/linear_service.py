@@ -1,12 +1,23 @@
 """Linear-specific service for actions, queries, and enrichment."""
 
 import json
+import logging
 import re
-from typing import Dict, Any, List, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 from composio.exceptions import EnumMetadataNotFound
 from .composio_service import ComposioService
 from .linear_enricher import LinearEnricher
-from .composio_tool_aliases import normalize_tool_slug
+from .composio_tool_aliases import normalize_tool_slug, tool_slug_matches
+
+logger = logging.getLogger(__name__)
+
+
+_LINEAR_WRITE_MARKERS = ("create_", "update_", "delete_", "remove_", "manage_")
+# Matches only the leading keyword, so long GraphQL documents are never copied.
+_GRAPHQL_MUTATION_RE = re.compile(r"\s*mutation", re.IGNORECASE)
 
 
 class LinearService:
@@ -66,6 +77,35 @@ class LinearService:
             composio_service: The ComposioService instance to use for execution
         """
         self.composio_service = composio_service
+        composio_service.register_write_classifier("linear", self.is_write_action)
+        # Short-lived id -> name lookups shared by every proposal enrichment,
+        # oldest first so expired entries are dropped from the front
+        self._name_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._name_cache_ttl_seconds = 60
+        self._name_cache_max_entries = 10_000
+        self._name_cache_lock = threading.Lock()
+
+    def get_cached_name(self, user_id: str, entity: str, entity_id: str) -> Optional[str]:
+        """Return a recently resolved display name, if still within TTL."""
+        with self._name_cache_lock:
+            entry = self._name_cache.get((user_id, entity, entity_id))
+        if entry and time.time() - entry["ts"] < self._name_cache_ttl_seconds:
+            return entry["value"]
+        return None
+
+    def set_cached_name(self, user_id: str, entity: str, entity_id: str, name: str) -> None:
+        """Remember a resolved display name for a Linear entity."""
+        key = (user_id, entity, entity_id)
+        now = time.time()
+        with self._name_cache_lock:
+            self._name_cache[key] = {"value": name, "ts": now}
+            self._name_cache.move_to_end(key)
+            while self._name_cache:
+                oldest = next(iter(self._name_cache.values()))
+                expired = now - oldest["ts"] >= self._name_cache_ttl_seconds
+                if not expired and len(self._name_cache) <= self._name_cache_max_entries:
+                    break
+                self._name_cache.popitem(last=False)
     
     def is_write_action(self, tool_name: str, tool_args: dict) -> bool:
         """
@@ -80,20 +120,12 @@ class LinearService:
         Returns:
             True if this is a write action, False otherwise
         """
-        tool_name_lower = normalize_tool_slug(tool_name).lower()
-        
-        # Check for common write prefixes
-        write_prefixes = ["create_", "update_", "delete_", "remove_", "manage_"]
-        if any(prefix in tool_name_lower for prefix in write_prefixes):
-            return True
-        
+        slug = normalize_tool_slug(tool_name)
         # Special case: GraphQL mutations via run_query_or_mutation
-        if "run_query_or_mutation" in tool_name_lower:
-            query = tool_args.get("query_or_mutation", "").strip().lower()
-            if query.startswith("mutation"):
-                return True
-        
-        return False
+        if "RUN_QUERY_OR_MUTATION" in slug:
+            query = tool_args.get("query_or_mutation") or ""
+            return isinstance(query, str) and _GRAPHQL_MUTATION_RE.match(query) is not None
+        return tool_slug_matches(slug, substrings=_LINEAR_WRITE_MARKERS)
 
     def _slugs_for_scope(self, scope: str) -> List[str]:
         if scope == "read":
@@ -142,14 +174,14 @@ class LinearService:
                     slugs=remaining,
                 )
                 if skipped:
-                    print(f"DEBUG: Skipped deprecated Linear actions: {skipped}")
+                    logger.debug("Skipped deprecated Linear actions: %s", skipped)
                 return tools
             except EnumMetadataNotFound as enum_error:
                 missing_slug = self._extract_missing_action_slug(str(enum_error))
                 if missing_slug:
                     if missing_slug in remaining:
-                        print(
-                            f"DEBUG: Linear action {missing_slug} is unavailable in Composio. Skipping."
+                        logger.debug(
+                            "Linear action %s is unavailable in Composio. Skipping.", missing_slug
                         )
                         remaining = [slug for slug in remaining if slug != missing_slug]
                         skipped.append(missing_slug)
@@ -162,7 +194,7 @@ class LinearService:
                     # Try to extract the problematic tool
                     for slug in remaining:
                         if slug.lower() in error_str.lower():
-                            print(f"DEBUG: Tool {slug} not found. Skipping.")
+                            logger.debug("Tool %s not found. Skipping.", slug)
                             remaining = [s for s in remaining if s != slug]
                             skipped.append(slug)
                             break
@@ -172,7 +204,7 @@ class LinearService:
                     raise
 
         if scope != "full":
-            print(f"DEBUG: No Linear tools available for scope={scope}.")
+            logger.debug("No Linear tools available for scope=%s.", scope)
             return []
         missing_list = ", ".join(skipped) if skipped else "unknown"
         raise RuntimeError(
@@ -200,7 +232,7 @@ class LinearService:
                 user_id=user_id,
             )
         except Exception as e:
-            print(f"DEBUG: Failed to execute Linear query: {e}")
+            logger.warning("Failed to execute Linear query: %s", e)
             return None
 
         data = result.get("data")
@@ -211,7 +243,7 @@ class LinearService:
             try:
                 data = json.loads(data)
             except json.JSONDecodeError:
-                print("DEBUG: Failed to parse Linear query string response as JSON.")
+                logger.warning("Failed to parse Linear query string response as JSON.")
                 return None
 
         # Keep unwrapping nested "data" keys until we reach actual content
@@ -231,3 +263,21 @@ class LinearService:
         """
         enricher = LinearEnricher(self)
         return enricher.enrich(user_id=user_id, args=args, tool_name=tool_name)
+
+    def enrich_proposals(
+        self, user_id: str, proposals: List[Tuple[Dict[str, Any], str]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Enrich several proposals at once.
+
+        IDs across all proposals are resolved in a single Linear query, so N
+        proposals cost one lookup round-trip instead of one per proposal.
+
+        Args:
+            user_id: The user ID for executing queries
+            proposals: (args, tool_name) pairs
+
+        Returns:
+            Enriched arguments, in the same order as proposals
+        """
+        return LinearEnricher(self).enrich_many(user_id, proposals)
@@ -1,8 +1,11 @@
 """Notion-specific service for tool loading and write detection."""
 
+import logging
 from typing import Any, Dict, List
 from .composio_service import ComposioService
-from .composio_tool_aliases import normalize_tool_slug
+from .composio_tool_aliases import normalize_tool_slug, tool_slug_matches
+
+logger = logging.getLogger(__name__)
 
 
 class NotionService:
@@ -35,6 +38,7 @@ class NotionService:
             composio_service: The ComposioService instance to use for execution
         """
         self.composio_service = composio_service
+        composio_service.register_write_classifier("notion", self.is_write_action)
 
     def is_write_action(self, tool_name: str, tool_args: Dict[str, Any]) -> bool:
         """
@@ -47,11 +51,7 @@ class NotionService:
         Returns:
             True if this is a write action, False otherwise
         """
-        tool_name_lower = normalize_tool_slug(tool_name).lower()
-        if tool_name_lower.startswith(self.NOTION_WRITE_PREFIXES):
-            return True
-
-        return False
+        return tool_slug_matches(tool_name, prefixes=self.NOTION_WRITE_PREFIXES)
 
     def _tool_slug(self, tool: Any) -> str:
         if isinstance(tool, dict):
@@ -101,7 +101,7 @@ class NotionService:
         )
         filtered = self._filter_tools_by_scope(tools, scope)
         if not filtered and scope != "full":
-            print(f"DEBUG: No Notion tools available after filtering scope={scope}.")
+            logger.debug("No Notion tools available after filtering scope=%s.", scope)
         return filtered
 
     def enrich_proposal(self, user_id: str, args: Dict[str, Any], tool_name: str = "") -> Dict[str, Any]:
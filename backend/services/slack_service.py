@@ -1,12 +1,17 @@
 """Slack-specific service for actions, queries, and enrichment."""
 
 import json
+import logging
 import re
-from typing import Dict, Any, List, Optional
+import threading
+import time
+from typing import Dict, Any, List, Optional, Set, Tuple
 from composio.exceptions import EnumMetadataNotFound
 from .composio_tool_aliases import normalize_tool_slug
 from .composio_service import ComposioService
 
+logger = logging.getLogger(__name__)
+
 
 class SlackService:
     """Service for Slack-specific operations."""
@@ -62,6 +67,21 @@ class SlackService:
         ],
         "full": SLACK_ACTION_SLUGS,
     }
+
+    SLACK_WRITE_ACTIONS = frozenset({
+        "SLACK_SEND_MESSAGE",
+        "SLACK_SEND_EPHEMERAL_MESSAGE",
+        "SLACK_SCHEDULE_MESSAGE",
+        "SLACK_CREATE_CHANNEL",
+        "SLACK_INVITE_USER_TO_CHANNEL",
+        "SLACK_REMOVE_A_USER_FROM_A_CONVERSATION",
+        "SLACK_LEAVE_A_CONVERSATION",
+        "SLACK_ARCHIVE_A_SLACK_CONVERSATION",
+        "SLACK_RENAME_A_CONVERSATION",
+        "SLACK_SET_A_CONVERSATION_S_PURPOSE",
+        "SLACK_SET_THE_TOPIC_OF_A_CONVERSATION",
+        "SLACK_UPDATES_A_SLACK_MESSAGE",
+    })
     
     def __init__(self, composio_service: ComposioService):
         """
@@ -71,7 +91,12 @@ class SlackService:
             composio_service: The ComposioService instance to use for execution
         """
         self.composio_service = composio_service
-        self._channel_name_cache: Dict[str, Dict[str, str]] = {}
+        composio_service.register_write_classifier("slack", self.is_write_action)
+        # Per-user id -> name maps, rebuilt after the TTL so renames show up
+        self._channel_name_cache: Dict[str, Dict[str, Any]] = {}
+        self._user_name_cache: Dict[str, Dict[str, Any]] = {}
+        self._name_cache_ttl_seconds = 300
+        self._name_cache_lock = threading.Lock()
     
     def is_write_action(self, tool_name: str, tool_args: dict) -> bool:
         """
@@ -84,28 +109,8 @@ class SlackService:
         Returns:
             True if this is a write action, False otherwise
         """
-        tool_name_lower = normalize_tool_slug(tool_name).lower()
-        
-        # Explicit list of write actions
-        write_actions = {
-            "slack_send_message",
-            "slack_send_ephemeral_message",
-            "slack_schedule_message",
-            "slack_create_channel",
-            "slack_invite_user_to_channel",
-            "slack_remove_a_user_from_a_conversation",
-            "slack_leave_a_conversation",
-            "slack_archive_a_slack_conversation",
-            "slack_rename_a_conversation",
-            "slack_set_a_conversation_s_purpose",
-            "slack_set_the_topic_of_a_conversation",
-            "slack_updates_a_slack_message",
-        }
-
-        if tool_name_lower in write_actions:
-            return True
-            
-        return False
+        # normalize_tool_slug uppercases, matching the explicit write list
+        return normalize_tool_slug(tool_name) in self.SLACK_WRITE_ACTIONS
 
     def _slugs_for_scope(self, scope: str) -> List[str]:
         selected = self.SLACK_SCOPE_SLUGS.get(scope, self.SLACK_ACTION_SLUGS)
@@ -132,7 +137,7 @@ class SlackService:
                     slugs=remaining,
                 )
                 if skipped:
-                    print(f"DEBUG: Skipped unavailable Slack actions: {skipped}")
+                    logger.debug("Skipped unavailable Slack actions: %s", skipped)
                 return tools
             except EnumMetadataNotFound as enum_error:
                 # Try to extract missing slug from error message if possible
@@ -142,7 +147,7 @@ class SlackService:
                 missing_slug = match.group(1) if match else None
                 
                 if missing_slug and missing_slug in remaining:
-                    print(f"DEBUG: Slack action {missing_slug} is unavailable. Skipping.")
+                    logger.debug("Slack action %s is unavailable. Skipping.", missing_slug)
                     remaining = [slug for slug in remaining if slug != missing_slug]
                     skipped.append(missing_slug)
                     continue
@@ -152,7 +157,7 @@ class SlackService:
                 if "not found" in error_str.lower() or "does not exist" in error_str.lower():
                     for slug in remaining:
                         if slug.lower() in error_str.lower():
-                            print(f"DEBUG: Tool {slug} not found. Skipping.")
+                            logger.debug("Tool %s not found. Skipping.", slug)
                             remaining = [s for s in remaining if s != slug]
                             skipped.append(slug)
                             break
@@ -162,7 +167,7 @@ class SlackService:
                     raise
 
         if scope != "full":
-            print(f"DEBUG: No Slack tools available for scope={scope}.")
+            logger.debug("No Slack tools available for scope=%s.", scope)
             return []
         raise RuntimeError(f"Unable to load any Slack tools. Missing: {skipped}")
 
@@ -178,6 +183,30 @@ class SlackService:
         Returns:
             Enriched arguments dictionary
         """
+        return self._enrich(user_id, args, set())
+
+    def enrich_proposals(
+        self, user_id: str, proposals: List[Tuple[Dict[str, Any], str]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Enrich several proposals at once.
+
+        Channels and users are each listed at most once for the whole batch,
+        even when an ID is missing from the listing, so one
+        SLACK_LIST_ALL_CHANNELS call covers every message destination.
+
+        Args:
+            user_id: The user ID for executing queries
+            proposals: (args, tool_name) pairs
+
+        Returns:
+            Enriched arguments, in the same order as proposals
+        """
+        listed: Set[str] = set()
+        return [self._enrich(user_id, args, listed) for args, _ in proposals]
+
+    def _enrich(self, user_id: str, args: Dict[str, Any], listed: Set[str]) -> Dict[str, Any]:
+        """Enrich one proposal; listings named in `listed` are not fetched again."""
         enriched_args = args.copy()
         
         try:
@@ -189,15 +218,17 @@ class SlackService:
                     enriched_args["channelName"] = channel_id
                     enriched_args["channelDisplay"] = channel_id
                 else:
-                    print(f"DEBUG: Attempting to resolve Slack channel ID: {channel_id}")
-                    resolved = self._resolve_channel_name(user_id, channel_id)
+                    logger.debug("Attempting to resolve Slack channel ID: %s", channel_id)
+                    resolved = self._resolve_channel_name(user_id, channel_id, listed)
                     if resolved:
                         enriched_args["channelName"] = f"#{resolved}"
                         enriched_args["channelDisplay"] = f"#{resolved}"
                     else:
                         # Fallback: maybe it's a user DM? Or not in joined channels?
                         if channel_id.startswith("U") or channel_id.startswith("W"):
-                            self._enrich_user_name(user_id, channel_id, enriched_args, "channelName")
+                            self._enrich_user_name(
+                                user_id, channel_id, enriched_args, "channelName", listed
+                            )
                         if "channelDisplay" not in enriched_args:
                             enriched_args["channelDisplay"] = self._channel_display_for_id(
                                 channel_id
@@ -206,19 +237,25 @@ class SlackService:
             # Enrich User (if sending DM or ephemeral)
             user_target = args.get("user")
             if user_target and isinstance(user_target, str) and "userName" not in enriched_args:
-                 self._enrich_user_name(user_id, user_target, enriched_args, "userName")
+                 self._enrich_user_name(user_id, user_target, enriched_args, "userName", listed)
 
         except Exception as e:
-            print(f"DEBUG: Error enriching Slack proposal: {e}")
+            logger.warning("Error enriching Slack proposal: %s", e)
             
         return enriched_args
 
-    def _resolve_channel_name(self, user_id: str, channel_id: str) -> Optional[str]:
+    def _resolve_channel_name(
+        self, user_id: str, channel_id: str, listed: Optional[Set[str]] = None
+    ) -> Optional[str]:
         """Resolve a Slack channel ID to a human-readable name."""
-        user_cache = self._channel_name_cache.setdefault(user_id, {})
+        user_cache = self._fresh_name_cache(self._channel_name_cache, user_id)
         cached_name = user_cache.get(channel_id)
         if cached_name:
             return cached_name
+        if listed is not None:
+            if "channels" in listed:
+                return None
+            listed.add("channels")
 
         try:
             result = self.composio_service.execute_tool(
@@ -227,7 +264,7 @@ class SlackService:
                 user_id=user_id,
             )
         except Exception as exc:
-            print(f"DEBUG: Failed to resolve channel via SLACK_LIST_ALL_CHANNELS: {exc}")
+            logger.warning("Failed to resolve channel via SLACK_LIST_ALL_CHANNELS: %s", exc)
             return None
 
         data = self._extract_result_data(result)
@@ -245,9 +282,24 @@ class SlackService:
 
         resolved = user_cache.get(channel_id)
         if resolved:
-            print(f"DEBUG: Resolved channel {channel_id} to #{resolved}")
+            logger.debug("Resolved channel %s to #%s", channel_id, resolved)
         return resolved
 
+    def _fresh_name_cache(self, cache: Dict[str, Dict[str, Any]], user_id: str) -> Dict[str, str]:
+        """A user's id -> name map, started over once it is older than the TTL."""
+        now = time.time()
+        with self._name_cache_lock:
+            entry = cache.get(user_id)
+            if entry is None or now - entry["ts"] >= self._name_cache_ttl_seconds:
+                for stale_user in [
+                    key for key, value in cache.items()
+                    if now - value["ts"] >= self._name_cache_ttl_seconds
+                ]:
+                    del cache[stale_user]
+                entry = {"names": {}, "ts": now}
+                cache[user_id] = entry
+            return entry["names"]
+
     def _extract_result_data(self, result: Any) -> Dict[str, Any]:
         if hasattr(result, "data"):
             data = getattr(result, "data")
@@ -280,16 +332,29 @@ class SlackService:
             return "Direct Message"
         return "Channel"
 
-    def _enrich_user_name(self, user_id: str, target_user_id: str, enriched_args: Dict[str, Any], key: str):
+    def _enrich_user_name(
+        self,
+        user_id: str,
+        target_user_id: str,
+        enriched_args: Dict[str, Any],
+        key: str,
+        listed: Optional[Set[str]] = None,
+    ):
         """Helper to resolve user ID to name."""
+        user_cache = self._fresh_name_cache(self._user_name_cache, user_id)
+        cached_name = user_cache.get(target_user_id)
+        if cached_name:
+            enriched_args[key] = cached_name
+            return
+        if listed is not None:
+            if "users" in listed:
+                return
+            listed.add("users")
+
         try:
-            # We don't have a direct "get user" tool in the list I defined, 
-            # but SLACK_LIST_ALL_USERS is there.
-            # Again, listing all users might be heavy. 
-            # But let's try it for now or assume the agent did it.
-            # Actually, let's try to fetch it.
-            
-            print(f"DEBUG: Attempting to resolve Slack user ID: {target_user_id}")
+            # There is no "get user" tool, so list all users once and remember
+            # every name; later proposals for this workspace hit the cache.
+            logger.debug("Attempting to resolve Slack user ID: %s", target_user_id)
             result = self.composio_service.execute_action(
                 action_slug="SLACK_LIST_ALL_USERS",
                 arguments={"limit": 1000}, 
@@ -302,13 +367,18 @@ class SlackService:
                 if isinstance(data, dict):
                     users = data.get("members", [])
             
-            found_user = next((u for u in users if u.get("id") == target_user_id), None)
-            
-            if found_user:
-                real_name = found_user.get("real_name") or found_user.get("name")
-                if real_name:
-                    enriched_args[key] = real_name
-                    print(f"DEBUG: Resolved user {target_user_id} to {real_name}")
+            for member in users:
+                if not isinstance(member, dict):
+                    continue
+                member_id = member.get("id")
+                real_name = member.get("real_name") or member.get("name")
+                if isinstance(member_id, str) and isinstance(real_name, str) and real_name:
+                    user_cache[member_id] = real_name
+
+            real_name = user_cache.get(target_user_id)
+            if real_name:
+                enriched_args[key] = real_name
+                logger.debug("Resolved user %s to %s", target_user_id, real_name)
                     
         except Exception as e:
-            print(f"DEBUG: Failed to resolve user name: {e}")
+            logger.warning("Failed to resolve user name: %s", e)
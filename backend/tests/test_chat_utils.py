@@ -0,0 +1,30 @@
+"""Tests for chat history formatting."""
+
+from backend.utils.chat_utils import format_history
+
+
+def test_format_history_normalizes_part_shapes():
+    formatted = format_history(
+        [
+            {"role": "user", "parts": "hello"},
+            {"role": "model", "parts": ["hi", {"text": "there"}, {"image": "x"}]},
+        ]
+    )
+
+    assert [content.role for content in formatted] == ["user", "model"]
+    assert [part.text for part in formatted[0].parts] == ["hello"]
+    assert [part.text for part in formatted[1].parts] == ["hi", "there"]
+
+
+def test_format_history_reuses_messages_from_previous_turns():
+    first_turn = [{"role": "user", "parts": "list my issues"}]
+    second_turn = first_turn + [
+        {"role": "model", "parts": "You have 2 open issues."},
+        {"role": "user", "parts": "close the first one"},
+    ]
+
+    before = format_history(first_turn)
+    after = format_history(second_turn)
+
+    assert after[0] is before[0]
+    assert len(after) == 3
@@ -2,7 +2,7 @@
 
 from unittest.mock import MagicMock
 
-from backend.services.composio_tool_aliases import normalize_tool_slug
+from backend.services.composio_tool_aliases import normalize_tool_slug, tool_slug_matches
 from backend.services.slack_service import SlackService
 
 
@@ -22,6 +22,13 @@ def test_normalize_tool_slug_uppercases_unknown_slug():
     assert normalize_tool_slug("linear_list_linear_teams") == "LINEAR_LIST_LINEAR_TEAMS"
 
 
+def test_tool_slug_matches_prefixes_and_substrings():
+    assert tool_slug_matches("GMAIL_SEND_EMAIL", prefixes=("gmail_send",)) is True
+    assert tool_slug_matches("GMAIL_FETCH_EMAILS", prefixes=("gmail_send",)) is False
+    assert tool_slug_matches("LINEAR_CREATE_LINEAR_ISSUE", substrings=("create_",)) is True
+    assert tool_slug_matches("NOTION_CREATE_PAGE", prefixes=("notion_create_notion_page",)) is True
+
+
 def test_slack_write_action_aliases():
     service = SlackService(MagicMock())
 
@@ -0,0 +1,307 @@
+"""Unit tests for dispatcher helpers."""
+
+import threading
+from datetime import date
+from unittest.mock import MagicMock
+
+from backend.agent.dispatcher import (
+    AgentDispatcher,
+    DispatchPhase,
+    DispatcherContext,
+    PendingAction,
+    _build_tool_response_payload,
+    _canonical_args,
+    _send_message_with_retry,
+    _stream_message_with_retry,
+    _summarize_for_model,
+)
+from backend.llm.types import LLMChat, LLMResponse, ToolCall, ToolResult
+
+
+def test_tool_payload_passes_json_native_results_through():
+    result_data = {"issues": [{"id": "ISS-1", "done": True}]}
+
+    payload = _build_tool_response_payload(result_data)
+
+    assert payload == {"result": result_data}
+    assert payload["result"] is result_data
+
+
+def test_tool_payload_coerces_non_json_values():
+    payload = _build_tool_response_payload({"due": date(2024, 1, 2)})
+
+    assert payload == {"result": {"due": "2024-01-02"}}
+
+
+def test_tool_payload_truncates_large_results():
+    payload = _build_tool_response_payload({"text": "x" * 50}, max_chars=20)
+
+    assert payload["truncated"] is True
+    assert payload["result"].endswith("...[truncated]")
+    assert len(payload["result"]) == 20 + len("...[truncated]")
+
+
+def test_tool_payload_keeps_leading_list_items_when_oversized():
+    issues = [{"id": f"ISS-{index}", "title": "x" * 40} for index in range(50)]
+    result_data = {"successful": True, "data": {"issues": issues}}
+
+    payload = _build_tool_response_payload(result_data, max_chars=500)
+
+    kept = payload["result"]["data"]["issues"]
+    assert payload["truncated"] is True
+    assert 0 < len(kept) < 50
+    assert kept == issues[: len(kept)]
+    assert payload["omitted_items"] == 50 - len(kept)
+    assert payload["result"]["successful"] is True
+    assert len(result_data["data"]["issues"]) == 50
+
+
+def test_canonical_args_ignore_key_order():
+    first = {"team_id": "T1", "filter": {"state": "open", "assignee": "me"}}
+    second = {"filter": {"assignee": "me", "state": "open"}, "team_id": "T1"}
+
+    assert _canonical_args(first) == _canonical_args(second)
+    assert _canonical_args(first) != _canonical_args({"team_id": "T2"})
+    assert _canonical_args({1: "a"}) == _canonical_args({1: "a"})
+
+
+def test_issue_lists_are_projected_to_model_fields():
+    issue = {
+        "id": "uuid-1",
+        "identifier": "ENG-1",
+        "title": "Fix login",
+        "state": {"name": "Todo"},
+        "description": "A very long description",
+        "createdAt": "2024-01-02T00:00:00Z",
+    }
+    result_data = {"data": {"issues": [issue]}, "successful": True}
+
+    summarized = _summarize_for_model("LINEAR_LIST_LINEAR_ISSUES", result_data)
+
+    assert summarized == {
+        "data": {
+            "issues": [
+                {"id": "uuid-1", "identifier": "ENG-1", "title": "Fix login", "state": {"name": "Todo"}}
+            ]
+        },
+        "successful": True,
+    }
+    assert "description" in result_data["data"]["issues"][0]
+    assert _summarize_for_model("LINEAR_GET_LINEAR_ISSUE", result_data) is result_data
+
+
+def test_read_batch_executes_concurrently_and_replies_in_order():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def execute_tool(slug, arguments, user_id):
+        barrier.wait()
+        return {"slug": slug}
+
+    composio_service = MagicMock()
+    composio_service.execute_tool.side_effect = execute_tool
+    services = [MagicMock() for _ in range(6)]
+    dispatcher = AgentDispatcher(composio_service, *services)
+    chat = MagicMock()
+    context = DispatcherContext(user_input="status", user_id="user-1")
+    context.pending_read_actions = [
+        PendingAction("LINEAR_LIST_LINEAR_ISSUES", {}, "call-1", "linear"),
+        PendingAction("SLACK_LIST_ALL_CHANNELS", {}, "call-2", "slack"),
+    ]
+
+    events = []
+    generator = dispatcher._handle_read(chat, context)
+    try:
+        while True:
+            events.append(next(generator))
+    except StopIteration as stop:
+        phase = stop.value
+
+    assert phase == DispatchPhase.PLANNING
+    assert [event["status"] for event in events] == ["searching", "searching", "done", "done"]
+    chat.send_tool_result.assert_not_called()
+    (sent,), _ = chat.send_tool_results.call_args
+    assert [(item.name, item.result, item.call_id) for item in sent] == [
+        ("LINEAR_LIST_LINEAR_ISSUES", {"result": {"slug": "LINEAR_LIST_LINEAR_ISSUES"}}, "call-1"),
+        ("SLACK_LIST_ALL_CHANNELS", {"result": {"slug": "SLACK_LIST_ALL_CHANNELS"}}, "call-2"),
+    ]
+
+
+def _drain(generator):
+    events = []
+    try:
+        while True:
+            events.append(next(generator))
+    except StopIteration as stop:
+        return events, stop.value
+
+
+def test_stream_message_emits_deltas_and_returns_response():
+    chat = LLMChat()
+    chat.send_user_message = MagicMock(return_value=LLMResponse(text="All clear."))
+
+    events, (response, error) = _drain(
+        _stream_message_with_retry(lambda: chat.stream_user_message("hi"))
+    )
+
+    assert events == [{"type": "message_delta", "content": "All clear."}]
+    assert response.text == "All clear."
+    assert error is None
+
+
+def test_stream_message_does_not_retry_after_partial_text():
+    attempts = []
+
+    def stream():
+        attempts.append(1)
+        yield "partial"
+        raise RuntimeError("429 RESOURCE_EXHAUSTED")
+
+    events, (response, error) = _drain(_stream_message_with_retry(stream))
+
+    assert len(attempts) == 1
+    assert events == [{"type": "message_delta", "content": "partial"}]
+    assert response is None
+    assert "429" in str(error)
+
+
+def test_send_message_backs_off_on_server_errors_but_not_bad_requests(monkeypatch):
+    from google.genai import errors as genai_errors
+
+    from backend.agent import dispatcher
+
+    delays = []
+    monkeypatch.setattr(dispatcher.time, "sleep", delays.append)
+    unavailable = genai_errors.ServerError(
+        503, {"error": {"code": 503, "status": "UNAVAILABLE", "message": "overloaded"}}
+    )
+    outcomes = [unavailable, unavailable, unavailable, "ok"]
+
+    def send():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert _send_message_with_retry(send) == ("ok", None)
+    assert len(delays) == 3
+    for delay, base in zip(delays, [0.5, 1.0, 2.0]):
+        assert base <= delay <= base + 0.25
+
+    def bad_request():
+        # Mentions 503 in its text, but is a client error.
+        raise genai_errors.ClientError(
+            404, {"error": {"code": 404, "status": "NOT_FOUND", "message": "ENG-1503 not found"}}
+        )
+
+    response, error = _send_message_with_retry(bad_request)
+    assert response is None and "ENG-1503" in str(error)
+    assert len(delays) == 3
+
+
+def test_write_classification_routes_to_owning_service_only():
+    services = [MagicMock() for _ in range(6)]
+    linear_service, slack_service = services[0], services[1]
+    slack_service.is_write_action.return_value = True
+    dispatcher = AgentDispatcher(MagicMock(), *services)
+
+    assert dispatcher._is_write_action("slack", "SLACK_SEND_MESSAGE", {}) is True
+    assert dispatcher._is_write_action("unknown", "FOO_BAR", {}) is False
+    linear_service.is_write_action.assert_not_called()
+    slack_service.is_write_action.assert_called_once_with("SLACK_SEND_MESSAGE", {})
+
+
+def test_tool_payload_handles_non_string_keys_and_huge_ints():
+    payload = _build_tool_response_payload({"counts": {1: "one"}, "big": 2**70})
+
+    assert payload == {"result": {"counts": {1: "one"}, "big": 2**70}}
+
+
+def test_send_tool_results_defaults_to_one_send_per_result():
+    chat = LLMChat()
+    chat.send_tool_result = MagicMock(
+        side_effect=[LLMResponse(text="first"), LLMResponse(text="second")]
+    )
+
+    response = chat.send_tool_results(
+        [ToolResult("A", {"result": 1}, "call-1"), ToolResult("B", {"result": 2})]
+    )
+
+    assert response.text == "second"
+    assert [call.args for call in chat.send_tool_result.call_args_list] == [
+        ("A", {"result": 1}, "call-1"),
+        ("B", {"result": 2}, None),
+    ]
+
+
+def test_unknown_tool_is_answered_without_calling_composio():
+    composio_service = MagicMock()
+    services = [MagicMock() for _ in range(6)]
+    services[0].is_write_action.return_value = True
+    dispatcher = AgentDispatcher(composio_service, *services)
+    chat = MagicMock()
+    context = DispatcherContext(
+        user_input="create a ticket",
+        user_id="user-1",
+        known_tools=frozenset({"LINEAR_CREATE_LINEAR_ISSUE"}),
+    )
+    context.response = LLMResponse(
+        tool_calls=[ToolCall(name="LINEAR_CREATE_TICKET", args={}, call_id="call-1")]
+    )
+
+    _, phase = _drain(dispatcher._handle_planning(chat, context))
+    events, _ = _drain(dispatcher._handle_read(chat, context))
+
+    assert phase == DispatchPhase.EXECUTING_READ
+    assert context.pending_write_actions == []
+    services[0].is_write_action.assert_not_called()
+    composio_service.execute_tool.assert_not_called()
+    assert events[-1]["status"] == "error"
+    (sent,), _ = chat.send_tool_results.call_args
+    assert "Unknown tool LINEAR_CREATE_TICKET" in sent[0].result["error"]
+
+
+def test_read_batch_executes_repeated_calls_once():
+    composio_service = MagicMock()
+    composio_service.execute_tool.return_value = {"channels": ["general"]}
+    dispatcher = AgentDispatcher(composio_service, *[MagicMock() for _ in range(6)])
+    context = DispatcherContext(user_input="channels", user_id="user-1")
+    read_actions = [
+        PendingAction("SLACK_LIST_ALL_CHANNELS", {"limit": 5, "cursor": None}, "call-1", "slack"),
+        PendingAction("SLACK_LIST_ALL_CHANNELS", {"cursor": None, "limit": 5}, "call-2", "slack"),
+    ]
+
+    results = dispatcher._execute_read_batch(read_actions, context)
+
+    composio_service.execute_tool.assert_called_once()
+    assert results == [({"result": {"channels": ["general"]}}, "done")] * 2
+
+
+def test_run_emits_pre_detected_summary_before_model_reply():
+    dispatcher = AgentDispatcher(MagicMock(), *[MagicMock() for _ in range(6)])
+    chat = MagicMock()
+    order = []
+
+    def send_user_message(text):
+        order.append("model")
+        return LLMResponse(text="Done.")
+
+    chat.send_user_message.side_effect = send_user_message
+    for event in dispatcher.run(chat, "check linear and post on slack", "user-1"):
+        order.append(event["type"])
+
+    assert order.index("early_summary") < order.index("model")
+    assert order[-1] == "message"
+
+
+def test_involved_apps_snapshot_is_shared_until_apps_change():
+    context = DispatcherContext(user_input="status", user_id="user-1")
+
+    assert context.add_involved_app("linear") is True
+    first = context.involved_apps_snapshot
+    assert context.add_involved_app("linear") is False
+    assert context.involved_apps_snapshot is first
+
+    context.add_involved_app("slack")
+
+    assert first == ("linear",)
+    assert context.involved_apps_snapshot == ("linear", "slack")
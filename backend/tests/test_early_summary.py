@@ -2,11 +2,19 @@
 Unit tests for early summary helpers and caching behavior.
 """
 import pytest
+import threading
 import time
 from unittest.mock import MagicMock, patch
 
 # Test early summary helpers
-from backend.agent.common import looks_like_tool_request, map_tool_to_app, make_early_summary
+from backend.agent.common import (
+    _APP_KEYWORDS,
+    detect_apps_from_input,
+    looks_like_tool_request,
+    make_combined_early_summary,
+    map_tool_to_app,
+    make_early_summary,
+)
 
 
 class TestMapToolToApp:
@@ -85,6 +93,16 @@ class TestMakeEarlySummary:
         summary = make_early_summary("google_calendar")
         assert "Google Calendar" in summary
 
+    def test_combined_summary_names_first_two_apps(self):
+        """Multi-app requests name the first two apps' actions in order."""
+        assert make_combined_early_summary(["linear", "slack"]) == (
+            "I'll create a ticket in Linear and notify the team on Slack."
+        )
+        assert make_combined_early_summary(["linear", "slack", "github"]) == (
+            "I'll create a ticket in Linear and notify the team on Slack."
+        )
+        assert make_combined_early_summary(["github"]) == "I'll check GitHub."
+
 
 class TestLooksLikeToolRequest:
     """Tests for the looks_like_tool_request helper function."""
@@ -102,6 +120,34 @@ class TestLooksLikeToolRequest:
         assert not looks_like_tool_request("I like the new design")
 
 
+class TestDetectAppsFromInput:
+    """Tests for keyword-based app pre-detection."""
+
+    @pytest.mark.parametrize(
+        "user_input",
+        [
+            "File a bug in Linear and tell the billing team on Slack",
+            "Schedule a meeting and email the notes to Alice",
+            "print the repository stats",
+            "Summarize my INBOX",
+            "hello there",
+            "",
+        ],
+    )
+    def test_matches_per_keyword_substring_scan(self, user_input):
+        """The single-pass scan finds exactly what per-keyword checks would, in app order."""
+        user_lower = user_input.lower()
+        expected = [
+            app for app, keywords in _APP_KEYWORDS if any(kw in user_lower for kw in keywords)
+        ]
+        assert detect_apps_from_input(user_input) == expected
+
+    def test_overlapping_keywords_from_different_apps(self):
+        """Keywords that share characters are all found, as with substring checks."""
+        # "bug" and "github" overlap on the "g".
+        assert detect_apps_from_input("bugithub") == ["linear", "github"]
+
+
 class TestComposioServiceCaching:
     """Tests for the caching behavior in ComposioService."""
     
@@ -153,6 +199,132 @@ class TestComposioServiceCaching:
             
             assert mock_execute.call_count == 2  # Both executed
     
+    def test_cache_is_per_user_and_dropped_by_writes(self):
+        """Cached reads never leak across users and go stale after a write to the app."""
+        with patch("backend.services.composio_service.Composio") as MockComposio, \
+             patch("backend.services.composio_service.os.getenv", return_value="fake_key"):
+            
+            from backend.services.composio_service import ComposioService
+            
+            service = ComposioService()
+            mock_execute = MagicMock()
+            service.composio.tools.execute = mock_execute
+            
+            result = MagicMock()
+            result.data = {"projects": []}
+            mock_execute.return_value = result
+            
+            service.execute_tool("LINEAR_LIST_LINEAR_PROJECTS", {}, "user1")
+            service.execute_tool("LINEAR_LIST_LINEAR_PROJECTS", {}, "user2")
+            assert mock_execute.call_count == 2  # Each user fetches their own
+            
+            service.execute_tool("LINEAR_CREATE_LINEAR_PROJECT", {"name": "Q3"}, "user1")
+            service.execute_tool("LINEAR_LIST_LINEAR_PROJECTS", {}, "user1")
+            service.execute_tool("LINEAR_LIST_LINEAR_PROJECTS", {}, "user2")
+            assert mock_execute.call_count == 4  # The write, then only user1's list is refetched
+    
+    def test_owning_service_classifies_cache_invalidating_writes(self):
+        """Slack writes without a CREATE/UPDATE-style name still drop cached listings."""
+        with patch("backend.services.composio_service.Composio") as MockComposio, \
+             patch("backend.services.composio_service.os.getenv", return_value="fake_key"):
+            
+            from backend.services.composio_service import ComposioService
+            from backend.services.slack_service import SlackService
+            
+            service = ComposioService()
+            SlackService(service)
+            mock_execute = MagicMock()
+            service.composio.tools.execute = mock_execute
+            
+            result = MagicMock()
+            result.data = {"channels": []}
+            mock_execute.return_value = result
+            
+            service.execute_tool("SLACK_LIST_CONVERSATIONS", {}, "user1")
+            service.execute_tool("SLACK_RENAME_A_CONVERSATION", {"channel": "C1", "name": "x"}, "user1")
+            service.execute_tool("SLACK_LIST_CONVERSATIONS", {}, "user1")
+            assert mock_execute.call_count == 3
+    
+    def test_reads_overlapping_a_write_are_not_cached(self):
+        """Writes invalidate after they run, even on failure, and overlapping reads are not cached."""
+        with patch("backend.services.composio_service.Composio") as MockComposio, \
+             patch("backend.services.composio_service.os.getenv", return_value="fake_key"):
+            
+            from backend.services.composio_service import ComposioService
+            
+            service = ComposioService()
+            result = MagicMock()
+            result.data = {"projects": []}
+            calls = []
+            
+            def execute(slug, arguments, **kwargs):
+                calls.append(slug)
+                if slug == "LINEAR_CREATE_LINEAR_PROJECT":
+                    raise RuntimeError("boom")
+                if len(calls) == 1:
+                    # A write finishes while this first read is in flight.
+                    service._invalidate_cached_results("user1", "LINEAR_CREATE_LINEAR_PROJECT")
+                return result
+            
+            service.composio.tools.execute = MagicMock(side_effect=execute)
+            
+            service.execute_tool("LINEAR_LIST_LINEAR_PROJECTS", {}, "user1")
+            service.execute_tool("LINEAR_LIST_LINEAR_PROJECTS", {}, "user1")
+            service.execute_tool("LINEAR_LIST_LINEAR_PROJECTS", {}, "user1")
+            assert len(calls) == 2  # The overlapping read was not cached
+            
+            with pytest.raises(RuntimeError):
+                service.execute_tool("LINEAR_CREATE_LINEAR_PROJECT", {"name": "Q3"}, "user1")
+            service.execute_tool("LINEAR_LIST_LINEAR_PROJECTS", {}, "user1")
+            assert len(calls) == 4  # The failed write still dropped the cached list
+    
+    def test_write_only_skips_caching_reads_of_its_own_user_and_app(self):
+        """Another user's write, or a write to another app, does not stop a read being cached."""
+        with patch("backend.services.composio_service.Composio") as MockComposio, \
+             patch("backend.services.composio_service.os.getenv", return_value="fake_key"):
+            
+            from backend.services.composio_service import ComposioService
+            
+            service = ComposioService()
+            result = MagicMock()
+            result.data = {"projects": []}
+            calls = []
+            
+            def execute(slug, arguments, **kwargs):
+                calls.append(slug)
+                if len(calls) == 1:
+                    service._invalidate_cached_results("user2", "LINEAR_CREATE_LINEAR_PROJECT")
+                    service._invalidate_cached_results("user1", "SLACK_SEND_MESSAGE")
+                return result
+            
+            service.composio.tools.execute = MagicMock(side_effect=execute)
+            
+            service.execute_tool("LINEAR_LIST_LINEAR_PROJECTS", {}, "user1")
+            service.execute_tool("LINEAR_LIST_LINEAR_PROJECTS", {}, "user1")
+            assert len(calls) == 1  # Cached despite the unrelated writes
+    
+    def test_execute_action_shares_read_cache(self):
+        """Resolver lookups through execute_action reuse cached agent reads."""
+        with patch("backend.services.composio_service.Composio") as MockComposio, \
+             patch("backend.services.composio_service.os.getenv", return_value="fake_key"):
+            
+            from backend.services.composio_service import ComposioService
+            
+            service = ComposioService()
+            mock_execute = MagicMock()
+            service.composio.tools.execute = mock_execute
+            
+            result = MagicMock()
+            result.data = {"members": [{"id": "U1", "name": "alice"}]}
+            result.successful = True
+            mock_execute.return_value = result
+            
+            service.execute_tool("SLACK_LIST_ALL_USERS", {"limit": 1000}, "user1")
+            action_result = service.execute_action("SLACK_LIST_ALL_USERS", {"limit": 1000}, "user1")
+            
+            assert mock_execute.call_count == 1
+            assert action_result == {"data": result.data, "successful": True}
+    
     def test_non_cacheable_tool_not_cached(self):
         """Non-cacheable tools should always execute."""
         with patch("backend.services.composio_service.Composio") as MockComposio, \
@@ -173,3 +345,84 @@ class TestComposioServiceCaching:
             service.execute_tool("SLACK_SEND_MESSAGE", {"channel": "C1"}, "user1")
             
             assert mock_execute.call_count == 2  # Both executed
+
+    def test_fetch_tools_cached_until_invalidated(self):
+        """Tool definitions are fetched once per user and slug set."""
+        with patch("backend.services.composio_service.Composio") as MockComposio, \
+             patch("backend.services.composio_service.os.getenv", return_value="fake_key"):
+            
+            from backend.services.composio_service import ComposioService
+            
+            service = ComposioService()
+            mock_get = MagicMock(return_value=["tool"])
+            service.composio.tools.get = mock_get
+            
+            assert service.fetch_tools("user1", slugs=["LINEAR_LIST_LINEAR_TEAMS"]) == ["tool"]
+            assert service.fetch_tools("user1", slugs=["LINEAR_LIST_LINEAR_TEAMS"]) == ["tool"]
+            assert mock_get.call_count == 1  # Second call served from cache
+            
+            service.fetch_tools("user2", slugs=["LINEAR_LIST_LINEAR_TEAMS"])
+            assert mock_get.call_count == 2  # Cache is per user
+            
+            service.invalidate_tools_cache("user1")
+            service.fetch_tools("user1", slugs=["LINEAR_LIST_LINEAR_TEAMS"])
+            service.fetch_tools("user2", slugs=["LINEAR_LIST_LINEAR_TEAMS"])
+            assert mock_get.call_count == 3  # Only user1 was refetched
+
+    def test_tools_cache_drops_expired_entries_and_stays_bounded(self):
+        """The tool definition cache evicts stale and least recently used entries."""
+        with patch("backend.services.composio_service.Composio") as MockComposio, \
+             patch("backend.services.composio_service.os.getenv", return_value="fake_key"):
+            
+            from backend.services.composio_service import ComposioService
+            
+            service = ComposioService()
+            service._tools_cache_max_entries = 2
+            service.composio.tools.get = MagicMock(return_value=["tool"])
+            
+            service.fetch_tools("user1", slugs=["LINEAR_LIST_LINEAR_TEAMS"])
+            (stale_key,) = service._tools_cache
+            service._tools_cache[stale_key]["ts"] -= service._tools_cache_ttl_seconds
+            assert service._fresh_tools(stale_key) is None
+            assert stale_key not in service._tools_cache
+            
+            for user_id in ("user1", "user2", "user3"):
+                service.fetch_tools(user_id, slugs=["LINEAR_LIST_LINEAR_TEAMS"])
+            assert [key[0] for key in service._tools_cache] == ["user2", "user3"]
+
+    def test_concurrent_fetch_tools_misses_share_one_fetch(self):
+        """Requests that miss the tool cache together wait for a single fetch."""
+        with patch("backend.services.composio_service.Composio") as MockComposio, \
+             patch("backend.services.composio_service.os.getenv", return_value="fake_key"):
+            
+            from backend.services.composio_service import ComposioService
+            
+            service = ComposioService()
+            release = threading.Event()
+            
+            def slow_get(**kwargs):
+                release.wait(timeout=5)
+                return ["tool"]
+            
+            mock_get = MagicMock(side_effect=slow_get)
+            service.composio.tools.get = mock_get
+            
+            results = []
+            threads = [
+                threading.Thread(
+                    target=lambda: results.append(
+                        service.fetch_tools("user1", slugs=["LINEAR_LIST_LINEAR_TEAMS"])
+                    )
+                )
+                for _ in range(3)
+            ]
+            for thread in threads:
+                thread.start()
+            time.sleep(0.05)
+            release.set()
+            for thread in threads:
+                thread.join(timeout=5)
+            
+            assert results == [["tool"]] * 3
+            assert mock_get.call_count == 1
+            assert service._tools_fetch_locks == {}
@@ -0,0 +1,113 @@
+"""Tests for Gemini batch input and output files."""
+
+import json
+
+from backend.llm.providers.gemini_batch import build_batch_file, parse_batch_output
+
+
+def test_build_batch_file_writes_one_keyed_request_per_line():
+    payload = build_batch_file(
+        [
+            {"key": "triage-1", "input": "Summarize ENG-1"},
+            {
+                "key": 2,
+                "input": "And the next one?",
+                "history": [{"role": "user", "parts": "hi"}, {"role": "model", "parts": "hello"}],
+            },
+        ],
+        user_context="User timezone: UTC.",
+    )
+
+    lines = [json.loads(line) for line in payload.decode("utf-8").splitlines()]
+
+    assert [line["key"] for line in lines] == ["triage-1", "2"]
+    assert lines[0]["request"]["contents"] == [
+        {
+            "role": "user",
+            "parts": [
+                {"text": "### USER CONTEXT\nUser timezone: UTC."},
+                {"text": "Summarize ENG-1"},
+            ],
+        }
+    ]
+    assert [content["role"] for content in lines[1]["request"]["contents"]] == [
+        "user",
+        "model",
+        "user",
+    ]
+    instruction = lines[0]["request"]["system_instruction"]["parts"][0]["text"]
+    assert "User timezone" not in instruction
+    assert "execute the tool" not in instruction
+    assert "cannot call tools" in instruction
+
+
+def test_parse_batch_output_maps_keys_to_text_or_error():
+    output = "\n".join(
+        [
+            json.dumps(
+                {
+                    "key": "a",
+                    "response": {
+                        "candidates": [
+                            {
+                                "content": {
+                                    "parts": [
+                                        {"text": "reasoning", "thought": True},
+                                        {"text": "Two issues are open."},
+                                    ]
+                                }
+                            }
+                        ]
+                    },
+                }
+            ),
+            json.dumps({"key": "b", "error": {"code": 400, "message": "bad request"}}),
+            "",
+        ]
+    ).encode("utf-8")
+
+    assert parse_batch_output(output) == {
+        "a": {"text": "Two issues are open."},
+        "b": {"error": {"code": 400, "message": "bad request"}},
+    }
+
+
+def test_batch_job_can_only_be_polled_by_its_submitter(monkeypatch):
+    from types import SimpleNamespace
+    from unittest.mock import MagicMock
+
+    import pytest
+
+    from backend.agent_service import AgentService, BatchJobNotFound
+    from llm.providers import gemini_batch  # the module agent_service calls into
+
+    jobs = {}
+    client = MagicMock()
+    client.files.upload.return_value = SimpleNamespace(name="files/1")
+
+    def create(model, src, config):
+        jobs["batches/1"] = SimpleNamespace(
+            name="batches/1", display_name=config.display_name, state="JOB_STATE_PENDING"
+        )
+        return jobs["batches/1"]
+
+    def get(name):
+        if name not in jobs:
+            raise gemini_batch.genai_errors.ClientError(404, {"error": {"status": "NOT_FOUND"}})
+        return jobs[name]
+
+    client.batches.create.side_effect = create
+    client.batches.get.side_effect = get
+    monkeypatch.setattr(gemini_batch, "get_client", lambda api_key: client)
+    # A fresh service stands in for a restarted or different worker.
+    submitter = AgentService(api_key="k", composio_service=MagicMock())
+    poller = AgentService(api_key="k", composio_service=MagicMock())
+
+    job_name = submitter.submit_batch([{"key": "a", "input": "hi"}], user_id="alice")
+
+    assert "alice" not in jobs[job_name].display_name
+    assert poller.get_batch_result(job_name, user_id="alice")["state"] == "JOB_STATE_PENDING"
+    with pytest.raises(BatchJobNotFound):
+        poller.get_batch_result(job_name, user_id="bob")
+    with pytest.raises(BatchJobNotFound):
+        poller.get_batch_result("batches/other", user_id="alice")
@@ -1,6 +1,6 @@
 """Tests for Gemini provider response parsing."""
 
-from backend.llm.providers.gemini import _parse_response
+from backend.llm.providers.gemini import _parse_response, _parse_stream
 
 
 class DummyFunctionCall:
@@ -65,3 +65,360 @@ def test_parse_response_collects_tool_calls_and_keeps_answer_text():
     assert len(parsed.tool_calls) == 1
     assert parsed.tool_calls[0].name == "SLACK_SEND_MESSAGE"
     assert parsed.tool_calls[0].args == {"channel": "C123", "markdown_text": "hello"}
+
+
+def test_parse_stream_yields_text_deltas_and_assembles_response():
+    chunks = [
+        DummyResponse([DummyPart(text="thinking", thought=True)]),
+        DummyResponse([DummyPart(text="You have ")]),
+        DummyResponse([DummyPart(text="2 issues.\n")]),
+        DummyResponse(
+            [DummyPart(function_call=DummyFunctionCall("LINEAR_LIST_LINEAR_ISSUES", {}))]
+        ),
+    ]
+
+    stream = _parse_stream(iter(chunks))
+    deltas = []
+    try:
+        while True:
+            deltas.append(next(stream))
+    except StopIteration as stop:
+        parsed = stop.value
+
+    assert deltas == ["You have ", "2 issues.\n"]
+    assert parsed.text == "You have 2 issues.\n"
+    assert parsed.thoughts == ["Thinking..."]
+    assert [call.name for call in parsed.tool_calls] == ["LINEAR_LIST_LINEAR_ISSUES"]
+
+
+def test_build_config_reuses_config_for_same_tools(monkeypatch):
+    from backend.llm.providers import gemini
+
+    converted = []
+
+    def fake_build_tools(tools):
+        converted.append(tools)
+        return []
+
+    monkeypatch.setattr(gemini, "build_tools", fake_build_tools)
+    monkeypatch.setattr(gemini, "_CONFIGS", gemini.OrderedDict())
+    tools = [{"name": "SLACK_SEND_MESSAGE"}, {"name": "LINEAR_LIST_LINEAR_ISSUES"}]
+
+    first = gemini.build_config(tools)
+    second = gemini.build_config(list(reversed(tools)))
+    other = gemini.build_config(tools[:1])
+
+    assert first is second
+    assert other is not first
+    assert len(converted) == 2
+    assert first.system_instruction == gemini.SYSTEM_INSTRUCTION
+
+
+def test_build_config_picks_up_changed_declarations_after_ttl(monkeypatch):
+    from backend.llm.providers import gemini
+
+    declarations = [gemini.types.Tool(function_declarations=[])]
+    monkeypatch.setattr(gemini, "build_tools", lambda tools: list(declarations))
+    monkeypatch.setattr(gemini, "_CONFIGS", gemini.OrderedDict())
+    monkeypatch.setattr(gemini, "_CONFIG_TTL_SECONDS", 0)
+    monkeypatch.setattr(gemini, "_PREFIX_CACHES", gemini.OrderedDict())
+    tools = [{"name": "SLACK_SEND_MESSAGE"}]
+    key = ("SLACK_SEND_MESSAGE",)
+    gemini._PREFIX_CACHES[("k", "m", key)] = ("cachedContents/1", float("inf"))
+
+    first = gemini.build_config(tools)
+    assert gemini.build_config(tools) is first
+    assert ("k", "m", key) in gemini._PREFIX_CACHES
+
+    declarations.append(gemini.types.Tool(function_declarations=[]))
+    changed = gemini.build_config(tools)
+
+    assert changed is not first
+    assert len(changed.tools) == 2
+    assert gemini._PREFIX_CACHES == {}
+
+
+def test_user_context_is_sent_after_history_not_in_system_instruction():
+    from unittest.mock import MagicMock
+
+    from backend.llm.providers import gemini
+
+    chat = gemini.GeminiChat.__new__(gemini.GeminiChat)
+    chat._chat = MagicMock()
+    chat._chat.send_message.return_value = DummyResponse([DummyPart(text="Hi.")])
+    chat._uncached = None
+    chat._context_text = gemini.user_context_text("User timezone: UTC.")
+
+    chat.send_user_message("what is due today?")
+
+    chat._chat.send_message.assert_called_once_with(
+        ["### USER CONTEXT\nUser timezone: UTC.", "what is due today?"]
+    )
+
+
+def test_parse_response_handles_missing_candidate_levels():
+    class NoContentCandidate:
+        content = None
+
+    class Response:
+        def __init__(self, candidates):
+            self.candidates = candidates
+
+    assert _parse_response(object()).tool_calls == []
+    assert _parse_response(Response([])).text is None
+    assert _parse_response(Response(None)).text is None
+    assert _parse_response(Response([NoContentCandidate()])).text is None
+
+
+def test_parse_response_reuses_plain_dict_args_and_converts_mappings():
+    args = {"team_id": "T1"}
+
+    class MapArgs:
+        def __init__(self, values):
+            self._values = values
+
+        def keys(self):
+            return list(self._values)
+
+        def __getitem__(self, key):
+            return self._values[key]
+
+    class RepeatedArgs:
+        def __init__(self, items):
+            self._items = items
+
+        def __iter__(self):
+            return iter(self._items)
+
+    response = DummyResponse(
+        [
+            DummyPart(function_call=DummyFunctionCall("LINEAR_LIST_LINEAR_ISSUES", args)),
+            DummyPart(
+                function_call=DummyFunctionCall(
+                    "LINEAR_LIST_LINEAR_PROJECTS",
+                    MapArgs(
+                        {
+                            "filter": MapArgs({"name": MapArgs({"eq": "Personal"})}),
+                            "labels": RepeatedArgs(["bug", "ui"]),
+                        }
+                    ),
+                )
+            ),
+        ]
+    )
+
+    parsed = _parse_response(response)
+
+    assert parsed.tool_calls[0].args is args
+    assert parsed.tool_calls[1].args == {
+        "filter": {"name": {"eq": "Personal"}},
+        "labels": ["bug", "ui"],
+    }
+
+
+def test_cached_prefix_config_creates_one_cache_per_prefix(monkeypatch):
+    from unittest.mock import MagicMock
+
+    from backend.llm.providers import gemini
+
+    monkeypatch.setattr(gemini, "_PREFIX_CACHE_TTL_SECONDS", 3600)
+    monkeypatch.setattr(gemini, "_PREFIX_CACHE_MARGIN_SECONDS", 300)
+    monkeypatch.setattr(gemini, "_PREFIX_CACHES", gemini.OrderedDict())
+    client = MagicMock()
+    client.caches.create.return_value.name = "cachedContents/abc"
+    base = MagicMock()
+    key = (("LINEAR_LIST_LINEAR_ISSUES",), None)
+
+    _, first_deadline = gemini.cached_prefix_config(
+        client, api_key="k", model="m", config=base, config_key=key
+    )
+    _, second_deadline = gemini.cached_prefix_config(
+        client, api_key="k", model="m", config=base, config_key=key
+    )
+    unkeyed, no_deadline = gemini.cached_prefix_config(
+        client, api_key="k", model="m", config=base, config_key=None
+    )
+
+    assert client.caches.create.call_count == 1
+    assert first_deadline == second_deadline
+    assert unkeyed is base and no_deadline is None
+
+
+def test_cached_prefix_config_falls_back_when_cache_is_rejected(monkeypatch):
+    from unittest.mock import MagicMock
+
+    from backend.llm.providers import gemini
+
+    monkeypatch.setattr(gemini, "_PREFIX_CACHE_TTL_SECONDS", 3600)
+    monkeypatch.setattr(gemini, "_PREFIX_CACHES", gemini.OrderedDict())
+    client = MagicMock()
+    client.caches.create.side_effect = RuntimeError("cached content is too small")
+    base = MagicMock()
+    key = (("SLACK_SEND_MESSAGE",), None)
+
+    for _ in range(2):
+        config, deadline = gemini.cached_prefix_config(
+            client, api_key="k", model="m", config=base, config_key=key
+        )
+        assert config is base and deadline is None
+    assert client.caches.create.call_count == 1
+
+
+def test_slow_prefix_cache_creation_does_not_block_other_prefixes(monkeypatch):
+    import threading
+    from unittest.mock import MagicMock
+
+    from backend.llm.providers import gemini
+
+    monkeypatch.setattr(gemini, "_PREFIX_CACHE_TTL_SECONDS", 3600)
+    monkeypatch.setattr(gemini, "_PREFIX_CACHES", gemini.OrderedDict())
+    started, release = threading.Event(), threading.Event()
+
+    def create(model, config):
+        if model == "slow":
+            started.set()
+            release.wait(5)
+        cache = MagicMock()
+        cache.name = f"cachedContents/{model}"
+        return cache
+
+    client = MagicMock()
+    client.caches.create.side_effect = create
+    key = (("LINEAR_LIST_LINEAR_ISSUES",), None)
+    results = {}
+
+    def load(model):
+        results[model], _ = gemini.cached_prefix_config(
+            client,
+            api_key="k",
+            model=model,
+            config=gemini.types.GenerateContentConfig(),
+            config_key=key,
+        )
+
+    slow = threading.Thread(target=load, args=("slow",))
+    slow.start()
+    try:
+        assert started.wait(5)
+        fast = threading.Thread(target=load, args=("fast",))
+        fast.start()
+        fast.join(timeout=1)
+        assert not fast.is_alive()
+        assert results["fast"].cached_content == "cachedContents/fast"
+    finally:
+        release.set()
+        slow.join(timeout=5)
+    assert results["slow"].cached_content == "cachedContents/slow"
+    assert gemini._PREFIX_CACHE_CREATE_LOCKS == {}
+
+
+def test_chat_recovers_when_cached_prefix_is_gone(monkeypatch):
+    from unittest.mock import MagicMock
+
+    from backend.llm.providers import gemini
+
+    monkeypatch.setattr(gemini, "_PREFIX_CACHES", gemini.OrderedDict())
+    key = {"api_key": "k", "model": "m", "config_key": (("A",), None)}
+    gemini._PREFIX_CACHES[("k", "m", (("A",), None))] = ("cachedContents/gone", 1e12)
+    stale_chat = MagicMock()
+    stale_chat.send_message.side_effect = RuntimeError(
+        "404 NOT_FOUND: CachedContent not found (or permission denied)"
+    )
+    fresh_chat = MagicMock()
+    fresh_chat.send_message.return_value = DummyResponse([DummyPart(text="Hi again.")])
+    chat = gemini.GeminiChat.__new__(gemini.GeminiChat)
+    chat._client = MagicMock()
+    chat._client.chats.create.return_value = fresh_chat
+    chat._chat = stale_chat
+    chat._uncached = (key, "plain-config")
+    chat._context_text = None
+    chat.reusable_until = 1e12
+
+    response = chat.send_user_message("hello")
+
+    assert response.text == "Hi again."
+    assert chat.reusable_until is None
+    assert gemini._PREFIX_CACHES == {}
+    _, create_kwargs = chat._client.chats.create.call_args
+    assert create_kwargs["model"] == "m" and create_kwargs["config"] == "plain-config"
+
+
+def test_chat_requests_service_tier_without_changing_shared_config(monkeypatch):
+    import warnings
+    from unittest.mock import MagicMock
+
+    from backend.llm.providers import gemini
+
+    shared = gemini.types.GenerateContentConfig()
+    created = {}
+    monkeypatch.setattr(gemini, "get_client", lambda api_key: MagicMock())
+    monkeypatch.setattr(gemini, "build_config", lambda tools, fingerprint: shared)
+    monkeypatch.setattr(gemini, "_PREFIX_CACHE_TTL_SECONDS", 0)
+    monkeypatch.setattr(
+        gemini, "_create_chat_with_model_fallback", lambda **kwargs: created.update(kwargs)
+    )
+
+    gemini.GeminiChat(api_key="k", model=None, tools=[], history=[], service_tier="priority")
+
+    tiered = created["config"]
+    assert tiered == created["fallback_config"]
+    assert tiered.service_tier is gemini.types.ServiceTier.PRIORITY
+    assert shared.service_tier is None
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        tiered.model_dump(mode="json")
+
+
+def test_model_fallback_is_resolved_once_per_client(monkeypatch):
+    from unittest.mock import MagicMock
+
+    from backend.llm.providers import gemini
+
+    monkeypatch.setattr(gemini, "_MODEL_FALLBACKS", gemini.weakref.WeakKeyDictionary())
+    client = MagicMock()
+    client.chats.create.side_effect = [
+        Exception("404_NOT_FOUND"),
+        "fallback-chat",
+        "second-chat",
+    ]
+    picked = []
+    monkeypatch.setattr(
+        gemini,
+        "_pick_fallback_model",
+        lambda client, requested_model: picked.append(requested_model) or "gemini-2.5-flash",
+    )
+
+    def create():
+        return gemini._create_chat_with_model_fallback(
+            client=client,
+            requested_model="gone-model",
+            config="cached-config",
+            history=[],
+            fallback_config="plain-config",
+        )
+
+    assert create() == "fallback-chat"
+    assert create() == "second-chat"
+
+    assert picked == ["gone-model"]
+    _, create_kwargs = client.chats.create.call_args
+    assert create_kwargs["model"] == "gemini-2.5-flash"
+    assert create_kwargs["config"] == "plain-config"
+
+
+def test_clients_are_shared_per_key_and_bounded(monkeypatch):
+    from unittest.mock import MagicMock
+
+    from backend.llm.providers import gemini
+
+    monkeypatch.setattr(gemini, "_CLIENTS", gemini.OrderedDict())
+    monkeypatch.setattr(gemini, "_CLIENT_CACHE_SIZE", 2)
+    monkeypatch.setattr(gemini.genai, "Client", lambda api_key: MagicMock(name=api_key))
+
+    first = gemini.get_client("a")
+    assert gemini.get_client("a") is first
+    gemini.get_client("b")
+    gemini.get_client("a")
+    gemini.get_client("c")
+
+    assert list(gemini._CLIENTS) == ["a", "c"]
@@ -0,0 +1,128 @@
+"""Unit tests for LinearService."""
+
+from unittest.mock import MagicMock
+
+from backend.services.linear_service import LinearService
+
+
+def test_linear_write_action_detection():
+    service = LinearService(MagicMock())
+
+    assert service.is_write_action("LINEAR_CREATE_LINEAR_ISSUE", {}) is True
+    assert service.is_write_action("linear_update_issue", {}) is True
+    assert service.is_write_action("LINEAR_UPDATE_LINEAR_ISSUE", {}) is True
+    assert service.is_write_action("LINEAR_ARCHIVE_ISSUE", {}) is False
+    assert service.is_write_action("LINEAR_LIST_LINEAR_ISSUES", {}) is False
+
+
+def test_linear_graphql_mutation_detection():
+    service = LinearService(MagicMock())
+    tool = "LINEAR_RUN_QUERY_OR_MUTATION"
+
+    assert service.is_write_action(tool, {"query_or_mutation": "\n  Mutation { x }"}) is True
+    assert service.is_write_action(tool, {"query_or_mutation": "query { mutation }"}) is False
+    assert service.is_write_action(tool, {}) is False
+
+
+def test_enrich_proposal_reuses_resolved_names_across_proposals():
+    composio_service = MagicMock()
+    composio_service.execute_action.return_value = {
+        "data": {"data": {"n0": {"id": "team-1", "name": "Platform"}}}
+    }
+    service = LinearService(composio_service)
+
+    first = service.enrich_proposal("user-1", {"teamId": "team-1"}, "LINEAR_CREATE_LINEAR_ISSUE")
+    second = service.enrich_proposal("user-1", {"teamId": "team-1"}, "LINEAR_CREATE_LINEAR_ISSUE")
+
+    assert first["teamName"] == "Platform"
+    assert second["teamName"] == "Platform"
+    assert composio_service.execute_action.call_count == 1
+
+
+def test_enrich_proposal_resolves_its_names_in_one_query():
+    composio_service = MagicMock()
+    composio_service.execute_action.return_value = {
+        "data": {
+            "data": {
+                "n0": {"id": "team-1", "name": "Platform"},
+                "n1": {"id": "project-1", "name": "Mobile App"},
+            }
+        }
+    }
+    service = LinearService(composio_service)
+
+    enriched = service.enrich_proposal(
+        "user-1", {"teamId": "team-1", "projectId": "project-1"}, "LINEAR_CREATE_LINEAR_ISSUE"
+    )
+
+    assert enriched["teamName"] == "Platform"
+    assert enriched["projectName"] == "Mobile App"
+    assert composio_service.execute_action.call_count == 1
+
+
+def test_enrich_proposals_resolves_all_ids_in_one_query():
+    composio_service = MagicMock()
+    composio_service.execute_action.return_value = {
+        "data": {
+            "data": {
+                "n0": {"id": "team-1", "name": "Platform"},
+                "n1": {"id": "project-1", "name": "Mobile App"},
+                "n2": {"id": "team-2", "name": "Growth"},
+            }
+        }
+    }
+    service = LinearService(composio_service)
+
+    enriched = service.enrich_proposals(
+        "user-1",
+        [
+            ({"teamId": "team-1", "projectId": "project-1"}, "LINEAR_CREATE_LINEAR_ISSUE"),
+            ({"teamId": "team-2"}, "LINEAR_CREATE_LINEAR_ISSUE"),
+            ({"teamId": "team-1"}, "LINEAR_CREATE_LINEAR_ISSUE"),
+        ],
+    )
+
+    assert [args.get("teamName") for args in enriched] == ["Platform", "Growth", "Platform"]
+    assert enriched[0]["projectName"] == "Mobile App"
+    assert composio_service.execute_action.call_count == 1
+
+
+def test_enrich_proposal_falls_back_to_per_id_queries_when_one_id_is_bad():
+    def execute_action(action_slug, arguments, user_id):
+        query = arguments["query_or_mutation"]
+        if "Todo" in query:
+            # Linear nulls the whole response when a non-null root field fails.
+            return {"data": {"data": None, "errors": [{"message": "Entity not found"}]}}
+        if "team-1" in query:
+            return {"data": {"data": {"n0": {"id": "team-1", "name": "Platform"}}}}
+        return {"data": {"data": {"n0": {"id": "project-1", "name": "Mobile App"}}}}
+
+    composio_service = MagicMock()
+    composio_service.execute_action.side_effect = execute_action
+    service = LinearService(composio_service)
+
+    enriched = service.enrich_proposal(
+        "user-1",
+        {"teamId": "team-1", "status": "Todo", "projectId": "project-1"},
+        "LINEAR_CREATE_LINEAR_ISSUE",
+    )
+
+    assert enriched["teamName"] == "Platform"
+    assert enriched["projectName"] == "Mobile App"
+    assert "stateName" not in enriched
+    assert composio_service.execute_action.call_count == 4
+
+
+def test_name_cache_drops_expired_entries_and_stays_bounded():
+    service = LinearService(MagicMock())
+    service._name_cache_max_entries = 2
+
+    service.set_cached_name("user-1", "team", "team-1", "Platform")
+    service._name_cache[("user-1", "team", "team-1")]["ts"] -= service._name_cache_ttl_seconds
+    service.set_cached_name("user-1", "team", "team-2", "Growth")
+    assert list(service._name_cache) == [("user-1", "team", "team-2")]
+
+    service.set_cached_name("user-1", "team", "team-3", "Infra")
+    service.set_cached_name("user-1", "team", "team-4", "Data")
+    assert list(service._name_cache) == [("user-1", "team", "team-3"), ("user-1", "team", "team-4")]
+    assert service.get_cached_name("user-1", "team", "team-4") == "Data"
@@ -0,0 +1,100 @@
+"""Unit tests for chat session reuse."""
+
+from backend.llm.sessions import ChatSessionStore
+from backend.llm.types import LLMChat
+
+
+HISTORY = [
+    {"role": "user", "parts": "list my issues"},
+    {"role": "model", "parts": "You have 2 open issues."},
+]
+
+
+def test_checkin_makes_chat_reusable_for_matching_history():
+    store = ChatSessionStore()
+    chat = LLMChat()
+    store.open("user-1", chat, ("gemini", "m"))
+
+    assert store.checkout("user-1", ("gemini", "m"), HISTORY) is None
+    assert store.checkin("user-1", chat, HISTORY) is True
+    assert store.checkout("user-1", ("gemini", "m"), list(HISTORY)) is chat
+    # Checked out again until the next checkin.
+    assert store.checkout("user-1", ("gemini", "m"), HISTORY) is None
+
+
+def test_checkout_drops_session_on_config_or_history_mismatch():
+    store = ChatSessionStore()
+    chat = LLMChat()
+    store.open("user-1", chat, ("gemini", "m"))
+    store.checkin("user-1", chat, HISTORY)
+
+    assert store.checkout("user-1", ("gemini", "other"), HISTORY) is None
+    assert store.checkin("user-1", chat, HISTORY) is False
+
+    store.open("user-1", chat, ("gemini", "m"))
+    store.checkin("user-1", chat, HISTORY)
+    assert store.checkout("user-1", ("gemini", "m"), HISTORY[:1]) is None
+    assert store.checkout("user-1", ("gemini", "m"), HISTORY) is None
+
+
+def test_checkin_rejects_chat_with_unanswered_tool_calls():
+    store = ChatSessionStore()
+    chat = LLMChat()
+    chat.has_pending_tool_calls = True
+    store.open("user-1", chat, ("gemini", "m"))
+
+    assert store.checkin("user-1", chat, HISTORY) is False
+    assert store.checkout("user-1", ("gemini", "m"), HISTORY) is None
+
+
+def test_checkout_drops_chat_past_its_reuse_deadline():
+    store = ChatSessionStore()
+    chat = LLMChat()
+    chat.reusable_until = 0.0
+    store.open("user-1", chat, ("gemini", "m"))
+    store.checkin("user-1", chat, HISTORY)
+
+    assert store.checkout("user-1", ("gemini", "m"), HISTORY) is None
+
+
+def test_store_evicts_least_recently_used_and_idle_sessions(monkeypatch):
+    from backend.llm import sessions
+
+    clock = [1000.0]
+    monkeypatch.setattr(sessions.time, "monotonic", lambda: clock[0])
+    store = ChatSessionStore(max_sessions=2, ttl_seconds=60)
+    chats = {name: LLMChat() for name in ("a", "b", "c")}
+    for name in ("a", "b"):
+        store.open(name, chats[name], "cfg")
+        store.checkin(name, chats[name], HISTORY)
+
+    store.open("c", chats["c"], "cfg")
+    assert len(store) == 2
+    assert store.checkout("a", "cfg", HISTORY) is None
+
+    clock[0] += 61
+    assert store.checkout("b", "cfg", HISTORY) is None
+
+
+def test_create_chat_session_reuses_caller_fingerprint(monkeypatch):
+    from backend.llm import router
+
+    created = {}
+
+    def fail_fingerprint(tools):
+        raise AssertionError("fingerprint recomputed")
+
+    monkeypatch.setattr(router, "tool_fingerprint", fail_fingerprint)
+    monkeypatch.setattr(router, "_CHAT_SESSIONS", ChatSessionStore())
+    monkeypatch.setattr(router, "GeminiChat", lambda **kwargs: created.update(kwargs) or LLMChat())
+
+    router.create_chat_session(
+        model_config=None,
+        fallback_api_key="k",
+        tools=[{"name": "SLACK_SEND_MESSAGE"}],
+        history=[],
+        session_id="user-1",
+        tools_fingerprint=("SLACK_SEND_MESSAGE",),
+    )
+
+    assert created["tools_fingerprint"] == ("SLACK_SEND_MESSAGE",)
@@ -0,0 +1,79 @@
+"""Tests for queued logging setup."""
+
+import atexit
+import logging
+import queue
+
+from backend.utils.logging_utils import (
+    DropReportingQueueListener,
+    DroppingQueueHandler,
+    configure_logging,
+)
+
+
+def test_dropping_queue_handler_never_blocks_when_full():
+    log_queue = queue.Queue(maxsize=1)
+    handler = DroppingQueueHandler(log_queue)
+    record = logging.LogRecord("mochi", logging.INFO, __file__, 1, "hello", None, None)
+
+    handler.handle(record)
+    handler.handle(record)
+
+    assert log_queue.qsize() == 1
+    assert handler.dropped == 1
+
+
+
+def test_dropped_records_are_reported_when_the_queue_has_room():
+    log_queue = queue.Queue(maxsize=2)
+    handler = DroppingQueueHandler(log_queue)
+    record = logging.LogRecord("mochi", logging.INFO, __file__, 1, "hello", None, None)
+
+    for _ in range(4):
+        handler.handle(record)
+    log_queue.get_nowait()
+    log_queue.get_nowait()
+    handler.handle(record)
+
+    report = log_queue.get_nowait()
+    assert report.levelno == logging.WARNING
+    assert report.getMessage() == "Dropped 2 log records because the log queue was full"
+    assert log_queue.get_nowait().getMessage() == "hello"
+    assert handler.unreported_drops == 0 and handler.dropped == 2
+
+
+def test_listener_reports_remaining_drops_on_stop():
+    log_queue = queue.Queue(maxsize=1)
+    handler = DroppingQueueHandler(log_queue)
+    written = []
+    sink = logging.Handler()
+    sink.emit = written.append
+    listener = DropReportingQueueListener(log_queue, handler, sink)
+    record = logging.LogRecord("mochi", logging.INFO, __file__, 1, "hello", None, None)
+
+    handler.handle(record)
+    handler.handle(record)
+    listener.start()
+    listener.stop()
+
+    assert [entry.getMessage() for entry in written] == [
+        "hello",
+        "Dropped 1 log records because the log queue was full",
+    ]
+
+def test_configure_logging_writes_from_listener_thread(capsys):
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    try:
+        listener = configure_logging("debug")
+        logging.getLogger("mochi.test").debug("queued %s", "record")
+        atexit.unregister(listener.stop)
+        listener.stop()
+    finally:
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for handler in saved_handlers:
+            root.addHandler(handler)
+        root.setLevel(saved_level)
+
+    assert "DEBUG mochi.test: queued record" in capsys.readouterr().err
@@ -1,6 +1,8 @@
-"""Unit tests for chat user-id resolution."""
+"""Unit tests for chat user-id resolution and event encoding."""
 
-from backend.main import _resolve_effective_user_id
+import json
+
+from backend.main import _encode_event, _resolve_effective_user_id
 
 
 def test_resolve_effective_user_id_prefers_request(monkeypatch):
@@ -17,3 +19,13 @@ def test_resolve_effective_user_id_falls_back_to_env(monkeypatch):
 
     assert effective == "env-user"
     assert source == "fallback"
+
+
+def test_encode_event_writes_one_ndjson_line():
+    event = {"type": "message", "content": "Café ready", "involved_apps": ["slack"]}
+
+    line = _encode_event(event)
+
+    assert line.endswith(b"\n")
+    assert line.count(b"\n") == 1
+    assert json.loads(line) == event
@@ -71,3 +71,69 @@ def test_channel_name_lookup_uses_cache_for_repeated_ids():
     assert first["channelDisplay"] == "#general"
     assert second["channelDisplay"] == "#general"
     assert composio_service.execute_tool.call_count == 1
+
+
+def test_user_name_lookup_uses_cache_for_repeated_ids():
+    composio_service = MagicMock()
+    composio_service.execute_action.return_value = {
+        "successful": True,
+        "data": {
+            "members": [
+                {"id": "U123", "real_name": "Alice"},
+                {"id": "U456", "name": "bob"},
+            ]
+        },
+    }
+    service = SlackService(composio_service)
+
+    first = service.enrich_proposal(
+        user_id="user-1",
+        args={"channel": "#general", "user": "U123"},
+        tool_name="SLACK_SEND_EPHEMERAL_MESSAGE",
+    )
+    second = service.enrich_proposal(
+        user_id="user-1",
+        args={"channel": "#general", "user": "U456"},
+        tool_name="SLACK_SEND_EPHEMERAL_MESSAGE",
+    )
+
+    assert first["userName"] == "Alice"
+    assert second["userName"] == "bob"
+    assert composio_service.execute_action.call_count == 1
+
+
+def test_user_name_cache_expires_so_renames_show_up():
+    composio_service = MagicMock()
+    composio_service.execute_action.side_effect = [
+        {"successful": True, "data": {"members": [{"id": "U123", "real_name": "Alice"}]}},
+        {"successful": True, "data": {"members": [{"id": "U123", "real_name": "Alice Smith"}]}},
+    ]
+    service = SlackService(composio_service)
+    args = {"channel": "#general", "user": "U123"}
+
+    first = service.enrich_proposal("user-1", args, "SLACK_SEND_EPHEMERAL_MESSAGE")
+    service._user_name_cache["user-1"]["ts"] -= service._name_cache_ttl_seconds
+    second = service.enrich_proposal("user-1", args, "SLACK_SEND_EPHEMERAL_MESSAGE")
+
+    assert first["userName"] == "Alice"
+    assert second["userName"] == "Alice Smith"
+
+
+def test_enrich_proposals_lists_channels_once_per_batch():
+    composio_service = MagicMock()
+    composio_service.execute_tool.return_value = {
+        "data": {"channels": [{"id": "C0A101WM3T4", "name": "general"}]}
+    }
+    service = SlackService(composio_service)
+
+    enriched = service.enrich_proposals(
+        "user-1",
+        [
+            ({"channel": "C0A101WM3T4", "markdown_text": "Hi"}, "SLACK_SEND_MESSAGE"),
+            ({"channel": "C9999999999", "markdown_text": "Hi"}, "SLACK_SEND_MESSAGE"),
+            ({"channel": "C8888888888", "markdown_text": "Hi"}, "SLACK_SEND_MESSAGE"),
+        ],
+    )
+
+    assert [args["channelDisplay"] for args in enriched] == ["#general", "Channel", "Channel"]
+    assert composio_service.execute_tool.call_count == 1
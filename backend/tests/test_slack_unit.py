@@ -110,11 +110,13 @@ def test_slack_write_action_interception(mock_agent_service):
     service.slack_service.is_write_action.return_value = True
     service.linear_service.is_write_action.return_value = False
 
-    service.slack_service.enrich_proposal.return_value = {
-        "channel": "C123",
-        "text": "Hello",
-        "channelName": "#general",
-    }
+    service.slack_service.enrich_proposals.return_value = [
+        {
+            "channel": "C123",
+            "text": "Hello",
+            "channelName": "#general",
+        }
+    ]
 
     with patch("backend.agent_service.create_chat_session", return_value=(stub_chat, None)):
         generator = service.run_agent(user_input, user_id)
@@ -175,11 +177,11 @@ def test_failed_confirmed_write_does_not_block_follow_up_proposals(mock_agent_se
     service.linear_service.is_write_action.side_effect = (
         lambda tool_name, _args: tool_name == "LINEAR_CREATE_LINEAR_ISSUE"
     )
-    service.slack_service.enrich_proposal.side_effect = (
-        lambda _user_id, args, _tool_name: args
+    service.slack_service.enrich_proposals.side_effect = (
+        lambda _user_id, proposals: [args for args, _ in proposals]
     )
-    service.linear_service.enrich_proposal.side_effect = (
-        lambda _user_id, args, _tool_name: args
+    service.linear_service.enrich_proposals.side_effect = (
+        lambda _user_id, proposals: [args for args, _ in proposals]
     )
 
     with patch("backend.agent_service.create_chat_session", return_value=(stub_chat, None)):
@@ -349,3 +351,19 @@ def test_capabilities_query_returns_concise_static_message(mock_agent_service):
     )
     assert message_events[0]["action_performed"] is None
     mock_create_chat.assert_not_called()
+
+
+def test_warmup_preloads_tools_and_model_config(mock_agent_service, monkeypatch):
+    service = mock_agent_service
+    monkeypatch.setenv("COMPOSIO_USER_ID", "default-user")
+
+    with patch("backend.agent_service.warm_up_model") as mock_warm_up:
+        service.warmup()
+
+    service.slack_service.load_tools.assert_called_once_with(user_id="default-user", scope="full")
+    mock_warm_up.assert_called_once_with(fallback_api_key=service.api_key, tools=["dummy_tool"])
+
+
+def test_warmup_tolerates_model_errors(mock_agent_service):
+    with patch("backend.agent_service.warm_up_model", side_effect=RuntimeError("offline")):
+        mock_agent_service.warmup("user-1")
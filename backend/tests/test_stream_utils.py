@@ -0,0 +1,62 @@
+"""Tests for draining blocking generators into async consumers."""
+
+import asyncio
+import threading
+
+import pytest
+
+from backend.utils.stream_utils import drain_in_thread
+
+
+def _collect(items):
+    async def run():
+        return [item async for item in drain_in_thread(items)]
+
+    return asyncio.run(run())
+
+
+def test_drain_in_thread_yields_items_in_order_from_worker_thread():
+    caller = threading.get_ident()
+    threads = []
+
+    def events():
+        for index in range(3):
+            threads.append(threading.get_ident())
+            yield index
+
+    assert _collect(events()) == [0, 1, 2]
+    assert len(set(threads)) == 1 and threads[0] != caller
+
+
+def test_drain_in_thread_reraises_iterator_errors():
+    def events():
+        yield "first"
+        raise ValueError("boom")
+
+    async def run():
+        seen = []
+        with pytest.raises(ValueError, match="boom"):
+            async for item in drain_in_thread(events()):
+                seen.append(item)
+        return seen
+
+    assert asyncio.run(run()) == ["first"]
+
+
+def test_drain_in_thread_closes_iterator_when_consumer_stops():
+    closed = threading.Event()
+
+    def events():
+        try:
+            while True:
+                yield "tick"
+        finally:
+            closed.set()
+
+    async def run():
+        stream = drain_in_thread(events())
+        assert await stream.__anext__() == "tick"
+        await stream.aclose()
+
+    asyncio.run(run())
+    assert closed.wait(5)
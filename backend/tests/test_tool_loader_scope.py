@@ -1,5 +1,6 @@
 """Unit tests for scoped tool loading."""
 
+import threading
 from unittest.mock import MagicMock
 
 from backend.agent.tool_loader import load_composio_tools
@@ -71,3 +72,99 @@ def test_scope_loader_widens_to_full_when_scoped_set_empty():
     assert errors == []
     assert tools == ["SLACK_SEND_MESSAGE"]
     assert scopes_seen == ["send", "full"]
+
+
+def test_apps_load_concurrently_in_stable_order():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def loader(tools):
+        def load_tools(*, user_id: str, scope: str):
+            barrier.wait()
+            return tools
+        return load_tools
+
+    linear = _empty_service()
+    slack = _empty_service()
+    notion = _empty_service()
+    github = _empty_service()
+    gmail = _empty_service()
+    calendar = _empty_service()
+    linear.load_tools.side_effect = loader(["LINEAR_LIST_LINEAR_ISSUES"])
+    slack.load_tools.side_effect = loader(["SLACK_SEND_MESSAGE"])
+    notion.load_tools.side_effect = RuntimeError("not connected")
+
+    tools, errors = load_composio_tools(
+        linear,
+        slack,
+        notion,
+        github,
+        gmail,
+        calendar,
+        user_id="user-1",
+        required_apps=["slack", "linear", "notion"],
+    )
+
+    assert tools == ["LINEAR_LIST_LINEAR_ISSUES", "SLACK_SEND_MESSAGE"]
+    assert errors == ["Notion: not connected"]
+    github.load_tools.assert_not_called()
+
+
+def test_stalled_app_is_reported_without_blocking_others(monkeypatch):
+    from backend.agent import tool_loader
+
+    monkeypatch.setattr(tool_loader, "_TOOL_LOAD_TIMEOUT_SECONDS", 0.05)
+    release = threading.Event()
+    services = [_empty_service() for _ in range(6)]
+    linear, slack = services[0], services[1]
+    linear.load_tools.side_effect = lambda user_id, scope: release.wait(5) and []
+    slack.load_tools.return_value = ["SLACK_SEND_MESSAGE"]
+
+    try:
+        tools, errors = load_composio_tools(
+            *services,
+            user_id="user-1",
+            required_apps=["linear", "slack"],
+        )
+    finally:
+        release.set()
+
+    assert tools == ["SLACK_SEND_MESSAGE"]
+    assert errors == ["Linear: timed out loading tools"]
+
+
+def test_queued_load_is_timed_from_start_and_cancelled_if_never_started(monkeypatch):
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    from backend.agent import tool_loader
+
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(tool_loader, "_TOOL_LOADER_POOL", pool)
+    monkeypatch.setattr(tool_loader, "_TOOL_LOAD_TIMEOUT_SECONDS", 0.3)
+    services = [_empty_service() for _ in range(6)]
+    linear, slack = services[0], services[1]
+    linear.load_tools.side_effect = lambda user_id, scope: time.sleep(0.2) or ["LINEAR_X"]
+    slack.load_tools.side_effect = lambda user_id, scope: time.sleep(0.2) or ["SLACK_X"]
+
+    # Slack waits 0.2s for the only worker, then runs 0.2s: past 0.3s from
+    # submission, but within 0.3s of starting.
+    tools, errors = load_composio_tools(
+        *services, user_id="user-1", required_apps=["linear", "slack"]
+    )
+    assert tools == ["LINEAR_X", "SLACK_X"]
+    assert errors == []
+
+    monkeypatch.setattr(tool_loader, "_TOOL_LOAD_TIMEOUT_SECONDS", 0.05)
+    release = threading.Event()
+    linear.load_tools.side_effect = lambda user_id, scope: release.wait(5) and []
+    slack.load_tools.reset_mock()
+    try:
+        tools, errors = load_composio_tools(
+            *services, user_id="user-1", required_apps=["linear", "slack"]
+        )
+    finally:
+        release.set()
+    pool.shutdown(wait=True)
+
+    assert errors == ["Linear: timed out loading tools", "Slack: timed out loading tools"]
+    slack.load_tools.assert_not_called()
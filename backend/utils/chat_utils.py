@@ -1,58 +1,70 @@
 """Utility functions for chat history formatting."""
 
-from typing import Dict, List
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
 from google.genai import types
 
 
-def format_history(history: List[Dict[str, str]]) -> List[types.Content]:
-    """
-    Formats the chat history into the structure expected by Gemini SDK.
-    
-    Args:
-        history: List of message dictionaries with 'role' and 'parts' keys
-        
-    Returns:
-        List of types.Content objects for Gemini SDK
-    """
-    formatted_history = []
-    for msg in history:
-        role = msg.get("role", "user")
-        content = msg.get("parts", [])
-        
-        # Handle case where content might be a string (from simple dicts)
-        if isinstance(content, str):
-            parts = [types.Part(text=content)]
-        elif isinstance(content, list):
-            # Assuming list of strings or dicts, normalize to types.Part
-            parts = []
-            for part in content:
-                if isinstance(part, str):
-                    parts.append(types.Part(text=part))
-                elif isinstance(part, dict) and "text" in part:
-                    parts.append(types.Part(text=part["text"]))
-        else:
-            parts = [types.Part(text=str(content))]
-            
-        formatted_history.append(types.Content(role=role, parts=parts))
-        
-    return formatted_history
-
-
-
-
-
-
-
+# Formatted messages kept for reuse; covers a few long conversations at once.
+_MESSAGE_CACHE_SIZE = 2048
 
 
+def _message_texts(content: Any) -> Tuple[str, ...]:
+    """Reduce a message's 'parts' value to the texts that become Gemini parts."""
+    # Handle case where content might be a string (from simple dicts)
+    if isinstance(content, str):
+        return (content,)
+    if isinstance(content, list):
+        # Assuming list of strings or dicts, normalize to plain texts
+        texts = []
+        for part in content:
+            if isinstance(part, str):
+                texts.append(part)
+            elif isinstance(part, dict) and "text" in part:
+                texts.append(part["text"])
+        return tuple(texts)
+    return (str(content),)
 
 
+@lru_cache(maxsize=_MESSAGE_CACHE_SIZE)
+def _format_message(role: str, texts: Tuple[str, ...]) -> types.Content:
+    return types.Content(role=role, parts=[types.Part(text=text) for text in texts])
 
 
+def format_history(history: List[Dict[str, str]]) -> List[types.Content]:
+    """
+    Formats the chat history into the structure expected by Gemini SDK.
 
+    Messages seen in an earlier turn reuse their formatted Content, so a
+    growing conversation only builds objects for the new messages.
 
+    Args:
+        history: List of message dictionaries with 'role' and 'parts' keys
 
+    Returns:
+        List of types.Content objects for Gemini SDK
+    """
+    return [
+        _format_message(msg.get("role", "user"), _message_texts(msg.get("parts", [])))
+        for msg in history
+    ]
 
 
+def format_history_json(history: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """
+    Formats the chat history as plain JSON contents, for request files such
+    as Gemini batch input.
 
+    Args:
+        history: List of message dictionaries with 'role' and 'parts' keys
 
+    Returns:
+        List of {"role", "parts": [{"text"}]} dictionaries
+    """
+    return [
+        {
+            "role": msg.get("role", "user"),
+            "parts": [{"text": text} for text in _message_texts(msg.get("parts", []))],
+        }
+        for msg in history
+    ]
@@ -0,0 +1,107 @@
+"""Utility functions for configuring non-blocking logging."""
+
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+
+# Records waiting for the writer thread; beyond this, new records are dropped.
+_LOG_QUEUE_SIZE = 10_000
+_LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+        # Drops not yet reported; reported as soon as the queue has room again.
+        self.unreported_drops = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.unreported_drops:
+            self._enqueue_drop_report()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self.unreported_drops += 1
+
+    def drop_report(self) -> logging.LogRecord:
+        """A warning record counting the drops not reported yet."""
+        return logging.LogRecord(
+            __name__,
+            logging.WARNING,
+            __file__,
+            0,
+            "Dropped %s log records because the log queue was full",
+            (self.unreported_drops,),
+            None,
+        )
+
+    def _enqueue_drop_report(self) -> None:
+        try:
+            self.queue.put_nowait(self.drop_report())
+        except queue.Full:
+            return
+        self.unreported_drops = 0
+
+
+class DropReportingQueueListener(QueueListener):
+    """Queue listener that writes out any drops still unreported when it stops."""
+
+    def __init__(
+        self,
+        log_queue: queue.Queue,
+        queue_handler: DroppingQueueHandler,
+        *handlers: logging.Handler,
+        respect_handler_level: bool = False,
+    ) -> None:
+        super().__init__(log_queue, *handlers, respect_handler_level=respect_handler_level)
+        self.queue_handler = queue_handler
+
+    def stop(self) -> None:
+        super().stop()
+        if self.queue_handler.unreported_drops:
+            self.handle(self.queue_handler.drop_report())
+            self.queue_handler.unreported_drops = 0
+
+
+def configure_logging(level: Optional[str] = None) -> QueueListener:
+    """
+    Route root logging through a queue drained by a background writer thread.
+
+    Request handlers only build the message and enqueue the record; applying
+    the log format and the stderr write happen on the listener thread, so a
+    slow log pipe never stalls a turn. Records dropped while the queue is full
+    are counted in a warning once it has room again, or when logging stops.
+
+    Args:
+        level: Log level name; defaults to the LOG_LEVEL env var, then INFO
+
+    Returns:
+        The started listener, stopped automatically at interpreter exit
+    """
+    level_name = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(_LOG_FORMAT))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=_LOG_QUEUE_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+    listener = DropReportingQueueListener(
+        log_queue, queue_handler, stream_handler, respect_handler_level=True
+    )
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(getattr(logging, level_name, logging.INFO))
+
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,73 @@
+"""Utility functions for streaming blocking generators to async consumers."""
+
+import asyncio
+import threading
+from concurrent.futures import Executor
+from typing import AsyncIterator, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
+
+async def drain_in_thread(
+    items: Iterator[T],
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[T]:
+    """
+    Run a blocking iterator to completion on one worker thread and yield its
+    items through an asyncio.Queue.
+
+    The event loop only wakes when an item is ready, instead of handing each
+    next() call to the threadpool. If the consumer stops early (e.g. the
+    client disconnected), the iterator is closed after its current step.
+
+    Args:
+        items: Blocking iterator, such as AgentService.run_agent(...)
+        executor: Pool to run it on; the loop's default executor if None
+
+    Returns:
+        Async iterator over the same items, re-raising the iterator's errors
+    """
+    loop = asyncio.get_running_loop()
+    queue: "asyncio.Queue[object]" = asyncio.Queue()
+    stop = threading.Event()
+
+    def publish(item: object) -> None:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            # The loop closed while we were still producing; nobody is listening.
+            stop.set()
+
+    def produce() -> None:
+        try:
+            for item in items:
+                publish(item)
+                if stop.is_set():
+                    break
+        except BaseException as exc:  # noqa: BLE001 - re-raised in the consumer
+            publish(_Failure(exc))
+            return
+        finally:
+            close = getattr(items, "close", None)
+            if close is not None:
+                close()
+        publish(_DONE)
+
+    loop.run_in_executor(executor, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.exc
+            yield item
+    finally:
+        stop.set()
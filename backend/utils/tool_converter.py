@@ -1,8 +1,11 @@
 """Utility functions for converting Composio tools to Gemini format."""
 
-from typing import Any, Dict, List, Optional
+import logging
+from typing import Any, Dict, List, Optional, Tuple
 from google.genai import types
 
+logger = logging.getLogger(__name__)
+
 
 def clean_schema(obj: Any, is_property_definition: bool = False) -> Any:
     """
@@ -189,6 +192,32 @@ def _extract_tool_spec(tool: Any) -> Optional[Dict[str, Any]]:
     return None
 
 
+def tool_fingerprint(composio_tools: List[Any]) -> Optional[Tuple[str, ...]]:
+    """
+    Return a cheap identity for a tool list based on tool names only.
+
+    Returns None when any tool has no recognizable name, so callers never
+    treat two unidentifiable tool lists as equal.
+    """
+    names: List[str] = []
+    for tool in composio_tools:
+        if isinstance(tool, dict):
+            source = tool.get("function", {}) if tool.get("type") == "function" else tool
+            name = source.get("name") if isinstance(source, dict) else None
+        elif hasattr(tool, "function_declarations"):
+            declaration_names = [getattr(fd, "name", None) for fd in tool.function_declarations or []]
+            if not all(declaration_names):
+                return None
+            names.extend(declaration_names)
+            continue
+        else:
+            name = getattr(tool, "name", None) or getattr(tool, "slug", None)
+        if not isinstance(name, str) or not name:
+            return None
+        names.append(name)
+    return tuple(sorted(names))
+
+
 def convert_to_gemini_tools(composio_tools: List[Any]) -> List[types.Tool]:
     """
     Convert Composio FunctionDeclarations to google-genai format.
@@ -205,7 +234,7 @@ def convert_to_gemini_tools(composio_tools: List[Any]) -> List[types.Tool]:
         try:
             spec = _extract_tool_spec(tool)
             if spec is None:
-                print(f"DEBUG: Unknown tool format: {type(tool)}", flush=True)
+                logger.debug("Unknown tool format: %s", type(tool))
                 continue
 
             existing_fds = spec.get("function_declarations")
@@ -229,7 +258,11 @@ def convert_to_gemini_tools(composio_tools: List[Any]) -> List[types.Tool]:
             function_declarations.append(func_decl)
             
         except Exception as tool_error:
-            print(f"DEBUG: Failed to convert tool {tool_name if 'tool_name' in locals() else 'unknown'}: {tool_error}", flush=True)
+            logger.warning(
+                "Failed to convert tool %s: %s",
+                tool_name if 'tool_name' in locals() else 'unknown',
+                tool_error,
+            )
             continue
     
     # Combine all function declarations into a single Tool